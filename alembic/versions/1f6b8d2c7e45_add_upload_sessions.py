@@ -0,0 +1,53 @@
+"""Add upload sessions
+
+Revision ID: 1f6b8d2c7e45
+Revises: e2d9f4b6a318
+Create Date: 2026-10-17 18:07:44.306159
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f6b8d2c7e45'
+down_revision: Union[str, None] = 'e2d9f4b6a318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('owner_id', sa.UUID(), nullable=False),
+        sa.Column('filename', sa.String(length=1024), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('upload_id', sa.String(length=1024), nullable=False),
+        sa.Column('part_size', sa.BigInteger(), nullable=False),
+        sa.Column('part_count', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+    )
+
+    op.create_table(
+        'upload_session_parts',
+        sa.Column('session_id', sa.UUID(), nullable=False),
+        sa.Column('part_number', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('etag', sa.String(length=128), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['upload_sessions.id']),
+        sa.PrimaryKeyConstraint('session_id', 'part_number'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('upload_session_parts')
+    op.drop_table('upload_sessions')
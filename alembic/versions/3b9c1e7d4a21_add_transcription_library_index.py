@@ -0,0 +1,30 @@
+"""Add transcription library index
+
+Revision ID: 3b9c1e7d4a21
+Revises: 6f702f53e396
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c1e7d4a21'
+down_revision: Union[str, None] = '6f702f53e396'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_transcriptions_owner_id_created_at_id',
+        'transcriptions',
+        ['owner_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transcriptions_owner_id_created_at_id', table_name='transcriptions')
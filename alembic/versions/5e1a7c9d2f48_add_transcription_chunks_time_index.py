@@ -0,0 +1,38 @@
+"""Add transcription chunks time index
+
+Revision ID: 5e1a7c9d2f48
+Revises: 8d4f2a6c0b17
+Create Date: 2026-10-17 11:26:05.630917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a7c9d2f48'
+down_revision: Union[str, None] = '8d4f2a6c0b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently, transcription_chunks is the largest table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transcription_chunks_transcription_id_start_time',
+            'transcription_chunks',
+            ['transcription_id', 'start_time'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_transcription_chunks_transcription_id_start_time',
+            table_name='transcription_chunks',
+            postgresql_concurrently=True,
+        )
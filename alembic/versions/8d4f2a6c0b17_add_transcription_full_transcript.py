@@ -0,0 +1,53 @@
+"""Add materialized full transcript to transcriptions
+
+Revision ID: 8d4f2a6c0b17
+Revises: 3b9c1e7d4a21
+Create Date: 2026-10-17 10:03:12.487215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2a6c0b17'
+down_revision: Union[str, None] = '3b9c1e7d4a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'transcriptions',
+        sa.Column('full_transcript', sa.Text(), server_default='', nullable=False),
+    )
+    op.add_column(
+        'transcriptions',
+        sa.Column('word_count', sa.Integer(), server_default='0', nullable=False),
+    )
+
+    # Backfill existing transcriptions from their chunks
+    op.execute(
+        """
+        UPDATE transcriptions AS t
+        SET full_transcript = c.full_transcript,
+            word_count = CASE
+                WHEN btrim(c.full_transcript) = '' THEN 0
+                ELSE array_length(regexp_split_to_array(btrim(c.full_transcript), '\\s+'), 1)
+            END
+        FROM (
+            SELECT transcription_id,
+                   string_agg(content, ' ' ORDER BY start_time) AS full_transcript
+            FROM transcription_chunks
+            GROUP BY transcription_id
+        ) AS c
+        WHERE t.id = c.transcription_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('transcriptions', 'word_count')
+    op.drop_column('transcriptions', 'full_transcript')
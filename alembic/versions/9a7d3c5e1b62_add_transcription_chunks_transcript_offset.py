@@ -0,0 +1,31 @@
+"""Add transcription chunks transcript offset
+
+Revision ID: 9a7d3c5e1b62
+Revises: 1f6b8d2c7e45
+Create Date: 2026-10-17 21:32:08.517204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7d3c5e1b62'
+down_revision: Union[str, None] = '1f6b8d2c7e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable without a default, so only the catalog changes. Existing chunks
+    # get their offsets when their transcript is first rebuilt on an edit
+    op.add_column(
+        'transcription_chunks',
+        sa.Column('transcript_offset', sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('transcription_chunks', 'transcript_offset')
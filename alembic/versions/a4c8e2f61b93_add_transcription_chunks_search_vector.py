@@ -0,0 +1,127 @@
+"""Add transcription chunks search vector
+
+Revision ID: a4c8e2f61b93
+Revises: 5e1a7c9d2f48
+Create Date: 2026-10-17 12:14:51.902374
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f61b93'
+down_revision: Union[str, None] = '5e1a7c9d2f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows updated per backfill transaction, so locks and WAL stay small
+BACKFILL_BATCH_SIZE = 5000
+
+# Kept up to date by a trigger rather than a generated column, since adding a
+# STORED generated column rewrites the whole table under an ACCESS EXCLUSIVE lock
+SEARCH_VECTOR_FUNCTION = """
+    CREATE OR REPLACE FUNCTION transcription_chunks_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector(NEW.search_config, NEW.content);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+SEARCH_VECTOR_TRIGGER = """
+    CREATE TRIGGER transcription_chunks_search_vector_update
+    BEFORE INSERT OR UPDATE OF content, search_config ON transcription_chunks
+    FOR EACH ROW EXECUTE FUNCTION transcription_chunks_search_vector_update()
+"""
+
+# Last id of the next batch, none past the end, walking the primary key index from `last_id`,
+# so every batch seeks to where the previous one stopped
+BACKFILL_BATCH_END = sa.text(
+    """
+    SELECT id FROM (
+        SELECT id FROM transcription_chunks
+        WHERE id > CAST(:last_id AS uuid)
+        ORDER BY id
+        LIMIT :batch_size
+    ) AS batch
+    ORDER BY id DESC
+    LIMIT 1
+    """
+)
+
+# Same mapping as `src.utils.search.get_search_config`. Setting the config
+# fires the trigger, which fills in the vector of the same row
+BACKFILL_BATCH = sa.text(
+    """
+    UPDATE transcription_chunks AS c
+    SET search_config = CASE split_part(lower(t.language), '-', 1)
+            WHEN 'id' THEN 'indonesian'::regconfig
+            WHEN 'en' THEN 'english'::regconfig
+            ELSE 'simple'::regconfig
+        END
+    FROM transcriptions AS t
+    WHERE t.id = c.transcription_id
+        AND c.id > CAST(:last_id AS uuid)
+        AND c.id <= CAST(:batch_end AS uuid)
+    """
+)
+
+
+def upgrade() -> None:
+    # Both columns are only added to the catalog: a constant default and a
+    # nullable column without one don't rewrite the table
+    op.add_column(
+        'transcription_chunks',
+        sa.Column('search_config', postgresql.REGCONFIG(), server_default='simple', nullable=False),
+    )
+    op.add_column(
+        'transcription_chunks',
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True),
+    )
+
+    op.execute(SEARCH_VECTOR_FUNCTION)
+    op.execute(SEARCH_VECTOR_TRIGGER)
+
+    # Existing rows are backfilled a batch per transaction, while the table stays writable.
+    # Rows written meanwhile are filled in by the trigger
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        last_id = str(uuid.UUID(int=0))
+
+        while True:
+            batch_end = connection.execute(
+                BACKFILL_BATCH_END, {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}
+            ).scalar()
+            if batch_end is None:
+                break
+
+            connection.execute(BACKFILL_BATCH, {"last_id": last_id, "batch_end": batch_end})
+            last_id = str(batch_end)
+
+        op.create_index(
+            'ix_transcription_chunks_search_vector',
+            'transcription_chunks',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_transcription_chunks_search_vector',
+            table_name='transcription_chunks',
+            postgresql_concurrently=True,
+        )
+
+    op.execute('DROP TRIGGER transcription_chunks_search_vector_update ON transcription_chunks')
+    op.execute('DROP FUNCTION transcription_chunks_search_vector_update()')
+    op.drop_column('transcription_chunks', 'search_vector')
+    op.drop_column('transcription_chunks', 'search_config')
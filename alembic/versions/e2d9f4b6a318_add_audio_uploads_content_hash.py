@@ -0,0 +1,62 @@
+"""Add audio uploads and transcription content hash
+
+Revision ID: e2d9f4b6a318
+Revises: c7e3b5a90d12
+Create Date: 2026-10-17 16:41:09.530872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d9f4b6a318'
+down_revision: Union[str, None] = 'c7e3b5a90d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'audio_uploads',
+        sa.Column('filename', sa.String(length=1024), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('owner_id', sa.UUID(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('object_key', sa.String(length=1024), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('filename'),
+    )
+    op.create_index('ix_audio_uploads_content_hash', 'audio_uploads', ['content_hash'])
+    op.create_index('ix_audio_uploads_object_key', 'audio_uploads', ['object_key'])
+
+    op.add_column(
+        'transcriptions',
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transcriptions_content_hash_language',
+            'transcriptions',
+            ['content_hash', 'language'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_transcriptions_content_hash_language',
+            table_name='transcriptions',
+            postgresql_concurrently=True,
+        )
+
+    op.drop_column('transcriptions', 'content_hash')
+
+    op.drop_index('ix_audio_uploads_object_key', table_name='audio_uploads')
+    op.drop_index('ix_audio_uploads_content_hash', table_name='audio_uploads')
+    op.drop_table('audio_uploads')
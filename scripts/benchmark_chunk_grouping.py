@@ -0,0 +1,68 @@
+"""
+Benchmarks chunk grouping on a synthetic 40k-item AWS Transcribe transcript.
+
+Usage: python -m scripts.benchmark_chunk_grouping
+"""
+import timeit
+from itertools import islice
+
+from src.utils.chunking import ChunkGroupingStrategyEnum, group_transcript_items
+from src.schemas.transcription import ServiceRetrieveTranscriptionChunkItemSchema
+from src.services.transcription_backend import generate_transcript_items
+
+ITEM_COUNT = 40_000
+REPEAT = 5
+
+
+def generate_items(count: int, seed: int = 42):
+  """
+  The first `count` items of a long synthetic lecture, see `generate_transcript_items`
+  """
+  return list(islice(generate_transcript_items(duration_sec=count, seed=seed), count))
+
+
+def legacy_group(items):
+  """
+  The previous implementation: fixed 5-word groups with a Pydantic model per group
+  """
+  grouped_items = []
+  temp_group = []
+
+  for index, item in enumerate(items):
+    if item.get("type") == "pronunciation":
+      temp_group.append(item)
+
+      if len(temp_group) == 5 or index == len(items) - 1:
+        contents = " ".join([i.get("alternatives")[0].get("content") for i in temp_group])
+        start_time = temp_group[0].get("start_time")
+        end_time = temp_group[-1].get("end_time")
+        duration = float(end_time) - float(start_time)
+
+        grouped_items.append(ServiceRetrieveTranscriptionChunkItemSchema(
+          content=str(contents),
+          start_time=str(start_time),
+          end_time=str(end_time),
+          duration="{:.2f}".format(duration),
+        ))
+        temp_group = []
+
+  return grouped_items
+
+
+def report(name, func, items):
+  chunks = func(items)
+  best = min(timeit.repeat(lambda: func(items), number=1, repeat=REPEAT))
+  print(f"{name:<20} {best * 1000:8.1f} ms  {len(items) / best / 1e6:6.2f} M items/s  {len(chunks):6d} chunks")
+
+
+def main():
+  items = generate_items(ITEM_COUNT)
+  print(f"{len(items)} items, best of {REPEAT}\n")
+
+  report("legacy (5 words)", legacy_group, items)
+  for strategy in ChunkGroupingStrategyEnum:
+    report(strategy.value, lambda items, strategy=strategy: group_transcript_items(items, strategy=strategy), items)
+
+
+if __name__ == "__main__":
+  main()
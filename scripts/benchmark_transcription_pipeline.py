@@ -0,0 +1,153 @@
+"""
+Load-tests the create -> poll -> format -> persist pipeline against the local
+transcription backend, so no AWS job or audio is involved.
+
+Results go through the real TranscriptionService code path, down to a session
+which discards the inserts, so the numbers are the pipeline's own overhead.
+
+Jobs are resolved by the backend's pushed state changes, or with `--poll`
+by polling every `--poll-interval` seconds, to compare the two.
+
+Jobs go through the TranscriptionScheduler. With `--quota`, the backend refuses
+jobs over that many at once, like an account quota, and `--max-running` set
+above it shows quota errors being retried rather than failing jobs.
+
+Usage: python -m scripts.benchmark_transcription_pipeline [--jobs 50] [--audio-minutes 60] [--poll]
+"""
+import argparse
+import asyncio
+import math
+import time
+import uuid
+
+from src.schemas.transcription import TranscriptionJobSchema, TranscriptionJobStatusEnum
+from src.services.transcription import TranscriptionService
+from src.services.transcription_backend import LocalTranscriptionBackend
+from src.services.transcription_scheduler import TranscriptionScheduler
+from src.services.transcription_supervisor import TranscriptionJobSupervisor
+from src.utils.time import get_datetime_now_jkt
+
+
+class DiscardSession:
+  """
+  Accepts what `store_transcription_result` sends, and stores nothing
+  """
+
+  def __init__(self) -> None:
+    self.rows = 0
+
+  def add(self, instance) -> None:
+    self.rows += 1
+
+  def execute(self, statement, params=None):
+    self.rows += len(params) if params else 1
+
+  def flush(self) -> None:
+    pass
+
+  def commit(self) -> None:
+    pass
+
+  def refresh(self, instance) -> None:
+    pass
+
+  def rollback(self) -> None:
+    pass
+
+  def close(self) -> None:
+    pass
+
+
+def make_job(job_name: str) -> TranscriptionJobSchema:
+  datetime_now = get_datetime_now_jkt()
+
+  return TranscriptionJobSchema(
+    job_name=job_name,
+    transcription_id=uuid.uuid4(),
+    owner_id=uuid.uuid4(),
+    title="Benchmark",
+    tags=[],
+    language_code="id-ID",
+    file_uri=f"s3://benchmark/{job_name}.mp3",
+    file_format="mp3",
+    created_at=datetime_now,
+    updated_at=datetime_now,
+  )
+
+
+async def run(args) -> None:
+  backend = LocalTranscriptionBackend(
+    latency_sec=args.latency,
+    audio_duration_sec=args.audio_minutes * 60,
+    items_per_sec=args.items_per_sec,
+    max_running_jobs=args.quota,
+  )
+  service = TranscriptionService(backend=backend)
+  max_running = args.max_running or args.quota or args.jobs
+
+  poll_calls = 0
+  get_job = backend.get_job
+
+  async def counted_get_job(job_name):
+    nonlocal poll_calls
+    poll_calls += 1
+    return await get_job(job_name)
+
+  backend.get_job = counted_get_job
+
+  sessions = []
+
+  def session_factory():
+    session = DiscardSession()
+    sessions.append(session)
+    return session
+
+  supervisor = TranscriptionJobSupervisor(
+    session_factory=session_factory,
+    service=service,
+    event_driven=not args.poll,
+    scheduler=TranscriptionScheduler(max_running),
+  )
+  supervisor.POLL_INTERVAL_SEC = args.poll_interval
+  await supervisor.start()
+
+  started = time.perf_counter()
+
+  jobs = [await supervisor.enqueue(make_job(f"benchmark-{index}")) for index in range(args.jobs)]
+
+  while any(
+    job.status not in (TranscriptionJobStatusEnum.COMPLETED, TranscriptionJobStatusEnum.FAILED)
+    for job in jobs
+  ):
+    await asyncio.sleep(0.01)
+
+  elapsed = time.perf_counter() - started
+  await supervisor.stop()
+
+  completed = sum(job.status == TranscriptionJobStatusEnum.COMPLETED for job in jobs)
+  rows = sum(session.rows for session in sessions)
+  # Jobs run in waves of `max_running`, each taking the backend latency
+  latency = math.ceil(len(jobs) / max_running) * args.latency
+  overhead = elapsed - latency
+
+  print(f"{completed}/{len(jobs)} jobs completed in {elapsed:.2f}s, {latency:.2f}s of it backend latency")
+  print(f"pipeline overhead {overhead:.2f}s, {overhead / len(jobs) * 1000:.1f} ms per job, {rows} rows stored")
+  print(f"{poll_calls} backend polls, {'polling' if args.poll else 'pushed state changes'}")
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--jobs", type=int, default=50)
+  parser.add_argument("--audio-minutes", type=float, default=60)
+  parser.add_argument("--latency", type=float, default=0.5, help="Seconds until a local job completes")
+  parser.add_argument("--items-per-sec", type=float, default=0, help="Transcript download rate, 0 for unthrottled")
+  parser.add_argument("--poll", action="store_true", help="Poll jobs instead of using pushed state changes")
+  parser.add_argument("--poll-interval", type=float, default=0.5)
+  parser.add_argument("--quota", type=int, default=0, help="Backend concurrent job quota, 0 for unlimited")
+  parser.add_argument("--max-running", type=int, default=0, help="Scheduler limit, defaults to the quota")
+
+  asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+  main()
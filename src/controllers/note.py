@@ -1,3 +1,4 @@
+import asyncio
 from enum import Enum
 import http
 from datetime import datetime
@@ -11,7 +12,7 @@ from fastapi import (
     Body,
 )
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 
 from typing import (
@@ -24,8 +25,10 @@ from src.models.users import User
 from src.services.users import get_current_user
 
 from src.services.note import (
-  NoteService
+  NoteService,
+  CORNELL_SECTIONS,
 )
+from src.utils.http import SSE_MEDIA_TYPE, format_sse_event
 
 from src.schemas.note import (
   NoteSchema,
@@ -66,6 +69,7 @@ def generate_vlecture_note(
     owner_id=user.id,
     language=language,
     subtitle="",
+    map_reduce=payload.get("map_reduce"),
   )
 
   created_note_schema = service.generate_note_from_transcription(
@@ -91,6 +95,73 @@ def generate_vlecture_note(
 
   return created_note_document
 
+@note_router.post(
+  "/generate/stream",
+  response_description="Create a new vlecture Note, streamed as server-sent events",
+  status_code=http.HTTPStatus.OK,
+)
+async def stream_vlecture_note(
+  request: Request,
+  payload: GenerateVlectureNoteRequestSchema = Body(),
+  user: User = Depends(get_current_user),
+):
+  """
+  Generates and stores a note like `/generate`, streamed as server-sent events:
+  a `block` event with the `section` and `block` of every main, cues or summary
+  block as soon as it's written, then a `note` event with the stored note,
+  or an `error` event. A long transcript is mapped and merged like `/generate`
+  does first, and only the last merge is streamed
+  """
+  service = NoteService()
+  language = payload.language or "id-ID"
+
+  async def events():
+    blocks = {section: [] for section in CORNELL_SECTIONS}
+    main_texts = []
+
+    try:
+      async for section, text in service.stream_cornell_sections(
+        transcript=payload.transcript,
+        language=language,
+        map_reduce=payload.map_reduce,
+      ):
+        block = service.create_paragraph_block_from_text(text=text)
+        blocks[section].append(block)
+        if section == "main":
+          main_texts.append(text)
+
+        yield format_sse_event("block", {"section": section, "block": jsonable_encoder(block)})
+
+      created_note_schema = service.create_note_block_object(
+        owner_id=user.id,
+        title=payload.title,
+        subtitle="",
+        main=blocks["main"],
+        cues=blocks["cues"],
+        summary=blocks["summary"],
+        language=language,
+        main_word_count=service.get_word_count_str_array(main_texts),
+      )
+
+      # Store Note to database, off the event loop
+      new_note_document = await asyncio.to_thread(
+        request.app.note_collection.insert_one,
+        created_note_schema.model_dump(by_alias=True, exclude=["id"]),
+      )
+      created_note_schema.id = str(new_note_document.inserted_id)
+
+      yield format_sse_event("note", jsonable_encoder(created_note_schema))
+    except Exception as e:
+      print(f"Error while streaming note: {e}")
+      yield format_sse_event("error", "Error: Note generation failed.")
+
+  return StreamingResponse(
+    events(),
+    media_type=SSE_MEDIA_TYPE,
+    # Proxies would otherwise hold the blocks back
+    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+  )
+
 @note_router.get(
   "/all",
   response_description="Fetch all of user's notes",
@@ -4,6 +4,8 @@ import uuid
 from uuid import UUID
 
 from datetime import datetime
+from typing import Optional
+import hmac
 import json
 
 from fastapi import (
@@ -12,11 +14,13 @@ from fastapi import (
     Response,
     Depends,
     Body,
+    Header,
+    Query,
 )
 
 from src.utils.time import get_datetime_now_jkt
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 
 from botocore.exceptions import ClientError
@@ -31,7 +35,7 @@ from src.models.transcription import Transcription
 from src.models.users import User
 from src.services.users import get_current_user
 
-from src.utils.settings import AWS_BUCKET_NAME
+from src.utils.settings import AWS_BUCKET_NAME, TRANSCRIPTION_EVENTS_SECRET
 from src.schemas.base import GenericResponseModel
 from src.schemas.transcription import (
     TranscribeAudioRequestSchema,
@@ -39,17 +43,28 @@ from src.schemas.transcription import (
     ViewTranscriptionViaJobNameRequestSchema,
     TranscriptionSchema,
     TranscriptionChunksSchema,
+    TranscriptionJobSchema,
+    TranscriptionJobStateChangeEventSchema,
     ViewTranscriptionRequestSchema,
+    EditTranscriptionChunksRequestSchema,
 )
-from src.services.transcription import TranscriptionService
+from src.services.transcription import (
+    TranscriptionService,
+    TranscriptionEditConflictError,
+    LIBRARY_PAGE_SIZE,
+    CHUNKS_PAGE_SIZE,
+    SEARCH_PAGE_SIZE,
+)
+from src.services.transcription_supervisor import transcription_supervisor
+from src.services.upload import UploadService
 
 from src.utils.time import (
     get_datetime_now_jkt
 )
+from src.utils.chunking import DEFAULT_STRATEGY
+from src.utils.subtitles import SubtitleFormatEnum, SUBTITLE_MEDIA_TYPES
+from src.utils.word_timings import WordTimingsFormatEnum, WORD_TIMINGS_MEDIA_TYPE
 from src.utils.aws.s3 import AWSS3Client
-from src.utils.aws.transcribe import (
-    AWSTranscribeClient,
-)
 
 
 class TranscriptionRouterTags(Enum):
@@ -61,17 +76,42 @@ transcription_router = APIRouter(
 )
 
 
-@transcription_router.post("/create", status_code=http.HTTPStatus.OK)
+@transcription_router.post("/create", status_code=http.HTTPStatus.ACCEPTED)
 async def transcribe_audio(
     req: TranscribeAudioRequestSchema,
     session: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    transcribe_client = AWSTranscribeClient().get_client()
-
+    """
+    Queues a transcription job and returns its handle right away.
+    Jobs are started as the scheduler frees slots under the concurrent job quota.
+    The result is stored to db in the background by the TranscriptionJobSupervisor,
+    poll `/v1/transcription/jobs/{job_name}` for its status.
+
+    With `segmented`, long MP3 audio is split into overlapping segments
+    which are transcribed concurrently, then stitched back together.
+
+    With `preprocess`, the audio is first downmixed to 16 kHz mono and its
+    long silences are cut, so less of it is transcribed. Chunk times still
+    refer to the uploaded audio.
+
+    Audio identical to an earlier upload, in the same language, reuses
+    that upload's transcription instead of being transcribed again.
+    """
     service = TranscriptionService()
 
-    filename, file_format = req.s3_filename.split(".")
+    # Jobs no longer start right away, so a reused name isn't caught by the backend
+    if transcription_supervisor.get_job(req.job_name) is not None:
+        return JSONResponse(
+            status_code=http.HTTPStatus.CONFLICT,
+            content="Error: Transcription job name already exists.",
+        )
+
+    # Identical uploads share one S3 object, see `UploadService.store_audio`
+    upload = UploadService(AWS_BUCKET_NAME).resolve_audio(session, req.s3_filename)
+    object_key = upload.object_key if upload is not None else req.s3_filename
+
+    filename, file_format = object_key.split(".")
     job_name = req.job_name
     language_code = req.language_code
 
@@ -81,156 +121,467 @@ async def transcribe_audio(
         extension=file_format,
     )
 
-    # print(filename)
-
     try:
-        # Transcribe audio
-        await service.transcribe_file(
-            transcribe_client=transcribe_client,
+        tsc_datetime_now = get_datetime_now_jkt()
+        tsc_title = req.title if req.title != None else "My Transcription"
+
+        job = TranscriptionJobSchema(
             job_name=job_name,
+            transcription_id=uuid.uuid4(),
+            owner_id=user.id,
+            title=tsc_title,
+            tags=req.tags,
+            language_code=language_code,
             file_uri=file_uri,
             file_format=file_format,
-            language_code=language_code,
+            chunk_strategy=req.chunk_strategy or DEFAULT_STRATEGY,
+            content_hash=upload.content_hash if upload is not None else None,
+            created_at=tsc_datetime_now,
+            updated_at=tsc_datetime_now,
         )
 
-        # Store created transcription to db
-        print("STORING TRANSCRIPTION TO DB....")
+        duplicate_job = await transcription_supervisor.submit_if_duplicate(job)
 
-        formatted_tsc_response = (
-            await service.retrieve_formatted_transcription_from_job_name(
-                transcribe_client=transcribe_client, job_name=job_name
-            )
+        if duplicate_job is not None:
+            job = duplicate_job
+        elif req.preprocess:
+            # Pre-processing, and splitting if segmented, happen in the background
+            job = await transcription_supervisor.submit_preprocessed(job, segmented=bool(req.segmented))
+        elif req.segmented:
+            # Splitting and starting the segments happens in the background
+            job = await transcription_supervisor.submit_segmented(job)
+        else:
+            # Started once the scheduler admits it, see `queue_position`
+            job = await transcription_supervisor.enqueue(job)
+
+        return JSONResponse(
+            status_code=http.HTTPStatus.ACCEPTED, content=jsonable_encoder(job)
         )
 
-        # Transcription Fields
-        tsc_datetime_now = get_datetime_now_jkt()
-        chunk_items = formatted_tsc_response["results"]["items"]
+    except RuntimeError:
+        return JSONResponse(
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            content="Audio Transcription job failed.",
+        )
 
-        tsc_id = uuid.uuid4()
-        tsc_title = req.title if req.title != None else "My Transcription"
 
-        # Generate the TranscriptionChunk objects, and calculate total_duration first
-        generate_chunks_response = service.generate_transcription_chunks(
-            transcription_id=tsc_id, items=chunk_items
+@transcription_router.get("/jobs/{job_name}", status_code=http.HTTPStatus.OK)
+async def view_transcription_job(
+    job_name: str,
+    wait: int = Query(0, ge=0, le=60),
+    user: User = Depends(get_current_user),
+):
+    """
+    Returns the job's handle. With `wait`, holds the request for up to that
+    many seconds until the job is COMPLETED or FAILED, instead of being polled
+    """
+    job = transcription_supervisor.get_job(job_name)
+
+    if job is None or job.owner_id != user.id:
+        return JSONResponse(
+            status_code=http.HTTPStatus.NOT_FOUND,
+            content="Error: Transcription job not found.",
         )
 
-        transcription_chunks = generate_chunks_response.chunks
-        total_duration = generate_chunks_response.duration
+    if wait:
+        job = await transcription_supervisor.wait_for_job(job_name, timeout=wait) or job
 
-        # Fetch user id
-        owner_id = user.id
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK, content=jsonable_encoder(job)
+    )
 
-        # Store Transcription object to database
-        tsc_create_schema = TranscriptionSchema(
-            id=tsc_id,
-            created_at=tsc_datetime_now,
-            updated_at=tsc_datetime_now,
-            is_deleted=False,
-            owner_id=owner_id,
-            title=tsc_title,
-            tags=req.tags,
-            duration=total_duration,
-            language=language_code,
-        )
 
-        store_tsc_response = await service.insert_transcription_result(
-            session=session, transcription_data=tsc_create_schema
+@transcription_router.post("/events", status_code=http.HTTPStatus.ACCEPTED)
+async def receive_transcription_event(
+    event: TranscriptionJobStateChangeEventSchema,
+    x_transcription_events_secret: Optional[str] = Header(None),
+):
+    """
+    Receives "Transcribe Job State Change" events from an EventBridge
+    API destination, which sends TRANSCRIPTION_EVENTS_SECRET as the
+    `X-Transcription-Events-Secret` header. The job is resolved right away.
+    """
+    if not TRANSCRIPTION_EVENTS_SECRET or not hmac.compare_digest(
+        x_transcription_events_secret or "", TRANSCRIPTION_EVENTS_SECRET
+    ):
+        return JSONResponse(
+            status_code=http.HTTPStatus.UNAUTHORIZED,
+            content="Error: Invalid transcription events secret.",
         )
 
-        if store_tsc_response:
-            print(f"Stored transcription object to db: {store_tsc_response.__str__()}")
+    is_tracked = transcription_supervisor.resolve(
+        job_name=event.detail.job_name,
+        status=event.detail.status,
+        failure_reason=event.detail.failure_reason,
+    )
 
-        # Then, store TranscriptionChunk object to database, bcs it needs to maintain a ForeignKey
-        print(f"Storing Transcription Chunks to db...")
-        for chunk in transcription_chunks:
-            await service.insert_transcription_chunks(
-                session=session, transcription_chunk_data=chunk
-            )
+    # Jobs tracked by another worker are left to its fallback sweep
+    return JSONResponse(
+        status_code=http.HTTPStatus.ACCEPTED,
+        content={"job_name": event.detail.job_name, "is_tracked": is_tracked},
+    )
 
-        response = {
-            "transcription": tsc_create_schema,
-            "transcription_chunks": transcription_chunks,
-        }
+
+@transcription_router.get("/poll", status_code=http.HTTPStatus.OK)
+async def poll_transcription_job(
+    req: PollTranscriptionRequestSchema,
+    user: User = Depends(get_current_user),
+):
+    # Jobs tracked by this worker are answered without calling the backend
+    job = transcription_supervisor.get_job(req.job_name)
+
+    if job is not None:
+        if job.owner_id != user.id:
+            return JSONResponse(
+                status_code=http.HTTPStatus.NOT_FOUND,
+                content="Error: Transcription job not found.",
+            )
 
         return JSONResponse(
-            status_code=http.HTTPStatus.CREATED, content=jsonable_encoder(response)
+            status_code=http.HTTPStatus.OK, content=jsonable_encoder(job)
+        )
+
+    service = TranscriptionService()
+
+    try:
+        response = await service.get_transcription_job(
+            job_name=req.job_name
         )
 
-    except TimeoutError:
         return JSONResponse(
-            status_code=http.HTTPStatus.REQUEST_TIMEOUT,
-            content="Error: Timeout during audio transcription.",
+            status_code=http.HTTPStatus.OK, content=jsonable_encoder(response)
         )
-    except RuntimeError:
+    except ClientError:
         return JSONResponse(
             status_code=http.HTTPStatus.BAD_REQUEST,
-            content="Audio Transcription job failed.",
+            content="Error: Audio Transcription job failed.",
         )
 
+@transcription_router.get("/all", status_code=http.HTTPStatus.OK)
+def view_all_transcriptions(
+    session: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = TranscriptionService()
 
-@transcription_router.get("/poll", status_code=http.HTTPStatus.OK)
-async def poll_transcription_job(req: PollTranscriptionRequestSchema):
-    transcribe_client = AWSTranscribeClient().get_client()
+    response = service.fetch_all_transcriptions_chunks_db(
+        session=session,
+        user=user,
+    )
+    
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK,
+        content=response,
+    )
 
+@transcription_router.get("/library", status_code=http.HTTPStatus.OK)
+def view_transcription_library(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=LIBRARY_PAGE_SIZE, ge=1, le=100),
+    session: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Lists the user's transcriptions page by page, without their chunks.
+    Pass the returned `next_cursor` to fetch the next page
+    """
     service = TranscriptionService()
 
     try:
-        response = await service.poll_transcription_job(
-            transcribe_client=transcribe_client, job_name=req.job_name
+        response = service.fetch_transcription_library_page(
+            session=session,
+            user=user,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        return JSONResponse(
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            content=f"Error: {e}",
         )
 
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK,
+        content=response,
+    )
+
+@transcription_router.get("/search", status_code=http.HTTPStatus.OK)
+def search_transcriptions(
+    q: str = Query(min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=SEARCH_PAGE_SIZE, ge=1, le=100),
+    session: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Searches the user's transcriptions, and returns the best matching chunks
+    with their transcription and timestamps, page by page.
+    """
+    service = TranscriptionService()
+
+    try:
+        response = service.search_transcription_chunks(
+            session=session,
+            user=user,
+            query=q,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
         return JSONResponse(
-            status_code=http.HTTPStatus.OK, content=jsonable_encoder(response)
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            content=f"Error: {e}",
         )
-    except TimeoutError:
+
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK,
+        content=response,
+    )
+
+@transcription_router.get("/{tsc_id}/chunks", status_code=http.HTTPStatus.OK)
+def view_transcription_chunks(
+    tsc_id: UUID,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=CHUNKS_PAGE_SIZE, ge=1, le=1000),
+    session: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = TranscriptionService()
+
+    try:
+        response = service.fetch_transcription_chunks_page(
+            tsc_id=tsc_id,
+            session=session,
+            user=user,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
         return JSONResponse(
-            status_code=http.HTTPStatus.REQUEST_TIMEOUT,
-            content="Error: Timeout while processing transcription job.",
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            content=f"Error: {e}",
         )
-    except ClientError:
+
+    if response is None:
+        return JSONResponse(
+            status_code=http.HTTPStatus.NOT_FOUND,
+            content="Error: Transcription not found.",
+        )
+
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK,
+        content=response,
+    )
+
+@transcription_router.patch("/{tsc_id}/chunks", status_code=http.HTTPStatus.OK)
+def edit_transcription_chunks(
+    tsc_id: UUID,
+    req: EditTranscriptionChunksRequestSchema,
+    session: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Edits the content of a batch of chunks, all or nothing.
+    Every chunk carries its `updated_at` as last read; if any of them changed
+    since, nothing is saved and 409 lists the chunks to reload.
+    """
+    service = TranscriptionService()
+
+    try:
+        response = service.update_transcription_chunks(
+            tsc_id=tsc_id,
+            session=session,
+            user=user,
+            chunk_edits=req.chunks,
+        )
+    except TranscriptionEditConflictError as e:
+        return JSONResponse(
+            status_code=http.HTTPStatus.CONFLICT,
+            content={
+                "message": f"Error: {e}",
+                "chunk_ids": [str(chunk_id) for chunk_id in e.chunk_ids],
+            },
+        )
+    except ValueError as e:
         return JSONResponse(
             status_code=http.HTTPStatus.BAD_REQUEST,
-            content="Error: Audio Transcription job failed.",
+            content=f"Error: {e}",
         )
 
-@transcription_router.get("/all", status_code=http.HTTPStatus.OK)
-def view_all_transcriptions(
+    if response is None:
+        return JSONResponse(
+            status_code=http.HTTPStatus.NOT_FOUND,
+            content="Error: Transcription not found.",
+        )
+
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK,
+        content=response,
+    )
+
+@transcription_router.get("/{tsc_id}/chunks/range", status_code=http.HTTPStatus.OK)
+def view_transcription_chunks_in_range(
+    tsc_id: UUID,
+    t_start: float = Query(ge=0),
+    t_end: float = Query(ge=0),
+    limit: int = Query(default=CHUNKS_PAGE_SIZE, ge=1, le=1000),
     session: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
+    """
+    Returns the chunks overlapping the `[t_start, t_end]` playback window, in seconds
+    """
+    if t_end < t_start:
+        return JSONResponse(
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            content="Error: t_end must not be before t_start.",
+        )
+
     service = TranscriptionService()
 
-    response = service.fetch_all_transcriptions_chunks_db(
+    response = service.fetch_transcription_chunks_in_range(
+        tsc_id=tsc_id,
         session=session,
         user=user,
+        t_start=t_start,
+        t_end=t_end,
+        limit=limit,
     )
-    
+
+    if response is None:
+        return JSONResponse(
+            status_code=http.HTTPStatus.NOT_FOUND,
+            content="Error: Transcription not found.",
+        )
+
     return JSONResponse(
         status_code=http.HTTPStatus.OK,
         content=response,
     )
 
-@transcription_router.get("/{tsc_id}", status_code=http.HTTPStatus.OK)
-def view_a_transcription(
+@transcription_router.get("/{tsc_id}/words", status_code=http.HTTPStatus.OK)
+def view_transcription_word_timings(
     tsc_id: UUID,
+    t_start: float = Query(default=0, ge=0),
+    t_end: float = Query(default=float("inf"), ge=0),
+    format: WordTimingsFormatEnum = WordTimingsFormatEnum.JSON,
     session: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
+    """
+    Returns the timing of every word overlapping the `[t_start, t_end]` playback window,
+    for word-by-word highlighting. As parallel JSON lists, or with `format=binary`
+    in the packed layout of `src.utils.word_timings`.
+
+    Words are as recognized, and aren't changed by chunk edits. The time ranges
+    of edited chunks in the window come as `edited_ranges`, or with `format=binary`
+    as the `X-Edited-Ranges` header of `start-end` pairs, for clients to highlight
+    those chunks as a whole instead
+    """
+    if t_end < t_start:
+        return JSONResponse(
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            content="Error: t_end must not be before t_start.",
+        )
+
     service = TranscriptionService()
 
-    response = service.fetch_one_transcriptions_chunks_db(
+    word_timings = service.fetch_word_timings(
         tsc_id=tsc_id,
         session=session,
         user=user,
     )
 
-    full_transcript = service.convert_chunks_into_full_transcript(
+    if word_timings is None:
+        return JSONResponse(
+            status_code=http.HTTPStatus.NOT_FOUND,
+            content="Error: Word timings not found.",
+        )
+
+    window = word_timings.window(t_start, t_end)
+    edited_ranges = service.fetch_edited_ranges(
+        tsc_id=tsc_id,
+        session=session,
+        t_start=t_start,
+        t_end=t_end,
+    )
+
+    if format == WordTimingsFormatEnum.BINARY:
+        return Response(
+            status_code=http.HTTPStatus.OK,
+            content=word_timings.pack_window(window),
+            media_type=WORD_TIMINGS_MEDIA_TYPE,
+            headers={
+                "X-Word-Index": str(window.start),
+                "X-Edited-Ranges": ",".join(f"{start:g}-{end:g}" for start, end in edited_ranges),
+            },
+        )
+
+    return JSONResponse(
+        status_code=http.HTTPStatus.OK,
+        content={
+            **word_timings.to_columns(window),
+            "edited_ranges": [[start, end] for start, end in edited_ranges],
+        },
+    )
+
+@transcription_router.get("/{tsc_id}/subtitles.{fmt}", status_code=http.HTTPStatus.OK)
+def export_transcription_subtitles(
+    tsc_id: UUID,
+    fmt: SubtitleFormatEnum,
+    session: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Streams the transcription as an SRT or WebVTT subtitle file
+    """
+    service = TranscriptionService()
+
+    version = service.fetch_transcription_version(
         tsc_id=tsc_id,
         session=session,
         user=user,
     )
 
-    response["full_transcript"] = full_transcript
+    if version is None:
+        return JSONResponse(
+            status_code=http.HTTPStatus.NOT_FOUND,
+            content="Error: Transcription not found.",
+        )
+
+    return StreamingResponse(
+        service.iter_transcription_subtitles(
+            tsc_id=tsc_id,
+            version=version,
+            fmt=fmt,
+        ),
+        media_type=SUBTITLE_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{tsc_id}.{fmt.value}"',
+        },
+    )
+
+@transcription_router.get("/{tsc_id}", status_code=http.HTTPStatus.OK)
+def view_a_transcription(
+    tsc_id: UUID,
+    include_chunks: bool = True,
+    session: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    service = TranscriptionService()
+
+    response = service.fetch_one_transcriptions_chunks_db(
+        tsc_id=tsc_id,
+        session=session,
+        user=user,
+        include_chunks=include_chunks,
+    )
+
+    if response is None:
+        return JSONResponse(
+            status_code=http.HTTPStatus.NOT_FOUND,
+            content="Error: Transcription not found.",
+        )
     
     return JSONResponse(
         status_code=http.HTTPStatus.OK,
@@ -239,14 +590,13 @@ def view_a_transcription(
 
 @transcription_router.post("/view", status_code=http.HTTPStatus.OK)
 async def view_transcription_from_jobname(req: ViewTranscriptionViaJobNameRequestSchema):
-    transcribe_client = AWSTranscribeClient().get_client()
     job_name = req.job_name
 
     service = TranscriptionService()
 
     try:
         response = await service.retrieve_formatted_transcription_from_job_name(
-            transcribe_client=transcribe_client, job_name=job_name
+            job_name=job_name
         )
 
         return JSONResponse(
@@ -268,13 +618,11 @@ async def view_transcription_from_jobname(req: ViewTranscriptionViaJobNameReques
     "/delete", status_code=http.HTTPStatus.OK, response_model=GenericResponseModel
 )
 async def delete_transcription(job_name: str):
-    transcribe_client = AWSTranscribeClient().get_client()
-
     service = TranscriptionService()
 
     try:
         response = await service.delete_transcription_job(
-            transcribe_client=transcribe_client, job_name=job_name
+            job_name=job_name
         )
 
         return JSONResponse(
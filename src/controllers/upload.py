@@ -1,26 +1,43 @@
+import asyncio
 from enum import Enum
 import mimetypes
-import boto3
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
 from src.models.users import User
+from src.utils.db import get_db
 from src.services.users import get_current_user
-from src.services.upload import UploadService, sha
+from src.services.upload import (
+    UploadService,
+    sha,
+    check_audio,
+    guess_audio_type,
+    peek_stream,
+    ALLOWED_AUDIO_TYPES,
+    PRESIGNED_PARTS_PAGE_SIZE,
+)
+from src.services.waveform import WaveformService
+from src.utils.waveform import WAVEFORM_MEDIA_TYPE, WaveformFormatEnum
+from src.utils.audio import PROBE_SIZE, probe_audio, probe_audio_file, probe_size
+from src.schemas.upload import (
+    CreateUploadSessionRequestSchema,
+    RecordUploadPartRequestSchema,
+)
 
-from src.utils.settings import AWS_ACCESS_KEY_ID, AWS_BUCKET_NAME, AWS_SECRET_ACCESS_KEY
+from src.utils.settings import AWS_BUCKET_NAME
 from starlette.status import (
     HTTP_200_OK,
+    HTTP_201_CREATED,
     HTTP_400_BAD_REQUEST,
     HTTP_401_UNAUTHORIZED,
     HTTP_404_NOT_FOUND,
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
 
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-)
+# Most peaks served per request, a few times the width of a screen
+MAX_WAVEFORM_PEAKS = 8000
 
 
 class UploadRouterTags(Enum):
@@ -32,24 +49,40 @@ upload_router = APIRouter(prefix="/v1/upload", tags=[UploadRouterTags.upload])
 
 @upload_router.post("")
 async def upload_file(
-    user: User = Depends(get_current_user), file: UploadFile = File(...)
+    background_tasks: BackgroundTasks,
+    user: User = Depends(get_current_user),
+    file: UploadFile = File(...),
+    session: Session = Depends(get_db),
 ):
+    """
+    Uploads an MP3 or M4A file. Audio identical to an earlier upload isn't
+    uploaded again, the returned filename then refers to the stored copy.
+    Files whose content isn't audio of that type, or which run too long, are rejected
+    """
     user_id = user.id
     try:
-        allowed_types = ["audio/mp4", "audio/mp4a-latm",
-                         "audio/x-m4a", "audio/mpeg"]
         file_type, _ = mimetypes.guess_type(file.filename)
 
         # NOTE delete
         print(file_type)
-        if file_type not in allowed_types:
+        if file_type not in ALLOWED_AUDIO_TYPES:
             raise HTTPException(
                 status_code=HTTP_400_BAD_REQUEST,
                 detail="Only MP3 or M4A files are allowed",
             )
 
         file_name = str(user_id) + "_" + str(sha()) + "_" + file.filename
-        s3_client.upload_fileobj(file.file, AWS_BUCKET_NAME, file_name)
+
+        try:
+            check_audio(file_name, await asyncio.to_thread(probe_audio_file, file.file))
+        except ValueError as e:
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+        service = UploadService(AWS_BUCKET_NAME)
+        # Off the event loop, the transfer takes as long as the file is large
+        upload, is_duplicate = await asyncio.to_thread(
+            service.store_audio, session, user_id, file_name, file.file,
+        )
     except HTTPException as e:
         return e
     except Exception as e:
@@ -59,11 +92,216 @@ async def upload_file(
     finally:
         file.file.close()
 
-    return {"status_code": HTTP_200_OK, "filename": file_name}
+    # Identical audio already has its peaks
+    if not is_duplicate:
+        background_tasks.add_task(WaveformService(AWS_BUCKET_NAME).store_peaks, upload.object_key)
+
+    return {"status_code": HTTP_200_OK, "filename": file_name, "is_duplicate": is_duplicate}
+
+
+@upload_router.post("/stream")
+async def upload_file_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    filename: str = Query(min_length=1, max_length=255),
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
+    """
+    Uploads an MP3 or M4A file sent as the raw request body, named by `filename`.
+    The body is streamed to S3 in parts as it arrives rather than spooled first,
+    for large files from clients which can't upload to S3 directly.
+    Its first bytes are checked before anything is sent on to S3
+    """
+    if guess_audio_type(filename) is None:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="Only MP3 or M4A files are allowed",
+        )
+
+    file_name = str(user.id) + "_" + str(sha()) + "_" + filename
+
+    content_length = request.headers.get("content-length")
+    size = int(content_length) if content_length and content_length.isdigit() else None
+
+    head, chunks = await peek_stream(request.stream(), PROBE_SIZE)
+    # Past an ID3 tag longer than the first read
+    head, chunks = await peek_stream(chunks, probe_size(head))
+
+    try:
+        check_audio(file_name, probe_audio(head, size))
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+    service = UploadService(AWS_BUCKET_NAME)
+    try:
+        upload, is_duplicate = await service.store_audio_stream(
+            session, user.id, file_name, chunks,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail="Error on uploading the file")
+
+    if not is_duplicate:
+        background_tasks.add_task(WaveformService(AWS_BUCKET_NAME).store_peaks, upload.object_key)
+
+    return {"status_code": HTTP_200_OK, "filename": file_name, "is_duplicate": is_duplicate}
+
+
+@upload_router.post("/sessions", status_code=HTTP_201_CREATED)
+def create_upload_session(
+    req: CreateUploadSessionRequestSchema,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
+    """
+    Starts an upload straight from the client to S3, for large files.
+    PUT each part's bytes to its presigned URL, report the returned ETag to
+    `/sessions/{session_id}/parts/{part_number}`, then complete the session.
+    More part URLs come from `GET /sessions/{session_id}?start=`
+    """
+    service = UploadService(AWS_BUCKET_NAME)
+
+    try:
+        upload_session = service.create_upload_session(session, user.id, req.filename, req.size)
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return JSONResponse(status_code=HTTP_201_CREATED, content=jsonable_encoder(upload_session))
+
+
+@upload_router.get("/sessions/{session_id}")
+def view_upload_session(
+    session_id: UUID,
+    start: int = Query(default=None, ge=1),
+    count: int = Query(default=PRESIGNED_PARTS_PAGE_SIZE, ge=1, le=PRESIGNED_PARTS_PAGE_SIZE),
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
+    """
+    Returns the session with its completed parts, and with `start`,
+    freshly presigned URLs of `count` parts from that part number
+    """
+    service = UploadService(AWS_BUCKET_NAME)
+    upload_session = service.get_upload_session(session, user.id, session_id, start, count)
+
+    if upload_session is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+    return JSONResponse(status_code=HTTP_200_OK, content=jsonable_encoder(upload_session))
+
+
+@upload_router.put("/sessions/{session_id}/parts/{part_number}")
+def record_upload_part(
+    session_id: UUID,
+    part_number: int,
+    req: RecordUploadPartRequestSchema,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
+    service = UploadService(AWS_BUCKET_NAME)
+
+    try:
+        is_recorded = service.record_upload_part(session, user.id, session_id, part_number, req.etag)
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not is_recorded:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+    return JSONResponse(status_code=HTTP_200_OK, content={"part_number": part_number})
+
+
+@upload_router.post("/sessions/{session_id}/complete")
+def complete_upload_session(
+    session_id: UUID,
+    background_tasks: BackgroundTasks,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
+    """
+    Assembles the uploaded parts into the audio file, and returns its
+    filename, as returned by `POST /v1/upload`
+    """
+    service = UploadService(AWS_BUCKET_NAME)
+
+    try:
+        filename = service.complete_upload_session(session, user.id, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if filename is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+    background_tasks.add_task(WaveformService(AWS_BUCKET_NAME).store_peaks, filename)
+
+    return {"status_code": HTTP_200_OK, "filename": filename}
+
+
+@upload_router.delete("/sessions/{session_id}")
+def abort_upload_session(
+    session_id: UUID,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
+    service = UploadService(AWS_BUCKET_NAME)
+
+    try:
+        is_aborted = service.abort_upload_session(session, user.id, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not is_aborted:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Upload session not found")
+
+    return JSONResponse(status_code=HTTP_200_OK, content="Upload session aborted")
+
+
+@upload_router.get("/{filename}/peaks")
+def view_waveform_peaks(
+    filename: str,
+    count: int = Query(default=1000, ge=1, le=MAX_WAVEFORM_PEAKS),
+    format: WaveformFormatEnum = WaveformFormatEnum.JSON,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
+    """
+    Returns up to `count` min/max peaks spread over the whole audio, to draw
+    its waveform, scaled to -128..127. As JSON lists, or with `format=binary`
+    in the packed int8 layout of `src.utils.waveform`.
+    Peaks are computed in the background after upload, so may not be ready yet
+    """
+    service = UploadService(AWS_BUCKET_NAME)
+    if not service.check_user_ownership(filename, str(user.id)):
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Waveform not found")
+
+    upload = service.resolve_audio(session, filename)
+    object_key = upload.object_key if upload is not None else filename
+
+    peaks = WaveformService(AWS_BUCKET_NAME).fetch_peaks(object_key)
+    if peaks is None:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Waveform not found")
+
+    peaks = peaks.downsample(count)
+
+    if format == WaveformFormatEnum.BINARY:
+        return Response(
+            status_code=HTTP_200_OK,
+            content=peaks.pack(),
+            media_type=WAVEFORM_MEDIA_TYPE,
+        )
+
+    return JSONResponse(status_code=HTTP_200_OK, content=peaks.to_dict())
 
 
 @upload_router.delete("/delete/{filename}")
-async def delete_audio(filename: str, user: User = Depends(get_current_user)):
+async def delete_audio(
+    filename: str,
+    user: User = Depends(get_current_user),
+    session: Session = Depends(get_db),
+):
     service = UploadService(AWS_BUCKET_NAME)
     if not service.check_user_ownership(filename, str(user.id)):
         raise HTTPException(
@@ -72,7 +310,7 @@ async def delete_audio(filename: str, user: User = Depends(get_current_user)):
         )
 
     try:
-        service.delete_file(filename)
+        service.delete_audio(session, filename)
     except ValueError as e:
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND,
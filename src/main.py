@@ -30,6 +30,10 @@ from src.controllers import (
     streaks,
 )
 from src.utils.db import Base, engine
+from src.services.transcription_supervisor import transcription_supervisor
+from src.utils.http import close_http_client
+from src.utils.openai import close_async_openai_client
+from src.utils.aws.clients import aws_clients
 
 
 sentry_sdk.init(
@@ -118,6 +122,30 @@ def shutdown_db_client():
     print("Closed MongoDB Connection")
 
 
+# Build the shared AWS clients before the first request needs them
+@app.on_event("startup")
+def startup_aws_clients():
+    aws_clients.warm_up()
+
+
+@app.on_event("shutdown")
+def shutdown_aws_clients():
+    aws_clients.clear()
+
+
+# Track in-flight transcription jobs on this worker's event loop
+@app.on_event("startup")
+async def startup_transcription_supervisor():
+    await transcription_supervisor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_transcription_supervisor():
+    await transcription_supervisor.stop()
+    await close_http_client()
+    await close_async_openai_client()
+
+
 # sentry trigger error test, comment when not needed
 # @app.get("/sentry-debug")
 # async def trigger_error():
@@ -13,12 +13,16 @@ from sqlalchemy import (
     TIMESTAMP,
     Integer,
     String,
+    Text,
     Float,
     Boolean,
     ForeignKey,
+    Index,
+    FetchedValue,
+    LargeBinary,
 )
 
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, TSVECTOR
 
 from sqlalchemy.sql import func
 
@@ -27,12 +31,19 @@ from sqlalchemy.orm import (
   mapped_column,
   DeclarativeBase,
   relationship,
+  deferred,
 )
 
 from src.utils.time import get_datetime_now_jkt
 
 class Transcription(Base):
   __tablename__ = "transcriptions"
+  __table_args__ = (
+    # Serves the keyset-paginated library listing, newest first
+    Index("ix_transcriptions_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    # Finds an earlier transcription of identical audio to reuse
+    Index("ix_transcriptions_content_hash_language", "content_hash", "language"),
+  )
 
   id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True)
   created_at = Column(TIMESTAMP(timezone=True), default=get_datetime_now_jkt, nullable=False)
@@ -57,6 +68,13 @@ class Transcription(Base):
   # Current use case: "id" | "en", future use case: "id-ID" | ...
   language = Column(String(10), nullable=False)
 
+  # Materialized from the chunks when the transcription is stored or edited
+  full_transcript = Column(Text, default="", server_default="", nullable=False)
+  word_count = Column(Integer, default=0, server_default="0", nullable=False)
+
+  # SHA-256 of the transcribed audio, see `AudioUpload`
+  content_hash = Column(String(64), nullable=True)
+
   @classmethod
   def get_by_id(cls, uuid: UUID) -> TranscriptionSchema:
     base = super().get_by_id(uuid)
@@ -73,6 +91,12 @@ class Transcription(Base):
 
 class TranscriptionChunk(Base):
   __tablename__ = "transcription_chunks"
+  __table_args__ = (
+    # Serves time-range lookups and in-order paging within one transcription
+    Index("ix_transcription_chunks_transcription_id_start_time", "transcription_id", "start_time"),
+    # Serves full-text search
+    Index("ix_transcription_chunks_search_vector", "search_vector", postgresql_using="gin"),
+  )
 
   id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True)
   created_at = Column(TIMESTAMP(timezone=True), default=get_datetime_now_jkt, nullable=False)
@@ -95,6 +119,14 @@ class TranscriptionChunk(Base):
   end_time = Column(Float(precision=1), nullable=False)
 
   content = Column(String(255), nullable=False)
+  # Where `content` starts in the transcription's full transcript, in characters.
+  # NULL for chunks stored before offsets were, until the transcript is rebuilt
+  transcript_offset = Column(Integer, nullable=True)
+
+  # Text search configuration of the transcription's language, see `get_search_config`
+  search_config = Column(REGCONFIG, server_default="simple", nullable=False)
+  # `to_tsvector(search_config, content)`, set by a trigger, see migration a4c8e2f61b93
+  search_vector = deferred(Column(TSVECTOR, server_default=FetchedValue(), server_onupdate=FetchedValue()))
 
   def __str__(self):
     return f"""
@@ -109,6 +141,15 @@ class TranscriptionChunk(Base):
     base = super().get_by_id(uuid)
     return base.__to_model() if base else None
 
-  
 
-  
\ No newline at end of file
+class TranscriptionWordTimings(Base):
+  __tablename__ = "transcription_word_timings"
+
+  # One row per transcription, written along with its chunks
+  transcription_id = Column(UUID(as_uuid=True), ForeignKey(Transcription.id), primary_key=True)
+  created_at = Column(TIMESTAMP(timezone=True), default=get_datetime_now_jkt, nullable=False)
+
+  word_count = Column(Integer, nullable=False)
+
+  # Start/end times and words packed by `WordTimingsBuilder`
+  data = deferred(Column(LargeBinary, nullable=False))
@@ -0,0 +1,79 @@
+from src.utils.db import Base
+from src.schemas.upload import UploadSessionStatusEnum
+from src.models.users import User
+
+import uuid
+
+from sqlalchemy import (
+    Column,
+    UUID,
+    TIMESTAMP,
+    BigInteger,
+    Integer,
+    String,
+    ForeignKey,
+    Index,
+)
+
+from src.utils.time import get_datetime_now_jkt
+
+class AudioUpload(Base):
+  __tablename__ = "audio_uploads"
+  __table_args__ = (
+    # Finds an already stored object with the same content
+    Index("ix_audio_uploads_content_hash", "content_hash"),
+    Index("ix_audio_uploads_object_key", "object_key"),
+  )
+
+  # The name handed back to the uploader, `{owner_id}_{sha}_{filename}`
+  filename = Column(String(1024), primary_key=True)
+  created_at = Column(TIMESTAMP(timezone=True), default=get_datetime_now_jkt, nullable=False)
+
+  owner_id = Column(UUID, ForeignKey(User.id), nullable=False)
+
+  # SHA-256 of the audio, hex encoded
+  content_hash = Column(String(64), nullable=False)
+  size = Column(BigInteger, nullable=False)
+
+  # S3 object holding the audio, shared by every upload of identical content
+  object_key = Column(String(1024), nullable=False)
+
+  def __str__(self):
+    return f"""
+    Audio Upload\n
+    ===
+    filename: {self.filename}\n
+    object_key: {self.object_key}
+    """
+
+
+class UploadSession(Base):
+  __tablename__ = "upload_sessions"
+
+  id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True)
+  created_at = Column(TIMESTAMP(timezone=True), default=get_datetime_now_jkt, nullable=False)
+  updated_at = Column(TIMESTAMP(timezone=True), default=get_datetime_now_jkt, onupdate=get_datetime_now_jkt, nullable=False)
+
+  owner_id = Column(UUID, ForeignKey(User.id), nullable=False)
+
+  # Object key, `{owner_id}_{sha}_{filename}` as for uploads through the API
+  filename = Column(String(1024), nullable=False)
+  content_type = Column(String(100), nullable=False)
+  size = Column(BigInteger, nullable=False)
+
+  # S3 multipart upload
+  upload_id = Column(String(1024), nullable=False)
+  part_size = Column(BigInteger, nullable=False)
+  part_count = Column(Integer, nullable=False)
+
+  status = Column(String(20), default=UploadSessionStatusEnum.IN_PROGRESS.value, nullable=False)
+
+
+class UploadSessionPart(Base):
+  __tablename__ = "upload_session_parts"
+
+  session_id = Column(UUID(as_uuid=True), ForeignKey(UploadSession.id), primary_key=True)
+  part_number = Column(Integer, primary_key=True)
+  created_at = Column(TIMESTAMP(timezone=True), default=get_datetime_now_jkt, nullable=False)
+
+  etag = Column(String(128), nullable=False)
@@ -74,6 +74,9 @@ class GenerateVlectureNoteRequestSchema(BaseModel):
   title: str
   transcript: str
   language: str
+  # Notes of long transcripts are taken in windows and merged,
+  # by default past `NoteService.MAP_REDUCE_MIN_TOKENS`
+  map_reduce: Optional[bool] = None
 
 class GenerateNoteServiceRequestSchema(BaseModel):
   transcript: str
@@ -81,6 +84,7 @@ class GenerateNoteServiceRequestSchema(BaseModel):
   subtitle: str
   owner_id: UUID
   language: str
+  map_reduce: Optional[bool] = None
 
 class BlockNoteCornellSchema(BaseModel):
   main: Optional[List[NoteBlockSchema]]
@@ -1,15 +1,19 @@
 from datetime import datetime
+from enum import Enum
 import uuid
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Tuple
 from uuid import UUID
 
 from pydantic import (
   BaseModel, 
+  ConfigDict,
+  Field,
   computed_field,
   field_validator,
 )
 
 from src.schemas.base import DBBaseModel
+from src.utils.chunking import ChunkGroupingStrategyEnum, DEFAULT_STRATEGY
 
 # DATABASE SCHEMA
 class TranscriptionChunksSchema(DBBaseModel, BaseModel):
@@ -25,6 +29,7 @@ class TranscriptionChunksSchema(DBBaseModel, BaseModel):
   end_time: float
 
   content: Optional[str] = ""
+  transcript_offset: Optional[int] = None
 
   class Config:
       orm_mode = True
@@ -55,9 +60,92 @@ class TranscriptionSchema(DBBaseModel, BaseModel):
   duration: float
   language: str
 
+  # Materialized from the chunks, so the detail view doesn't re-join them
+  full_transcript: str = ""
+  word_count: int = 0
+
+  # SHA-256 of the transcribed audio, if it was uploaded through /v1/upload
+  content_hash: Optional[str] = None
+
   class Config:
       orm_mode = True
 
+class TranscriptionJobStatusEnum(str, Enum):
+  QUEUED = "QUEUED"
+  IN_PROGRESS = "IN_PROGRESS"
+  STORING = "STORING"
+  COMPLETED = "COMPLETED"
+  FAILED = "FAILED"
+
+class TranscriptionJobSegmentSchema(BaseModel):
+  """
+  One segment of a segmented transcription job, transcribed as a job of its own.
+  Times are where the segment sits in the source audio
+  """
+  index: int
+  job_name: str
+  file_uri: str
+  start_time: float
+  end_time: float
+  status: str = "IN_PROGRESS"
+
+class TranscriptionJobSchema(BaseModel):
+  """
+  Handle for a transcription job tracked by the TranscriptionJobSupervisor.
+  `transcription_id` is reserved up front and used once the result is stored
+  """
+  job_name: str
+  transcription_id: UUID
+  owner_id: UUID
+
+  title: str
+  tags: Optional[Union[List[str], str]] = []
+  language_code: str
+
+  file_uri: str
+  file_format: str
+  chunk_strategy: ChunkGroupingStrategyEnum = DEFAULT_STRATEGY
+
+  # Long audio split into overlapping segments, transcribed concurrently
+  segmented: bool = False
+  segments: List[TranscriptionJobSegmentSchema] = []
+
+  # Identical audio in the same language is transcribed once. A duplicate job
+  # waits on the job named in `duplicate_of`, then copies its result
+  content_hash: Optional[str] = None
+  duplicate_of: Optional[str] = None
+
+  # Audio pre-processed before transcription: `file_uri` then points to the
+  # processed audio, `source_file_uri` to the upload, and `time_offsets` are
+  # `TimeOffsetMap` pairs back onto the upload
+  preprocess: bool = False
+  source_file_uri: Optional[str] = None
+  time_offsets: List[Tuple[float, float]] = []
+
+  status: TranscriptionJobStatusEnum = TranscriptionJobStatusEnum.QUEUED
+  failure_reason: Optional[str] = None
+  # 1-based place in the queue while QUEUED, see `TranscriptionScheduler`
+  queue_position: Optional[int] = None
+
+  created_at: datetime
+  updated_at: datetime
+
+class TranscriptionJobStateChangeDetailSchema(BaseModel):
+  job_name: str = Field(alias="TranscriptionJobName")
+  status: str = Field(alias="TranscriptionJobStatus")
+  failure_reason: Optional[str] = Field(default=None, alias="FailureReason")
+
+class TranscriptionJobStateChangeEventSchema(BaseModel):
+  """
+  An EventBridge "Transcribe Job State Change" event, as sent by
+  an EventBridge API destination or by the local backend
+  """
+  model_config = ConfigDict(populate_by_name=True)
+
+  source: str = "aws.transcribe"
+  detail_type: str = Field(default="Transcribe Job State Change", alias="detail-type")
+  detail: TranscriptionJobStateChangeDetailSchema
+
 ### REQUEST SCHEMAS
 class TranscribeAudioRequestSchema(BaseModel):
    s3_filename: str
@@ -67,8 +155,36 @@ class TranscribeAudioRequestSchema(BaseModel):
    # NOTE Mar 24, newly added, backward-compatible field definitions
    title: Optional[str]
    tags: Optional[Union[List[str], str]] = []
+
+   # How AWS Transcribe items are grouped into chunks, see `ChunkGrouper`
+   chunk_strategy: Optional[ChunkGroupingStrategyEnum] = None
+
+   # Transcribe long MP3 audio as concurrent overlapping segments
+   segmented: Optional[bool] = False
+
+   # Downmix, resample and cut long silences out of the audio before it's
+   # transcribed. Chunk times still refer to the uploaded audio
+   preprocess: Optional[bool] = False
    
 
+class TranscriptionChunkEditSchema(BaseModel):
+   id: UUID
+   content: str = Field(min_length=1, max_length=255)
+   # As last read by the client, the edit is rejected if the chunk changed since
+   updated_at: datetime
+
+   @field_validator("content")
+   @classmethod
+   def validate_content(cls, content: str) -> str:
+     content = " ".join(content.split())
+     if not content:
+       raise ValueError("Content must not be blank")
+
+     return content
+
+class EditTranscriptionChunksRequestSchema(BaseModel):
+   chunks: List[TranscriptionChunkEditSchema] = Field(min_length=1, max_length=500)
+
 class PollTranscriptionRequestSchema(BaseModel):
    job_name: str
 
@@ -105,6 +221,8 @@ class TranscriptionChunksResponseSchema(BaseModel):
 class GenerateTranscriptionChunksResponseSchema(BaseModel):
    duration: float
    chunks: List[TranscriptionChunksSchema]
+   full_transcript: str = ""
+   word_count: int = 0
 
 # OBJECT SCHEMAS
 class TranscriptionChunkItemAlternativesSchema(BaseModel):
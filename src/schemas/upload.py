@@ -0,0 +1,50 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import (
+  BaseModel,
+  Field,
+)
+
+
+class UploadSessionStatusEnum(str, Enum):
+  IN_PROGRESS = "IN_PROGRESS"
+  COMPLETED = "COMPLETED"
+  ABORTED = "ABORTED"
+
+# REQUEST SCHEMA
+class CreateUploadSessionRequestSchema(BaseModel):
+  filename: str = Field(min_length=1, max_length=255)
+  # Bytes, so the parts can be planned up front
+  size: int = Field(gt=0)
+
+class RecordUploadPartRequestSchema(BaseModel):
+  # ETag header S3 returned for the part's PUT
+  etag: str = Field(min_length=1, max_length=128)
+
+# RESPONSE SCHEMA
+class UploadPartURLSchema(BaseModel):
+  part_number: int
+  url: str
+
+class UploadSessionSchema(BaseModel):
+  """
+  A direct-to-S3 multipart upload. Parts are PUT to their presigned URLs,
+  reported with their ETag, and the session is completed once all are
+  """
+  id: UUID
+  filename: str
+  content_type: str
+  size: int
+  part_size: int
+  part_count: int
+  status: UploadSessionStatusEnum
+
+  completed_parts: List[int] = []
+  # Presigned URLs of the requested parts, each valid for `url_expires_in` seconds
+  parts: List[UploadPartURLSchema] = []
+  url_expires_in: Optional[int] = None
+
+  created_at: datetime
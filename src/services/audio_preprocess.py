@@ -0,0 +1,130 @@
+import posixpath
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from src.utils.aws.clients import get_aws_client
+from src.utils.ffmpeg import iter_pcm, read_error_output
+from src.utils.silence import SilenceTrimmer, TimeOffsetMap
+
+
+class AudioPreprocessService:
+  """
+  Prepares audio stored on S3 for transcription: downmixed to mono,
+  resampled to 16 kHz, which is all speech recognition uses, and with long
+  silences cut out, then stored as a small MP3 next to the source.
+
+  ffmpeg decodes the source and encodes the result, with the trimming in
+  between on the decoded samples, all streamed. ffmpeg reads the source
+  from a presigned URL, so an M4A whose index comes last can be seeked.
+  """
+
+  SAMPLE_RATE = 16000
+  BITRATE = "48k"
+  READ_CHUNK_SIZE = 1024 * 1024
+  URL_EXPIRY_SEC = 60 * 60
+
+  def __init__(self, s3_client=None, ffmpeg_path: str = "ffmpeg") -> None:
+    self._s3_client = s3_client
+    self.ffmpeg_path = ffmpeg_path
+
+  @property
+  def s3_client(self):
+    if self._s3_client is None:
+      self._s3_client = get_aws_client("s3")
+
+    return self._s3_client
+
+  def processed_key(self, key: str) -> str:
+    stem, _ = posixpath.splitext(key)
+    return f"{stem}_16k.mp3"
+
+  def delete_processed(self, bucket_name: str, key: str) -> None:
+    """
+    Deletes the processed audio of the source at `key`, if there is any
+    """
+    self.s3_client.delete_object(Bucket=bucket_name, Key=self.processed_key(key))
+
+  def encode_command(self) -> List[str]:
+    return [
+      self.ffmpeg_path, "-nostdin", "-v", "error",
+      "-f", "s16le", "-ac", "1", "-ar", str(self.SAMPLE_RATE), "-i", "pipe:0",
+      "-c:a", "libmp3lame", "-b:a", self.BITRATE,
+      "-f", "mp3", "pipe:1",
+    ]
+
+  def preprocess(self, bucket_name: str, key: str) -> Tuple[str, TimeOffsetMap]:
+    """
+    Returns the key of the processed audio, and where its times fall on the source
+    """
+    source = self.s3_client.generate_presigned_url(
+      "get_object",
+      Params={"Bucket": bucket_name, "Key": key},
+      ExpiresIn=self.URL_EXPIRY_SEC,
+    )
+    target_key = self.processed_key(key)
+    trimmer = SilenceTrimmer(self.SAMPLE_RATE)
+
+    decoded = iter_pcm(source, self.SAMPLE_RATE, self.ffmpeg_path, self.READ_CHUNK_SIZE)
+
+    try:
+      with tempfile.TemporaryFile() as encoder_log, ThreadPoolExecutor(max_workers=1) as executor:
+        encoder = subprocess.Popen(
+          self.encode_command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=encoder_log,
+        )
+
+        # The encoder's output is uploaded while it's written
+        upload = executor.submit(
+          self.s3_client.upload_fileobj,
+          encoder.stdout,
+          bucket_name,
+          target_key,
+          ExtraArgs={"ContentType": "audio/mpeg"},
+        )
+
+        # Nothing reads the encoder any more once the upload failed, which would block writes
+        upload.add_done_callback(lambda upload: upload.exception() is not None and encoder.kill())
+
+        try:
+          for samples in decoded:
+            encoder.stdin.write(trimmer.feed(samples).tobytes())
+
+          encoder.stdin.write(trimmer.flush().tobytes())
+          encoder.stdin.close()
+
+          upload.result()
+
+          if encoder.wait() != 0:
+            raise RuntimeError(f"ffmpeg couldn't encode the audio: {read_error_output(encoder_log)}")
+        except BrokenPipeError:
+          # The upload's error, which made the encoder go
+          upload.result()
+          raise
+        except BaseException:
+          encoder.kill()
+          raise
+        finally:
+          decoded.close()
+          encoder.wait()
+
+          for pipe in (encoder.stdin, encoder.stdout):
+            if not pipe.closed:
+              try:
+                pipe.close()
+              except BrokenPipeError:
+                pass
+    except BaseException:
+      # An encoder stopped early ends the upload early, rather than failing it
+      try:
+        self.delete_processed(bucket_name, key)
+      except Exception as e:
+        print(f"Error while deleting partial pre-processed audio of {key}: {e}")
+      raise
+
+    print(
+      f"Pre-processed {key}: {trimmer.input_samples / self.SAMPLE_RATE:.0f}s "
+      f"to {trimmer.output_samples / self.SAMPLE_RATE:.0f}s"
+    )
+
+    return target_key, trimmer.offset_map
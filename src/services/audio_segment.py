@@ -0,0 +1,144 @@
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from src.utils.aws.s3 import AWSS3Client
+from src.utils.audio import AudioSegment, MP3FrameIndex, plan_audio_segments
+
+
+class AudioSegmentService:
+  """
+  Splits MP3 audio stored on S3 into overlapping segment objects.
+
+  The source is indexed while it streams from S3, and segments are created
+  with server-side range copies, so the audio is read once and never re-uploaded.
+  """
+
+  READ_CHUNK_SIZE = 1024 * 1024
+  MAX_CONCURRENT_COPIES = 8
+  MAX_DELETE_KEYS = 1000
+
+  def __init__(self, s3_client=None) -> None:
+    self._s3_client = s3_client
+
+  @property
+  def s3_client(self):
+    if self._s3_client is None:
+      self._s3_client = AWSS3Client().get_client()
+
+    return self._s3_client
+
+  def segment_key(self, key: str, index: int) -> str:
+    stem, extension = posixpath.splitext(key)
+    return f"{stem}.part{index:03d}{extension}"
+
+  def index_mp3(self, bucket_name: str, key: str) -> MP3FrameIndex:
+    frame_index = MP3FrameIndex()
+
+    body = self.s3_client.get_object(Bucket=bucket_name, Key=key)["Body"]
+    try:
+      for data in body.iter_chunks(chunk_size=self.READ_CHUNK_SIZE):
+        frame_index.feed(data)
+    finally:
+      body.close()
+
+    return frame_index
+
+  def copy_byte_range(
+    self,
+    bucket_name: str,
+    key: str,
+    target_key: str,
+    byte_start: int,
+    byte_end: int,
+  ) -> None:
+    """
+    Copies `[byte_start, byte_end)` of an object into a new object, on S3's side.
+    A single-part multipart upload, since only part copies take a byte range
+    """
+    upload = self.s3_client.create_multipart_upload(Bucket=bucket_name, Key=target_key)
+
+    try:
+      part = self.s3_client.upload_part_copy(
+        Bucket=bucket_name,
+        Key=target_key,
+        UploadId=upload["UploadId"],
+        PartNumber=1,
+        CopySource={"Bucket": bucket_name, "Key": key},
+        CopySourceRange=f"bytes={byte_start}-{byte_end - 1}",
+      )
+
+      self.s3_client.complete_multipart_upload(
+        Bucket=bucket_name,
+        Key=target_key,
+        UploadId=upload["UploadId"],
+        MultipartUpload={
+          "Parts": [{"ETag": part["CopyPartResult"]["ETag"], "PartNumber": 1}]
+        },
+      )
+    except Exception:
+      self.s3_client.abort_multipart_upload(
+        Bucket=bucket_name, Key=target_key, UploadId=upload["UploadId"]
+      )
+      raise
+
+  def split_mp3(
+    self,
+    bucket_name: str,
+    key: str,
+    segment_duration: float,
+    overlap: float,
+    max_segments: Optional[int] = None,
+  ) -> List[Tuple[AudioSegment, str]]:
+    """
+    Returns each segment with its object key, see `plan_audio_segments`. Audio
+    no longer than one segment isn't copied, and comes back as a single
+    segment of the source key
+    """
+    segments = plan_audio_segments(
+      self.index_mp3(bucket_name, key), segment_duration, overlap, max_segments
+    )
+
+    if len(segments) <= 1:
+      return [(segment, key) for segment in segments]
+
+    segment_keys = [(segment, self.segment_key(key, segment.index)) for segment in segments]
+
+    with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_COPIES) as executor:
+      copies = [
+        executor.submit(
+          self.copy_byte_range,
+          bucket_name, key, segment_key, segment.byte_start, segment.byte_end,
+        )
+        for segment, segment_key in segment_keys
+      ]
+
+      try:
+        for copy in copies:
+          copy.result()
+      except Exception:
+        for copy in copies:
+          copy.cancel()
+
+        # Waits for the copies still running, so none is left behind
+        executor.shutdown(wait=True)
+        self.delete_segments(bucket_name, [segment_key for _, segment_key in segment_keys])
+        raise
+
+    return segment_keys
+
+  def delete_segments(self, bucket_name: str, keys: List[str]) -> None:
+    """
+    Deletes segment objects, missing ones included, in batches of what a single request takes
+    """
+    for start in range(0, len(keys), self.MAX_DELETE_KEYS):
+      response = self.s3_client.delete_objects(
+        Bucket=bucket_name,
+        Delete={
+          "Objects": [{"Key": key} for key in keys[start:start + self.MAX_DELETE_KEYS]],
+          "Quiet": True,
+        },
+      )
+
+      if response.get("Errors"):
+        raise RuntimeError(f"Couldn't delete segments: {response['Errors']}")
@@ -6,19 +6,21 @@ from fastapi import (
   Request,
 )
 
+import asyncio
 import re
 import uuid
 from uuid import UUID
 
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import pytz
 from datetime import datetime
 from bson import ObjectId
 
 from sqlalchemy.orm import Session
-from typing import List, Union
+from typing import AsyncIterator, List, Optional, Tuple, Union
 from botocore.exceptions import ClientError
 
 
@@ -44,12 +46,25 @@ from src.utils.settings import (
 )
 
 from src.utils.openai import (
-  construct_system_instructions
+  construct_system_instructions,
+  construct_map_instructions,
+  construct_reduce_instructions,
+  get_async_openai_client,
 )
+from src.utils.tokens import count_tokens, get_encoding, split_into_token_windows
+from src.utils.json_stream import JSONObjectArraysStreamParser
+
+CORNELL_SECTIONS = ("main", "cues", "summary")
 
 class NoteService:
   MODEL_TEMPERATURE = 0.7
 
+  # Longer transcripts are taken notes of in windows, see `convert_text_into_cornell_json_map_reduce`
+  MAP_REDUCE_MIN_TOKENS = 12000
+  MAP_WINDOW_TOKENS = 4000
+  REDUCE_INPUT_TOKENS = 12000
+  MAX_CONCURRENT_COMPLETIONS = 4
+
   def __init__(self) -> None:
     # Init OpenAI Client
     self.openai_client = OpenAI(
@@ -80,20 +95,110 @@ class NoteService:
     transcript: str,
     language: str,
   ) -> LLMCornellNoteFromTranscript:
-    client = self.get_openai()
-
     SYSTEM_PROMPT = construct_system_instructions(
       context=transcript,
       language=language,
     )
-    
+
+    return self.complete_cornell_json(SYSTEM_PROMPT)
+
+  def convert_text_into_cornell_json_map_reduce(
+    self,
+    transcript: str,
+    language: str,
+  ) -> LLMCornellNoteFromTranscript:
+    return self.complete_cornell_json(self.construct_map_reduce_instructions(
+      transcript=transcript,
+      language=language,
+    ))
+
+  def construct_map_reduce_instructions(self, transcript: str, language: str) -> str:
+    """
+    Prompt for the Cornell note of a transcript too long for one prompt. Notes
+    of windows of MAP_WINDOW_TOKENS are taken concurrently (map), then merged
+    (reduce) in rounds, until the notes left fit in the one prompt returned,
+    for the last merge. Latency grows with the longest window and the number
+    of rounds, not the lecture's length
+    """
+    encoding = get_encoding(OPENAI_MODEL_NAME)
+    windows = split_into_token_windows(transcript, self.MAP_WINDOW_TOKENS, encoding)
+
+    if len(windows) <= 1:
+      return construct_system_instructions(context=transcript, language=language)
+
+    with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_COMPLETIONS) as executor:
+      notes = list(executor.map(
+        lambda part: self.complete_cornell_json(construct_map_instructions(
+          context=part[1],
+          part=part[0] + 1,
+          part_count=len(windows),
+          language=language,
+        )),
+        enumerate(windows),
+      ))
+
+      while True:
+        groups = self.group_notes_for_reduce(notes, encoding)
+        if len(groups) == 1:
+          return self.construct_reduce_instructions(groups[0], language)
+
+        notes = list(executor.map(lambda group: self.reduce_cornell_notes(group, language), groups))
+
+  def is_map_reduce_needed(self, transcript: str, map_reduce: Optional[bool] = None) -> bool:
+    """
+    `map_reduce` as requested, or past MAP_REDUCE_MIN_TOKENS if it wasn't
+    """
+    if map_reduce is not None:
+      return map_reduce
+
+    return count_tokens(transcript, get_encoding(OPENAI_MODEL_NAME)) > self.MAP_REDUCE_MIN_TOKENS
+
+  def group_notes_for_reduce(self, notes: List[dict], encoding=None) -> List[List[dict]]:
+    """
+    Consecutive notes grouped to fit REDUCE_INPUT_TOKENS, at least two to a group
+    so every round of merging makes progress
+    """
+    groups: List[List[dict]] = []
+    group: List[dict] = []
+    group_tokens = 0
+
+    for note in notes:
+      tokens = count_tokens(json.dumps(note, ensure_ascii=False), encoding)
+
+      if len(group) >= 2 and group_tokens + tokens > self.REDUCE_INPUT_TOKENS:
+        groups.append(group)
+        group = []
+        group_tokens = 0
+
+      group.append(note)
+      group_tokens += tokens
+
+    if len(group) == 1 and groups:
+      groups[-1].append(group[0])
+    elif group:
+      groups.append(group)
+
+    return groups
+
+  def construct_reduce_instructions(self, notes: List[dict], language: str) -> str:
+    return construct_reduce_instructions(
+      context=json.dumps(notes, ensure_ascii=False),
+      language=language,
+    )
+
+  def reduce_cornell_notes(self, notes: List[dict], language: str) -> LLMCornellNoteFromTranscript:
+    return self.complete_cornell_json(self.construct_reduce_instructions(notes, language))
+
+  def complete_cornell_json(self, system_prompt: str) -> LLMCornellNoteFromTranscript:
+    client = self.get_openai()
+
     chat_completion = client.chat.completions.create(
       model=OPENAI_MODEL_NAME,
       temperature=self.MODEL_TEMPERATURE,
       messages=[
         {
         "role": "system",
-        "content": SYSTEM_PROMPT,
+        "content": system_prompt,
         }
       ]
     )
@@ -101,8 +206,61 @@ class NoteService:
     llm_answer = chat_completion.choices[0].message.content
     llm_answer: LLMCornellNoteFromTranscript = json.loads(llm_answer)
 
+    # A section left out of one part's note mustn't fail the merge
+    for section in CORNELL_SECTIONS:
+      llm_answer.setdefault(section, [])
+
     return llm_answer
 
+  async def stream_cornell_sections(
+    self,
+    transcript: str,
+    language: str,
+    map_reduce: Optional[bool] = None,
+  ) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Streams the Cornell note from the async OpenAI client, and yields every
+    (section, text) block as soon as the answer completes it, so the first
+    block arrives within seconds rather than after the whole answer.
+    A transcript which needs map-reduce, see `is_map_reduce_needed`, is mapped
+    and merged first, and only the last merge is streamed
+    """
+    client = get_async_openai_client()
+
+    if self.is_map_reduce_needed(transcript, map_reduce):
+      SYSTEM_PROMPT = await asyncio.to_thread(
+        self.construct_map_reduce_instructions,
+        transcript=transcript,
+        language=language,
+      )
+    else:
+      SYSTEM_PROMPT = construct_system_instructions(
+        context=transcript,
+        language=language,
+      )
+
+    stream = await client.chat.completions.create(
+      model=OPENAI_MODEL_NAME,
+      temperature=self.MODEL_TEMPERATURE,
+      messages=[
+        {
+        "role": "system",
+        "content": SYSTEM_PROMPT,
+        }
+      ],
+      stream=True,
+    )
+
+    parser = JSONObjectArraysStreamParser()
+
+    async for chunk in stream:
+      if not chunk.choices or not chunk.choices[0].delta.content:
+        continue
+
+      for section, text in parser.feed_text(chunk.choices[0].delta.content):
+        if section in CORNELL_SECTIONS:
+          yield section, str(text)
+
   def create_paragraph_block_from_text(self, text: str) -> NoteBlockSchema:
     return NoteBlockSchema(
       id=uuid.uuid4(),
@@ -163,7 +321,7 @@ class NoteService:
     for text_chunk in payload:
       blocknote_chunk_json = self.create_paragraph_block_from_text(text=str(text_chunk))
 
-    blocknote_json.append(blocknote_chunk_json)
+      blocknote_json.append(blocknote_chunk_json)
 
     return blocknote_json
 
@@ -186,10 +344,16 @@ class NoteService:
     owner_id = payload.owner_id
     language = payload.language
 
-    note_json = self.convert_text_into_cornell_json(
-    transcript=transcript,
-    language=language,
-    )
+    if self.is_map_reduce_needed(transcript, payload.map_reduce):
+      note_json = self.convert_text_into_cornell_json_map_reduce(
+        transcript=transcript,
+        language=language,
+      )
+    else:
+      note_json = self.convert_text_into_cornell_json(
+      transcript=transcript,
+      language=language,
+      )
 
     # Calculate word length for main section
     main_word_count = self.get_word_count_str_array(note_json["main"])
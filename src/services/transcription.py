@@ -1,13 +1,14 @@
 import uuid
 from uuid import UUID
 
-import time
-import requests
+import asyncio
 import pytz
 from datetime import datetime
 
+from sqlalchemy import and_, case, cast, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import Session
-from typing import List, Union
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple, Union
 from botocore.exceptions import ClientError
 from fastapi.encoders import jsonable_encoder
 
@@ -16,10 +17,17 @@ from src.models.users import (
 )
 
 from src.services.users import get_current_user
+from src.services.transcription_backend import (
+  TranscriptionBackend,
+  get_transcription_backend,
+)
+from src.services.audio_segment import AudioSegmentService
+from src.services.audio_preprocess import AudioPreprocessService
 
 from src.models.transcription import (
   Transcription,
   TranscriptionChunk,
+  TranscriptionWordTimings,
 )
 
 from src.schemas.transcription import (
@@ -28,34 +36,197 @@ from src.schemas.transcription import (
   TranscriptionSchema,
   ServiceRetrieveTranscriptionChunkItemSchema,
   GenerateTranscriptionChunksResponseSchema,
+  TranscriptionJobSchema,
+  TranscriptionJobSegmentSchema,
+  TranscriptionChunkEditSchema,
 )
 
+from src.utils.db import SessionLocal
 from src.utils.time import get_datetime_now_jkt
+from src.utils.pagination import encode_cursor, decode_cursor
+from src.utils.chunking import (
+  ChunkGrouper,
+  ChunkGroupingStrategyEnum,
+  GroupedChunk,
+  DEFAULT_STRATEGY,
+  MAX_CHUNK_DURATION_SEC,
+  group_transcript_items,
+)
+from src.utils.cache import SizedLRUCache
+from src.utils.silence import TimeOffsetMap
+from src.utils.stitching import SegmentItemStitcher
+from src.utils.search import (
+  DEFAULT_SEARCH_CONFIG,
+  SUPPORTED_SEARCH_CONFIGS,
+  get_search_config,
+)
+from src.utils.word_timings import WordTimings, WordTimingsBuilder
+from src.utils.subtitles import (
+  SubtitleCache,
+  SubtitleFormatEnum,
+  VTT_HEADER,
+  render_cue,
+)
+
+LIBRARY_PAGE_SIZE = 20
+CHUNKS_PAGE_SIZE = 200
+SEARCH_PAGE_SIZE = 20
+SUBTITLE_FETCH_SIZE = 500
+
+# Segmented transcription: wall-clock latency follows the segment length,
+# and the overlap gives words cut at a boundary a full copy in one segment
+SEGMENT_DURATION_SEC = 10 * 60
+SEGMENT_OVERLAP_SEC = 15
+SEGMENTABLE_FORMATS = ("mp3",)
+
+# Backend errors for starting a job over the account's quota, or too fast
+QUOTA_ERROR_CODES = ("LimitExceededException", "ThrottlingException")
+
+# Packed word timings, keyed by transcription id. They never change once stored:
+# chunk edits don't re-align them, see `fetch_edited_ranges`
+word_timings_cache = SizedLRUCache(
+  max_size=64 * 1024 * 1024,
+  max_entry_size=8 * 1024 * 1024,
+)
+
+# Rendered subtitle files, keyed by (transcription id, version, format)
+subtitle_cache = SubtitleCache(
+  max_size=64 * 1024 * 1024,
+  max_entry_size=4 * 1024 * 1024,
+)
+
+
+# Columns selected as plain row tuples, skipping ORM object construction
+TRANSCRIPTION_COLUMNS = (
+  Transcription.id,
+  Transcription.created_at,
+  Transcription.updated_at,
+  Transcription.is_deleted,
+  Transcription.owner_id,
+  Transcription.title,
+  Transcription.tags,
+  Transcription.duration,
+  Transcription.language,
+  Transcription.word_count,
+)
+
+TRANSCRIPTION_LIBRARY_COLUMNS = (
+  Transcription.id,
+  Transcription.created_at,
+  Transcription.updated_at,
+  Transcription.title,
+  Transcription.tags,
+  Transcription.duration,
+  Transcription.language,
+  Transcription.word_count,
+)
+
+# Order of the chunks in the full transcript. Ties in start time are broken
+# by id, so rebuilding the transcript and seeking into it agree
+TRANSCRIPT_ORDER = (
+  TranscriptionChunk.start_time.asc(),
+  TranscriptionChunk.id.asc(),
+)
+
+TRANSCRIPTION_CHUNK_COLUMNS = (
+  TranscriptionChunk.id,
+  TranscriptionChunk.created_at,
+  TranscriptionChunk.updated_at,
+  TranscriptionChunk.is_deleted,
+  TranscriptionChunk.duration,
+  TranscriptionChunk.is_edited,
+  TranscriptionChunk.transcription_id,
+  TranscriptionChunk.start_time,
+  TranscriptionChunk.end_time,
+  TranscriptionChunk.content,
+)
+
+
+def count_words(text: str) -> int:
+  return len(text.split())
+
+
+def is_unedited(tsc_id):
+  """
+  Whether none of a transcription's chunks were edited, so its text is still
+  the transcription backend's output, and can be reused for other users
+  """
+  return ~(
+    select(TranscriptionChunk.id)
+      .where(TranscriptionChunk.transcription_id == tsc_id, TranscriptionChunk.is_edited == True)
+      .exists()
+  )
+
+
+def serialize_row(row) -> dict:
+  """
+  Converts a result row into a JSON-compatible dict,
+  producing the same output as `jsonable_encoder` on the ORM object
+  """
+  serialized = {}
+
+  for key, value in row._mapping.items():
+    if isinstance(value, UUID):
+      value = str(value)
+    elif isinstance(value, datetime):
+      value = value.isoformat()
+
+    serialized[key] = value
+
+  return serialized
+
+
+class TranscriptionQuotaExceededError(RuntimeError):
+  """
+  Raised when the backend refuses to start a job over the concurrent job quota
+  """
+
+
+class TranscriptionEditConflictError(Exception):
+  """
+  Raised when edited chunks changed since the client read them
+  """
+
+  def __init__(self, chunk_ids: List[UUID]) -> None:
+    super().__init__("Chunks were changed since they were read, reload and retry")
+    self.chunk_ids = chunk_ids
 
 
 class TranscriptionService:
   POLL_INTERVAL_SEC = 5  # 5sec  x 3%/sec
 
+  def __init__(self, backend: Optional[TranscriptionBackend] = None) -> None:
+    self.backend = backend or get_transcription_backend()
+
   def generate_file_uri(self, bucket_name: str, filename: str, extension: str):
     # NOTE - Can add subbuckets in the future
     return f"s3://{bucket_name}/{filename}.{extension}"
 
-  async def get_all_transcriptions(self, transcribe_client, job_name: str):
-    job_result = transcribe_client.get_transcription_job(
-        TranscriptionJobName=job_name
-    )
+  def parse_file_uri(self, file_uri: str) -> Tuple[str, str]:
+    """
+    Splits `s3://bucket/key` into its bucket name and key
+    """
+    bucket_name, _, key = file_uri.removeprefix("s3://").partition("/")
+    return bucket_name, key
+
+  async def get_transcription_job(self, job_name: str):
+    """
+    Fetches the current state of a transcription job from the backend
+    """
+    return await self.backend.get_job(job_name)
+
+  async def get_all_transcriptions(self, job_name: str):
+    job_result = await self.get_transcription_job(job_name=job_name)
     transciption = job_result["TranscriptionJob"]["Transcript"]["TranscriptFileUri"]
     return transciption
 
-  async def poll_transcription_job(self, transcribe_client, job_name: str):
+  async def poll_transcription_job(self, job_name: str):
     max_tries = 60
     is_done = False
 
     while max_tries > 0:
       max_tries -= 1
-      job_result = transcribe_client.get_transcription_job(
-          TranscriptionJobName=job_name
-      )
+      job_result = await self.get_transcription_job(job_name=job_name)
       job_status = job_result["TranscriptionJob"]["TranscriptionJobStatus"]
 
       if job_status in ["COMPLETED", "FAILED"]:
@@ -74,10 +245,10 @@ class TranscriptionService:
         )
 
       # Set interval to poll job status
-      time.sleep(self.POLL_INTERVAL_SEC)
+      await asyncio.sleep(self.POLL_INTERVAL_SEC)
 
     if not is_done:
-        return TimeoutError("Timeout when polling the transcription results")
+        raise TimeoutError("Timeout when polling the transcription results")
 
     return job_result
   
@@ -92,93 +263,822 @@ class TranscriptionService:
 
     if user is None:
         return None
-    
-    result = []
 
-    # NOTE query optimization
+    # Two queries in total, no matter how many transcriptions the user has
+    my_transcriptions = session.execute(
+      select(*TRANSCRIPTION_COLUMNS)
+        .where(Transcription.owner_id == user.id)
+        .order_by(Transcription.created_at.desc())
+    ).all()
+
+    related_tsc_chunks = session.execute(
+      select(*TRANSCRIPTION_CHUNK_COLUMNS)
+        .join(Transcription, Transcription.id == TranscriptionChunk.transcription_id)
+        .where(Transcription.owner_id == user.id)
+        .order_by(TranscriptionChunk.transcription_id, TranscriptionChunk.start_time.asc())
+    ).all()
+
+    chunks_by_tsc_id = {}
+    for chunk in related_tsc_chunks:
+      chunks_by_tsc_id.setdefault(chunk.transcription_id, []).append(
+        serialize_row(chunk)
+      )
 
-    my_transcriptions = session.query(Transcription) \
-                            .filter(Transcription.owner_id == user.id) \
-                            .order_by(Transcription.created_at.desc()) \
-                            .all()
-    
-    for tsc in my_transcriptions:
-      # Create a new Result object to be put in result array
-      related_tsc_chunks = session.query(TranscriptionChunk) \
-          .filter(TranscriptionChunk.transcription_id == tsc.id) \
-          .order_by(TranscriptionChunk.created_at.asc()) \
-          .all()
-      
-      result_object = {
-          "transcription": jsonable_encoder(tsc),
-          "chunks": jsonable_encoder(related_tsc_chunks),
+    result = [
+      {
+        "transcription": serialize_row(tsc),
+        "chunks": chunks_by_tsc_id.get(tsc.id, []),
       }
-
-      result.append(result_object)
+      for tsc in my_transcriptions
+    ]
 
     return result
 
+  def fetch_transcription_library_page(
+    self,
+    session: Session,
+    user: User,
+    cursor: Optional[str] = None,
+    limit: int = LIBRARY_PAGE_SIZE,
+  ) -> dict:
+    """
+    Fetches one page of the user's transcriptions, newest first, without chunks.
+    Pages are keyset-paginated on (created_at, id), so every page costs the same
+    """
+    chunk_count = (
+      select(func.count(TranscriptionChunk.id))
+        .where(TranscriptionChunk.transcription_id == Transcription.id)
+        .correlate(Transcription)
+        .scalar_subquery()
+        .label("chunk_count")
+    )
+
+    query = select(*TRANSCRIPTION_LIBRARY_COLUMNS, chunk_count) \
+      .where(Transcription.owner_id == user.id, Transcription.is_deleted == False)
+
+    if cursor:
+      last_created_at, last_id = decode_cursor(cursor, size=2)
+
+      try:
+        last_key = (datetime.fromisoformat(last_created_at), UUID(last_id))
+      except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+      query = query.where(tuple_(Transcription.created_at, Transcription.id) < last_key)
+
+    rows = session.execute(
+      query.order_by(Transcription.created_at.desc(), Transcription.id.desc())
+        .limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+      rows = rows[:limit]
+      next_cursor = encode_cursor(rows[-1].created_at.isoformat(), rows[-1].id)
+
+    return {
+      "transcriptions": [serialize_row(row) for row in rows],
+      "next_cursor": next_cursor,
+    }
+
+  def fetch_transcription_chunks_page(
+    self,
+    tsc_id: UUID,
+    session: Session,
+    user: User,
+    cursor: Optional[str] = None,
+    limit: int = CHUNKS_PAGE_SIZE,
+  ) -> Optional[dict]:
+    """
+    Fetches one page of a transcription's chunks in time order.
+    Returns None if the transcription does not exist or is not the user's
+    """
+    my_transcription = session.execute(
+      select(Transcription.id)
+        .where(Transcription.id == tsc_id, Transcription.owner_id == user.id)
+    ).first()
+
+    if my_transcription is None:
+      return None
+
+    query = select(*TRANSCRIPTION_CHUNK_COLUMNS) \
+      .where(TranscriptionChunk.transcription_id == tsc_id)
+
+    if cursor:
+      last_start_time, last_id = decode_cursor(cursor, size=2)
+
+      try:
+        last_key = (float(last_start_time), UUID(last_id))
+      except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+      query = query.where(tuple_(TranscriptionChunk.start_time, TranscriptionChunk.id) > last_key)
+
+    rows = session.execute(
+      query.order_by(TranscriptionChunk.start_time.asc(), TranscriptionChunk.id.asc())
+        .limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+      rows = rows[:limit]
+      next_cursor = encode_cursor(rows[-1].start_time, rows[-1].id)
+
+    return {
+      "chunks": [serialize_row(row) for row in rows],
+      "next_cursor": next_cursor,
+    }
+
+  def fetch_transcription_chunks_in_range(
+    self,
+    tsc_id: UUID,
+    session: Session,
+    user: User,
+    t_start: float,
+    t_end: float,
+    limit: int = CHUNKS_PAGE_SIZE,
+  ) -> Optional[dict]:
+    """
+    Fetches the chunks overlapping `[t_start, t_end]` seconds, in time order.
+    Returns None if the transcription does not exist or is not the user's.
+
+    Chunks never span more than MAX_CHUNK_DURATION_SEC, so any chunk overlapping
+    the window starts within it or at most that long before it, which keeps the
+    lookup a single range scan over (transcription_id, start_time)
+    """
+    my_transcription = session.execute(
+      select(Transcription.id)
+        .where(Transcription.id == tsc_id, Transcription.owner_id == user.id)
+    ).first()
+
+    if my_transcription is None:
+      return None
+
+    rows = session.execute(
+      select(*TRANSCRIPTION_CHUNK_COLUMNS)
+        .where(
+          TranscriptionChunk.transcription_id == tsc_id,
+          TranscriptionChunk.start_time >= t_start - MAX_CHUNK_DURATION_SEC,
+          TranscriptionChunk.start_time <= t_end,
+          TranscriptionChunk.end_time >= t_start,
+        )
+        .order_by(TranscriptionChunk.start_time.asc(), TranscriptionChunk.id.asc())
+        .limit(limit + 1)
+    ).all()
+
+    is_truncated = len(rows) > limit
+
+    return {
+      "chunks": [serialize_row(row) for row in rows[:limit]],
+      "is_truncated": is_truncated,
+    }
+
+  def fetch_word_timings(
+    self,
+    tsc_id: UUID,
+    session: Session,
+    user: User,
+  ) -> Optional[WordTimings]:
+    """
+    Loads the packed word timings of a transcription. Returns None if the transcription
+    does not exist, is not the user's, or was stored without word timings
+    """
+    my_transcription = session.execute(
+      select(Transcription.id)
+        .where(Transcription.id == tsc_id, Transcription.owner_id == user.id)
+    ).first()
+
+    if my_transcription is None:
+      return None
+
+    packed = word_timings_cache.get(tsc_id)
+
+    if packed is None:
+      packed = session.execute(
+        select(TranscriptionWordTimings.data)
+          .where(TranscriptionWordTimings.transcription_id == tsc_id)
+      ).scalar_one_or_none()
+
+      if packed is None:
+        return None
+
+      # The driver may hand back a buffer tied to its row
+      packed = bytes(packed)
+      word_timings_cache.set(tsc_id, packed)
+
+    return WordTimings(packed)
+
+  def fetch_edited_ranges(
+    self,
+    tsc_id: UUID,
+    session: Session,
+    t_start: float,
+    t_end: float,
+  ) -> List[Tuple[float, float]]:
+    """
+    Time ranges of the edited chunks overlapping `[t_start, t_end]` seconds, in
+    time order. The recognizer's word timings there no longer match the text,
+    since edits only change the chunks. Found like `fetch_transcription_chunks_in_range`
+    """
+    rows = session.execute(
+      select(TranscriptionChunk.start_time, TranscriptionChunk.end_time)
+        .where(
+          TranscriptionChunk.transcription_id == tsc_id,
+          TranscriptionChunk.start_time >= t_start - MAX_CHUNK_DURATION_SEC,
+          TranscriptionChunk.start_time <= t_end,
+          TranscriptionChunk.end_time >= t_start,
+          TranscriptionChunk.is_edited == True,
+        )
+        .order_by(*TRANSCRIPT_ORDER)
+    ).all()
+
+    return [(row.start_time, row.end_time) for row in rows]
+
+  def search_transcription_chunks(
+    self,
+    session: Session,
+    user: User,
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = SEARCH_PAGE_SIZE,
+  ) -> dict:
+    """
+    Full-text searches the user's transcriptions, best matching chunks first.
+
+    `query` takes web search syntax (quoted phrases, `or`, `-word`). It is parsed
+    once per text search configuration, and each chunk is matched against the
+    parse of its own configuration; written as one `@@` per configuration, so
+    every branch is a scan of the GIN index on `search_vector`
+    """
+    search_config = TranscriptionChunk.search_config
+    search_vector = TranscriptionChunk.search_vector
+
+    tsqueries = [
+      (cast(config, REGCONFIG), func.websearch_to_tsquery(cast(config, REGCONFIG), query))
+      for config in SUPPORTED_SEARCH_CONFIGS
+    ]
+
+    is_match = or_(*[
+      and_(search_config == config, search_vector.op("@@")(tsquery))
+      for config, tsquery in tsqueries
+    ])
+    rank = case(
+      *[(search_config == config, func.ts_rank_cd(search_vector, tsquery)) for config, tsquery in tsqueries],
+      else_=0.0,
+    )
+
+    stmt = select(
+      TranscriptionChunk.id,
+      TranscriptionChunk.transcription_id,
+      Transcription.title,
+      TranscriptionChunk.start_time,
+      TranscriptionChunk.end_time,
+      TranscriptionChunk.content,
+      rank.label("rank"),
+    ) \
+      .join(Transcription, Transcription.id == TranscriptionChunk.transcription_id) \
+      .where(
+        Transcription.owner_id == user.id,
+        Transcription.is_deleted == False,
+        is_match,
+      )
+
+    if cursor:
+      last_rank, last_id = decode_cursor(cursor, size=2)
+
+      try:
+        last_key = (float(last_rank), UUID(last_id))
+      except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+      stmt = stmt.where(tuple_(rank, TranscriptionChunk.id) < last_key)
+
+    rows = session.execute(
+      stmt.order_by(rank.desc(), TranscriptionChunk.id.desc()).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+      rows = rows[:limit]
+      next_cursor = encode_cursor(rows[-1].rank, rows[-1].id)
+
+    return {
+      "results": [serialize_row(row) for row in rows],
+      "next_cursor": next_cursor,
+    }
+
   def fetch_one_transcriptions_chunks_db(
     self,
     tsc_id: UUID,
     session: Session,
-    user: User
+    user: User,
+    include_chunks: bool = True,
   ):
     """
-    Fetches all user's transcriptions from the database
+    Fetches one of the user's transcriptions with its stored full transcript,
+    and its chunks unless `include_chunks` is False.
+    Returns None if it does not exist or is not the user's
     """
 
     if user is None:
         return None
-    
-    # NOTE query optimization
-    my_transcription = session.query(Transcription) \
-                            .filter(Transcription.id == tsc_id) \
-                            .order_by(Transcription.created_at.desc()) \
-                            .first()
-    
-    # Create a new Result object to be put in result array
-    related_tsc_chunks = session.query(TranscriptionChunk) \
-        .filter(TranscriptionChunk.transcription_id == my_transcription.id) \
-        .order_by(TranscriptionChunk.created_at.asc()) \
-        .all()
-        
+
+    my_transcription = session.execute(
+      select(*TRANSCRIPTION_COLUMNS, Transcription.full_transcript)
+        .where(Transcription.id == tsc_id, Transcription.owner_id == user.id)
+    ).first()
+
+    if my_transcription is None:
+      return None
+
+    transcription = serialize_row(my_transcription)
+    full_transcript = transcription.pop("full_transcript")
+
+    related_tsc_chunks = []
+    if include_chunks:
+      related_tsc_chunks = session.execute(
+        select(*TRANSCRIPTION_CHUNK_COLUMNS)
+          .where(TranscriptionChunk.transcription_id == tsc_id)
+          .order_by(*TRANSCRIPT_ORDER)
+      ).all()
+
     result_object = {
-        "transcription": jsonable_encoder(my_transcription),
-        "chunks": jsonable_encoder(related_tsc_chunks),
+        "transcription": transcription,
+        "chunks": [serialize_row(chunk) for chunk in related_tsc_chunks],
+        "full_transcript": full_transcript,
     }
 
-
     return result_object
 
+  def refresh_full_transcript(
+    self,
+    session: Session,
+    tsc_id: UUID,
+  ) -> None:
+    """
+    Rebuilds a transcription's stored full transcript, word count and duration,
+    and its chunks' offsets into it, from its chunks.
+    Does not commit, so it can share the caller's transaction
+    """
+    chunks = session.execute(
+      select(
+        TranscriptionChunk.id,
+        TranscriptionChunk.updated_at,
+        TranscriptionChunk.content,
+        TranscriptionChunk.duration,
+      )
+        .where(TranscriptionChunk.transcription_id == tsc_id)
+        .order_by(*TRANSCRIPT_ORDER)
+    ).all()
+
+    full_transcript = " ".join(chunk.content for chunk in chunks)
+
+    session.execute(
+      update(Transcription)
+        .where(Transcription.id == tsc_id)
+        .values(
+          full_transcript=full_transcript,
+          word_count=count_words(full_transcript),
+          duration=sum(chunk.duration for chunk in chunks),
+        )
+    )
+
+    if not chunks:
+      return
+
+    offsets = []
+    transcript_offset = 0
+    for chunk in chunks:
+      # `updated_at` is the chunk's version for edits, and an offset isn't an edit
+      offsets.append({"id": chunk.id, "updated_at": chunk.updated_at, "transcript_offset": transcript_offset})
+      transcript_offset += len(chunk.content) + 1
+
+    session.execute(update(TranscriptionChunk), offsets)
+
+  def update_transcription_chunks(
+    self,
+    tsc_id: UUID,
+    session: Session,
+    user: User,
+    chunk_edits: List[TranscriptionChunkEditSchema],
+  ) -> Optional[dict]:
+    """
+    Replaces the content of a batch of chunks in one transaction.
+    Returns None if the transcription does not exist or is not the user's.
+
+    Each edit carries the chunk's `updated_at` as the client read it, and the
+    batch raises TranscriptionEditConflictError if any chunk changed since.
+    The stored full transcript is spliced at the edited chunks' stored offsets
+    within the db, and the word count adjusted by the difference, so only the
+    edited chunks are read. When an edit changes a chunk's length, the offsets
+    after it are shifted by a single UPDATE; search vectors follow on their own
+    """
+    transcription = session.execute(
+      select(Transcription.id, Transcription.word_count)
+        .where(Transcription.id == tsc_id, Transcription.owner_id == user.id)
+        .with_for_update()
+    ).first()
+
+    if transcription is None:
+      return None
+
+    edits = {edit.id: edit for edit in chunk_edits}
+
+    try:
+      current_chunks = {
+        chunk.id: chunk
+        for chunk in session.execute(
+          select(
+            TranscriptionChunk.id,
+            TranscriptionChunk.content,
+            TranscriptionChunk.updated_at,
+            TranscriptionChunk.transcript_offset,
+          )
+            .where(
+              TranscriptionChunk.transcription_id == tsc_id,
+              TranscriptionChunk.id.in_(edits.keys()),
+            )
+            .with_for_update()
+        ).all()
+      }
+
+      missing_ids = [chunk_id for chunk_id in edits if chunk_id not in current_chunks]
+      if missing_ids:
+        raise ValueError(f"Chunks not found in this transcription: {', '.join(map(str, missing_ids))}")
+
+      conflicting_ids = [
+        chunk_id for chunk_id, edit in edits.items()
+        if current_chunks[chunk_id].updated_at != edit.updated_at
+      ]
+      if conflicting_ids:
+        raise TranscriptionEditConflictError(conflicting_ids)
+
+      datetime_now = get_datetime_now_jkt()
+
+      session.execute(
+        update(TranscriptionChunk),
+        [
+          {"id": chunk_id, "content": edit.content, "is_edited": True, "updated_at": datetime_now}
+          for chunk_id, edit in edits.items()
+        ],
+      )
+
+      edited_chunks = [current_chunks[chunk_id] for chunk_id in edits]
+
+      is_spliced = all(chunk.transcript_offset is not None for chunk in edited_chunks)
+      if is_spliced:
+        is_spliced = self._splice_full_transcript(
+          session=session,
+          tsc_id=tsc_id,
+          word_count=transcription.word_count,
+          splices=[
+            (chunk.transcript_offset, chunk.content, edits[chunk.id].content)
+            for chunk in sorted(edited_chunks, key=lambda chunk: chunk.transcript_offset)
+          ],
+          updated_at=datetime_now,
+        )
+
+      if not is_spliced:
+        # The stored transcript doesn't line up with the chunks, e.g. rows
+        # older than their offsets, so it's rebuilt once
+        session.execute(
+          update(Transcription).where(Transcription.id == tsc_id).values(updated_at=datetime_now)
+        )
+        self.refresh_full_transcript(session=session, tsc_id=tsc_id)
+
+      session.commit()
+    except Exception:
+      session.rollback()
+      raise
+
+    return {
+      "transcription_id": str(tsc_id),
+      "updated_at": datetime_now.isoformat(),
+      "chunks": [
+        {"id": str(chunk_id), "content": edit.content, "is_edited": True, "updated_at": datetime_now.isoformat()}
+        for chunk_id, edit in edits.items()
+      ],
+    }
+
+  def _splice_full_transcript(
+    self,
+    session: Session,
+    tsc_id: UUID,
+    word_count: int,
+    splices: List[Tuple[int, str, str]],
+    updated_at: datetime,
+  ) -> bool:
+    """
+    Replaces `(offset, old, new)` splices, ordered by offset, in the stored
+    full transcript, and shifts the chunk offsets after them. Returns False,
+    changing nothing, if an old content isn't found at its offset
+    """
+    full_transcript = Transcription.full_transcript
+    # Unedited stretches of the stored transcript around the new contents,
+    # taken with `substr`, so the transcript is never read out of the db
+    pieces = []
+    checks = []
+    position = 0
+    word_count_delta = 0
+
+    for offset, old_content, new_content in splices:
+      if offset < position:
+        return False
+
+      pieces += [func.substr(full_transcript, position + 1, offset - position), literal(new_content)]
+      checks.append(func.substr(full_transcript, offset + 1, len(old_content)) == old_content)
+      position = offset + len(old_content)
+      word_count_delta += count_words(new_content) - count_words(old_content)
+
+    pieces.append(func.substr(full_transcript, position + 1))
+
+    result = session.execute(
+      update(Transcription)
+        .where(Transcription.id == tsc_id, *checks)
+        .values(
+          full_transcript=func.concat(*pieces),
+          word_count=word_count + word_count_delta,
+          updated_at=updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+      return False
+
+    # A chunk after an edit moves by the length changes of every edit before it
+    shifts = []
+    length_delta = 0
+    for offset, old_content, new_content in splices:
+      length_delta += len(new_content) - len(old_content)
+      if length_delta or shifts:
+        shifts.append((offset, length_delta))
+
+    if any(delta for _, delta in shifts):
+      transcript_offset = TranscriptionChunk.transcript_offset
+
+      session.execute(
+        update(TranscriptionChunk)
+          .where(
+            TranscriptionChunk.transcription_id == tsc_id,
+            transcript_offset > shifts[0][0],
+          )
+          .values(
+            transcript_offset=transcript_offset + case(
+              *[(transcript_offset > offset, delta) for offset, delta in reversed(shifts)],
+            ),
+            # An offset isn't an edit, see `updated_at` in the edits
+            updated_at=TranscriptionChunk.updated_at,
+          )
+          .execution_options(synchronize_session=False)
+      )
+
+    return True
+
+  def fetch_transcription_version(
+    self,
+    tsc_id: UUID,
+    session: Session,
+    user: User,
+  ) -> Optional[datetime]:
+    """
+    Returns the `updated_at` of one of the user's transcriptions, used as its version.
+    Returns None if it does not exist or is not the user's
+    """
+    return session.execute(
+      select(Transcription.updated_at)
+        .where(Transcription.id == tsc_id, Transcription.owner_id == user.id)
+    ).scalar_one_or_none()
+
+  def iter_transcription_subtitles(
+    self,
+    tsc_id: UUID,
+    version: datetime,
+    fmt: SubtitleFormatEnum,
+    session_factory: Callable[[], Session] = SessionLocal,
+  ) -> Iterator[str]:
+    """
+    Streams a transcription as SRT or WebVTT, cue by cue.
+
+    Chunks are read through a server-side cursor in batches, so memory stays
+    constant regardless of the recording's length. The rendered file is cached
+    per transcription version when it is small enough.
+    Uses its own session, since it outlives the request's dependencies
+    """
+    cache_key = (tsc_id, version, fmt)
+
+    cached = subtitle_cache.get(cache_key)
+    if cached is not None:
+      yield cached
+      return
+
+    # Rendered pieces are only kept while the file still fits in the cache
+    rendered: Optional[List[str]] = []
+    rendered_size = 0
+
+    session = session_factory()
+
+    try:
+      if fmt == SubtitleFormatEnum.VTT:
+        rendered.append(VTT_HEADER)
+        rendered_size += len(VTT_HEADER)
+        yield VTT_HEADER
+
+      chunks = session.execute(
+        select(
+          TranscriptionChunk.start_time,
+          TranscriptionChunk.end_time,
+          TranscriptionChunk.content,
+        )
+          .where(TranscriptionChunk.transcription_id == tsc_id)
+          .order_by(*TRANSCRIPT_ORDER)
+          .execution_options(yield_per=SUBTITLE_FETCH_SIZE)
+      )
+
+      for index, chunk in enumerate(chunks, start=1):
+        cue = render_cue(
+          index=index,
+          start_time=chunk.start_time,
+          end_time=chunk.end_time,
+          content=chunk.content,
+          fmt=fmt,
+        )
+
+        if rendered is not None:
+          rendered.append(cue)
+          rendered_size += len(cue)
+
+          if rendered_size > subtitle_cache.max_entry_size:
+            rendered = None
+
+        yield cue
+    finally:
+      session.close()
+
+    if rendered is not None:
+      subtitle_cache.set(cache_key, "".join(rendered))
+
   async def transcribe_file(
     self,
-    transcribe_client: any,
     job_name: str,
     file_uri: str,
     file_format: str,
     language_code="id-ID",
   ):
+    """
+    Starts a transcription job and returns right away.
+    Completion is tracked by the TranscriptionJobSupervisor.
+    """
     try:
-      transcribe_client.start_transcription_job(
-          TranscriptionJobName=job_name,
-          Media={"MediaFileUri": file_uri},
-          MediaFormat=file_format,
-          LanguageCode=language_code,
-      )
-
-      job_result = await self.poll_transcription_job(
-          transcribe_client=transcribe_client, job_name=job_name
+      job_result = await self.backend.start_job(
+          job_name=job_name,
+          file_uri=file_uri,
+          file_format=file_format,
+          language_code=language_code,
       )
 
       return job_result
-    except TimeoutError:
-      return TimeoutError("Timeout when polling the transcription results")
     except ClientError as e:
       print(e)
+      if e.response["Error"]["Code"] in QUOTA_ERROR_CODES:
+        raise TranscriptionQuotaExceededError("Transcription job quota exceeded.")
+
       raise RuntimeError("Transcription Job failed.")
 
-  async def insert_transcription_result(
+  async def split_segmented_transcription(
+    self,
+    job: TranscriptionJobSchema,
+    segment_service: Optional[AudioSegmentService] = None,
+    max_segments: Optional[int] = None,
+  ) -> List[TranscriptionJobSegmentSchema]:
+    """
+    Splits the job's audio into overlapping segments, to be started with
+    `start_segmented_transcription`. Audio which isn't MP3, or fits in one
+    segment, isn't split, and returns no segments. No more than `max_segments`
+    are made, longer audio gets longer segments
+    """
+    audio_segments = []
+
+    if job.file_format in SEGMENTABLE_FORMATS:
+      bucket_name, key = self.parse_file_uri(job.file_uri)
+      segment_service = segment_service or AudioSegmentService()
+
+      audio_segments = await asyncio.to_thread(
+        segment_service.split_mp3,
+        bucket_name,
+        key,
+        SEGMENT_DURATION_SEC,
+        SEGMENT_OVERLAP_SEC,
+        max_segments,
+      )
+
+    if len(audio_segments) <= 1:
+      return []
+
+    return [
+      TranscriptionJobSegmentSchema(
+        index=audio_segment.index,
+        job_name=f"{job.job_name}-part{audio_segment.index:03d}",
+        file_uri=f"s3://{bucket_name}/{segment_key}",
+        start_time=audio_segment.start_time,
+        end_time=audio_segment.end_time,
+      )
+      for audio_segment, segment_key in audio_segments
+    ]
+
+  async def delete_segmented_transcription(
+    self,
+    job: TranscriptionJobSchema,
+    segment_service: Optional[AudioSegmentService] = None,
+  ) -> None:
+    """
+    Deletes what a finished segmented job leaves behind: its segment objects
+    and the backend job of every segment. Failures are only logged, since
+    the job's result is stored without them
+    """
+    if not job.segments:
+      return
+
+    segment_service = segment_service or AudioSegmentService()
+    bucket_name, _ = self.parse_file_uri(job.file_uri)
+    segment_keys = [self.parse_file_uri(segment.file_uri)[1] for segment in job.segments]
+
+    results = await asyncio.gather(
+      asyncio.to_thread(segment_service.delete_segments, bucket_name, segment_keys),
+      *[self.delete_transcription_job(segment.job_name) for segment in job.segments],
+      return_exceptions=True,
+    )
+
+    for result in results:
+      if isinstance(result, Exception):
+        print(f"Error while deleting segments of job {job.job_name}: {result}")
+
+  async def preprocess_transcription(
+    self,
+    job: TranscriptionJobSchema,
+    preprocess_service: Optional[AudioPreprocessService] = None,
+  ) -> None:
+    """
+    Replaces the job's audio with its pre-processed version, see
+    `AudioPreprocessService`, and keeps the offsets back onto the original in the job
+    """
+    bucket_name, key = self.parse_file_uri(job.file_uri)
+    preprocess_service = preprocess_service or AudioPreprocessService()
+
+    processed_key, offset_map = await asyncio.to_thread(
+      preprocess_service.preprocess, bucket_name, key
+    )
+
+    job.source_file_uri = job.file_uri
+    job.file_uri = f"s3://{bucket_name}/{processed_key}"
+    job.file_format = "mp3"
+    job.time_offsets = offset_map.to_pairs()
+
+  async def delete_preprocessed_transcription(
+    self,
+    job: TranscriptionJobSchema,
+    preprocess_service: Optional[AudioPreprocessService] = None,
+  ) -> None:
+    """
+    Deletes a finished job's pre-processed audio, keeping the upload.
+    Failures are only logged, like `delete_segmented_transcription`
+    """
+    if job.source_file_uri is None:
+      return
+
+    bucket_name, key = self.parse_file_uri(job.source_file_uri)
+    preprocess_service = preprocess_service or AudioPreprocessService()
+
+    try:
+      await asyncio.to_thread(preprocess_service.delete_processed, bucket_name, key)
+    except Exception as e:
+      print(f"Error while deleting pre-processed audio of job {job.job_name}: {e}")
+
+  async def start_segmented_transcription(self, job: TranscriptionJobSchema) -> None:
+    """
+    Starts a transcription job per segment concurrently, or the job
+    under its own name if its audio wasn't split
+    """
+    if not job.segments:
+      await self.transcribe_file(
+        job_name=job.job_name,
+        file_uri=job.file_uri,
+        file_format=job.file_format,
+        language_code=job.language_code,
+      )
+      return
+
+    await asyncio.gather(*[
+      self.transcribe_file(
+        job_name=segment.job_name,
+        file_uri=segment.file_uri,
+        file_format=job.file_format,
+        language_code=job.language_code,
+      )
+      for segment in job.segments
+    ])
+
+  def insert_transcription_result(
     self,
     session: Session,
     transcription_data: TranscriptionSchema,
@@ -200,7 +1100,7 @@ class TranscriptionService:
     finally:
       session.close()
 
-  async def insert_transcription_chunks(
+  def insert_transcription_chunks(
     self, 
     session: Session, 
     transcription_chunk_data: TranscriptionChunksSchema
@@ -223,12 +1123,190 @@ class TranscriptionService:
     finally:
         session.close()
 
-  async def _fetch_transcription_data(self, transcribe_client, job_name: str):
-    response = await self.get_all_transcriptions(
-        transcribe_client=transcribe_client, job_name=job_name
+  def insert_transcription_chunks_bulk(
+    self,
+    session: Session,
+    transcription_chunks: List[TranscriptionChunksSchema],
+    search_config: str = DEFAULT_SEARCH_CONFIG,
+  ) -> int:
+    """
+    Inserts many Transcription Chunks with a single executemany statement,
+    indexed for search with `search_config`.
+    Does not commit, so it can share the caller's transaction
+    """
+    if not transcription_chunks:
+      return 0
+
+    session.execute(
+      insert(TranscriptionChunk),
+      [
+        {**chunk.model_dump(), "search_config": search_config}
+        for chunk in transcription_chunks
+      ],
+    )
+
+    return len(transcription_chunks)
+
+  def store_transcription_result(
+    self,
+    session: Session,
+    transcription_data: TranscriptionSchema,
+    transcription_chunks: List[TranscriptionChunksSchema],
+    word_timings: Optional[WordTimingsBuilder] = None,
+  ) -> Transcription:
+    """
+    Stores a Transcription, all of its chunks and its word timings to the db in one transaction.
+    The Transcription is flushed first, since the rest keep a ForeignKey to it
+    """
+    db_tsc = Transcription(**transcription_data.model_dump())
+
+    try:
+      session.add(db_tsc)
+      session.flush()
+
+      self.insert_transcription_chunks_bulk(
+        session=session,
+        transcription_chunks=transcription_chunks,
+        search_config=get_search_config(transcription_data.language),
+      )
+
+      if word_timings is not None:
+        session.execute(
+          insert(TranscriptionWordTimings).values(
+            transcription_id=db_tsc.id,
+            created_at=transcription_data.created_at,
+            word_count=len(word_timings),
+            data=word_timings.pack(),
+          )
+        )
+
+      session.commit()
+      session.refresh(db_tsc)
+
+      return db_tsc
+    except Exception as e:
+      session.rollback()
+      raise RuntimeError(f"Error while inserting Transcription to DB: {e}")
+
+  def find_transcription_by_content(
+    self,
+    session: Session,
+    content_hash: str,
+    language: str,
+  ) -> Optional[UUID]:
+    """
+    Returns the id of a stored, unedited transcription of identical audio in the same language, if any
+    """
+    return session.execute(
+      select(Transcription.id)
+        .where(
+          Transcription.content_hash == content_hash,
+          Transcription.language == language,
+          Transcription.is_deleted == False,
+          is_unedited(Transcription.id),
+        )
+        .limit(1)
+    ).scalar_one_or_none()
+
+  def clone_transcription(
+    self,
+    session: Session,
+    source_id: UUID,
+    job: TranscriptionJobSchema,
+  ) -> Optional[Transcription]:
+    """
+    Stores a job's transcription as a copy of the transcription of identical
+    audio, with its chunks and word timings copied over within the db.
+    The copy keeps the source's chunking.
+
+    Only the backend's output is copied, so returns None if the source was
+    edited since it was found. The source is locked against edits until then
+    """
+    source = session.execute(
+      select(Transcription)
+        .where(Transcription.id == source_id, is_unedited(Transcription.id))
+        .with_for_update(read=True)
+    ).scalar_one_or_none()
+
+    if source is None:
+      session.rollback()
+      return None
+
+    tsc_datetime_now = get_datetime_now_jkt()
+    db_tsc = Transcription(
+      id=job.transcription_id,
+      created_at=tsc_datetime_now,
+      updated_at=tsc_datetime_now,
+      is_deleted=False,
+      owner_id=job.owner_id,
+      title=job.title,
+      tags=job.tags,
+      duration=source.duration,
+      language=source.language,
+      full_transcript="",
+      word_count=0,
+      content_hash=source.content_hash,
     )
-    aws_link = requests.get(response)
-    return aws_link.json()
+
+    chunk_columns = [
+      TranscriptionChunk.is_deleted,
+      TranscriptionChunk.duration,
+      TranscriptionChunk.start_time,
+      TranscriptionChunk.end_time,
+      TranscriptionChunk.content,
+      TranscriptionChunk.search_config,
+    ]
+
+    try:
+      session.add(db_tsc)
+      session.flush()
+
+      session.execute(
+        insert(TranscriptionChunk).from_select(
+          ["id", "created_at", "updated_at", "transcription_id", "is_edited"]
+          + [column.key for column in chunk_columns],
+          select(
+            func.gen_random_uuid(),
+            literal(tsc_datetime_now),
+            literal(tsc_datetime_now),
+            literal(db_tsc.id),
+            literal(False),
+            *chunk_columns,
+          ).where(TranscriptionChunk.transcription_id == source_id),
+        )
+      )
+
+      # From the copied chunks, rather than the source's stored transcript
+      self.refresh_full_transcript(session=session, tsc_id=db_tsc.id)
+
+      session.execute(
+        insert(TranscriptionWordTimings).from_select(
+          ["transcription_id", "created_at", "word_count", "data"],
+          select(
+            literal(db_tsc.id),
+            literal(tsc_datetime_now),
+            TranscriptionWordTimings.word_count,
+            TranscriptionWordTimings.data,
+          ).where(TranscriptionWordTimings.transcription_id == source_id),
+        )
+      )
+
+      session.commit()
+      session.refresh(db_tsc)
+
+      return db_tsc
+    except Exception as e:
+      session.rollback()
+      raise RuntimeError(f"Error while copying Transcription in DB: {e}")
+
+  async def _fetch_transcription_data(self, job_name: str):
+    return await self.backend.fetch_transcript(job_name)
+
+  def iter_transcription_items(self, job_name: str) -> AsyncIterator[dict]:
+    """
+    Streams `results.items` of a completed job's transcript
+    """
+    return self.backend.iter_transcript_items(job_name)
   
   def convert_chunks_into_full_transcript(
     self, 
@@ -236,33 +1314,97 @@ class TranscriptionService:
     session: Session,
     user: User,
   ):
-    transcription_data = self.fetch_one_transcriptions_chunks_db(
-      tsc_id=tsc_id,
-      session=session,
-      user=user,
+    """
+    Returns the full transcript stored alongside the transcription
+    """
+    full_transcript = session.execute(
+      select(Transcription.full_transcript)
+        .where(Transcription.id == tsc_id, Transcription.owner_id == user.id)
+    ).scalar_one_or_none()
+
+    return full_transcript
+
+  async def retrieve_grouped_chunks_from_job_name(
+    self,
+    job_name: str,
+    strategy: ChunkGroupingStrategyEnum = DEFAULT_STRATEGY,
+    word_timings: Optional[WordTimingsBuilder] = None,
+    time_map: Optional[TimeOffsetMap] = None,
+  ) -> List[GroupedChunk]:
+    """
+    Groups a completed job's items into chunks while its transcript is still downloading.
+    Every item is also fed to `word_timings`, if given. Item times are mapped
+    onto the original audio with `time_map`, for pre-processed audio
+    """
+    grouper = ChunkGrouper(strategy=strategy)
+    grouped_chunks: List[GroupedChunk] = []
+
+    async for item in self.iter_transcription_items(job_name=job_name):
+      if time_map is not None:
+        item = time_map.map_item(item)
+
+      if word_timings is not None:
+        word_timings.feed(item)
+
+      chunk = grouper.feed(item)
+      if chunk is not None:
+        grouped_chunks.append(chunk)
+
+    last_chunk = grouper.flush()
+    if last_chunk is not None:
+      grouped_chunks.append(last_chunk)
+
+    return grouped_chunks
+
+  async def retrieve_grouped_chunks_from_segments(
+    self,
+    segments: List[TranscriptionJobSegmentSchema],
+    strategy: ChunkGroupingStrategyEnum = DEFAULT_STRATEGY,
+    word_timings: Optional[WordTimingsBuilder] = None,
+    time_map: Optional[TimeOffsetMap] = None,
+  ) -> List[GroupedChunk]:
+    """
+    Stitches the items of a segmented job's completed segments back onto
+    the source audio's timeline, see `SegmentItemStitcher`, and groups them into chunks.
+    Every stitched item is also fed to `word_timings`, if given. Stitched
+    times are mapped onto the original audio with `time_map`, for pre-processed audio
+    """
+    stitcher = SegmentItemStitcher(
+      [(segment.start_time, segment.end_time) for segment in segments]
     )
+    grouper = ChunkGrouper(strategy=strategy)
+    grouped_chunks: List[GroupedChunk] = []
 
-    chunks = transcription_data["chunks"]
+    for segment in segments:
+      stitcher.begin_segment(segment.index)
 
-    temp_transcripts = []
+      async for item in self.iter_transcription_items(job_name=segment.job_name):
+        item = stitcher.feed(item)
+        if item is None:
+          continue
 
-    for i in range(len(chunks)):
-      transcript_text = chunks[i]["content"]
-      temp_transcripts.append(transcript_text)
+        if time_map is not None:
+          item = time_map.map_item(item)
 
-    full_transcript = " ".join(temp_transcripts)
+        if word_timings is not None:
+          word_timings.feed(item)
 
-    return full_transcript
+        chunk = grouper.feed(item)
+        if chunk is not None:
+          grouped_chunks.append(chunk)
+
+    last_chunk = grouper.flush()
+    if last_chunk is not None:
+      grouped_chunks.append(last_chunk)
+
+    return grouped_chunks
 
   # NOTE can be replaced, since we have API which fetches by id 
   async def retrieve_formatted_transcription_from_job_name(
     self, 
-    transcribe_client, 
     job_name: str
   ):
-    transcription_data = await self._fetch_transcription_data(
-        transcribe_client, job_name
-    )
+    transcription_data = await self._fetch_transcription_data(job_name)
 
     job_name = transcription_data.get("jobName")
 
@@ -284,7 +1426,15 @@ class TranscriptionService:
 
     items = transcription_data.get("results", {}).get("items", [])
 
-    grouped_items = self.generate_grouped_items_and_format_chunks(items=items)
+    grouped_items = [
+      {
+        "content": chunk.content,
+        "start_time": str(chunk.start_time),
+        "end_time": str(chunk.end_time),
+        "duration": "{:.2f}".format(chunk.duration),
+      }
+      for chunk in self.generate_grouped_items_and_format_chunks(items=items)
+    ]
 
     response = {
         "jobName": job_name,
@@ -298,55 +1448,37 @@ class TranscriptionService:
   def generate_grouped_items_and_format_chunks(
     self,
     items: Union[List[TranscriptionChunkItemSchema], None],
-  ) -> List[ServiceRetrieveTranscriptionChunkItemSchema]:
-    grouped_items = []
-    temp_group = []
-
-    for index, item in enumerate(items):
-      if item.get("type") == "pronunciation":
-        temp_group.append(item)
-
-        if len(temp_group) == 5 or index == len(items) - 1:
-          contents = " ".join(
-              [i.get("alternatives")[0].get("content") for i in temp_group]
-          )
-
-          start_time = temp_group[0].get("start_time")
-          end_time = temp_group[-1].get("end_time")
-          duration = float(end_time) - float(start_time)
-
-          tsc_chunk_formatted: ServiceRetrieveTranscriptionChunkItemSchema = \
-            ServiceRetrieveTranscriptionChunkItemSchema(
-              content=str(contents),
-              start_time=str(start_time),
-              end_time=str(end_time),
-              duration="{:.2f}".format(duration),
-            )
-          
-          grouped_items.append(tsc_chunk_formatted)
-
-          temp_group = []
-
-    return grouped_items
+    strategy: ChunkGroupingStrategyEnum = DEFAULT_STRATEGY,
+    **options,
+  ) -> List[GroupedChunk]:
+    """
+    Groups AWS Transcribe items into chunks in a single pass, see `ChunkGrouper`
+    """
+    return group_transcript_items(items or [], strategy=strategy, **options)
 
   def generate_transcription_chunks(
       self,
       transcription_id: UUID,
-      items: Union[List[ServiceRetrieveTranscriptionChunkItemSchema], None],
+      items: Union[List[GroupedChunk], List[ServiceRetrieveTranscriptionChunkItemSchema], None],
   ) -> GenerateTranscriptionChunksResponseSchema:
     """
     Generate TranscriptionChunk objects and total duration
-    from a list of ServiceRetrieveTranscriptionChunkItemSchema items
+    from a list of grouped chunks
     """
 
     total_duration = 0
     chunks: List[TranscriptionChunksSchema] = []
+    contents: List[str] = []
+    transcript_offset = 0
+
+    # Chunks of one transcription share a timestamp, and are built with
+    # `model_construct` since every field here is already well-typed
+    datetime_now_jkt = get_datetime_now_jkt()
 
     for item in items:
-      datetime_now_jkt = get_datetime_now_jkt()
       chunk_duration = float(item.duration)
 
-      chunk = TranscriptionChunksSchema(
+      chunk = TranscriptionChunksSchema.model_construct(
           id=uuid.uuid4(),
           created_at=datetime_now_jkt,
           updated_at=datetime_now_jkt,
@@ -357,23 +1489,27 @@ class TranscriptionService:
           end_time=float(item.end_time),
           duration=chunk_duration,
           is_edited=False,  
+          transcript_offset=transcript_offset,
       )
 
-      # Use `append` to correctly add the object to chunks list
       chunks.append(chunk)
+      contents.append(item.content)
+      transcript_offset += len(item.content) + 1
 
       total_duration += chunk_duration
 
-    response = GenerateTranscriptionChunksResponseSchema(
+    full_transcript = " ".join(contents)
+
+    response = GenerateTranscriptionChunksResponseSchema.model_construct(
       duration=total_duration,
       chunks=chunks,
+      full_transcript=full_transcript,
+      word_count=count_words(full_transcript),
     )
 
     return response
 
-  async def delete_transcription_job(self, transcribe_client, job_name: str):
-    response = transcribe_client.delete_transcription_job(
-        TranscriptionJobName=job_name,
-    )
+  async def delete_transcription_job(self, job_name: str):
+    response = await self.backend.delete_job(job_name)
     
     return response
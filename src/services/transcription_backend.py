@@ -0,0 +1,466 @@
+import asyncio
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+from src.utils.time import get_datetime_now_jkt
+from src.utils.http import get_http_client
+from src.utils.json_stream import JSONArrayStreamParser
+from src.utils.aws.transcribe import AWSTranscribeClient
+from src.utils.settings import (
+  TRANSCRIPTION_BACKEND,
+  LOCAL_TRANSCRIBE_LATENCY_SEC,
+  LOCAL_TRANSCRIBE_AUDIO_DURATION_SEC,
+  LOCAL_TRANSCRIBE_WORDS_PER_SEC,
+  LOCAL_TRANSCRIBE_ITEMS_PER_SEC,
+  LOCAL_TRANSCRIBE_FAILURE_RATE,
+  LOCAL_TRANSCRIBE_MAX_RUNNING_JOBS,
+)
+
+
+class TranscriptionBackendEnum(str, Enum):
+  AWS = "aws"
+  LOCAL = "local"
+
+
+class TranscriptionBackend(ABC):
+  """
+  The speech-to-text engine behind TranscriptionService.
+
+  Job responses keep the shape of boto3's `get_transcription_job`, and items
+  the shape of AWS Transcribe `results.items`, so callers never branch on the backend.
+  Backend errors are raised as botocore `ClientError`.
+  """
+
+  @abstractmethod
+  async def start_job(
+    self,
+    job_name: str,
+    file_uri: str,
+    file_format: str,
+    language_code: str,
+  ) -> dict:
+    ...
+
+  @abstractmethod
+  async def get_job(self, job_name: str) -> dict:
+    ...
+
+  @abstractmethod
+  async def delete_job(self, job_name: str) -> dict:
+    ...
+
+  @abstractmethod
+  async def fetch_transcript(self, job_name: str) -> dict:
+    """
+    Returns a completed job's whole transcript document
+    """
+    ...
+
+  @abstractmethod
+  def iter_transcript_items(self, job_name: str) -> AsyncIterator[dict]:
+    """
+    Streams a completed job's `results.items`
+    """
+    ...
+
+  def subscribe(self, listener: Callable[[dict], any]) -> bool:
+    """
+    Backends which push job state changes in-process call `listener` with
+    an EventBridge "Transcribe Job State Change" event, and return True.
+    AWS pushes them through POST /v1/transcription/events instead
+    """
+    return False
+
+
+class AWSTranscriptionBackend(TranscriptionBackend):
+  """
+  AWS Transcribe. boto3 calls run in the default executor,
+  and transcript documents are downloaded with the shared httpx client.
+  """
+
+  def __init__(self, client_factory: Callable[[], any] = None) -> None:
+    self._client_factory = client_factory or (
+      lambda: AWSTranscribeClient().get_client()
+    )
+    self._client = None
+
+  @property
+  def client(self):
+    if self._client is None:
+      self._client = self._client_factory()
+
+    return self._client
+
+  async def start_job(
+    self,
+    job_name: str,
+    file_uri: str,
+    file_format: str,
+    language_code: str,
+  ) -> dict:
+    return await asyncio.to_thread(
+      self.client.start_transcription_job,
+      TranscriptionJobName=job_name,
+      Media={"MediaFileUri": file_uri},
+      MediaFormat=file_format,
+      LanguageCode=language_code,
+    )
+
+  async def get_job(self, job_name: str) -> dict:
+    return await asyncio.to_thread(
+      self.client.get_transcription_job,
+      TranscriptionJobName=job_name,
+    )
+
+  async def delete_job(self, job_name: str) -> dict:
+    return await asyncio.to_thread(
+      self.client.delete_transcription_job,
+      TranscriptionJobName=job_name,
+    )
+
+  async def _get_transcript_uri(self, job_name: str) -> str:
+    job_result = await self.get_job(job_name)
+    return job_result["TranscriptionJob"]["Transcript"]["TranscriptFileUri"]
+
+  async def fetch_transcript(self, job_name: str) -> dict:
+    transcript_uri = await self._get_transcript_uri(job_name)
+
+    response = await get_http_client().get(transcript_uri)
+    response.raise_for_status()
+    return response.json()
+
+  async def iter_transcript_items(self, job_name: str) -> AsyncIterator[dict]:
+    """
+    Parses items as the transcript document's bytes arrive,
+    instead of loading the whole document
+    """
+    transcript_uri = await self._get_transcript_uri(job_name)
+
+    parser = JSONArrayStreamParser(key="items")
+
+    async with get_http_client().stream("GET", transcript_uri) as response:
+      response.raise_for_status()
+
+      async for data in response.aiter_bytes():
+        for item in parser.feed(data):
+          yield item
+
+        if parser.is_done:
+          break
+
+    if not parser.is_done:
+      parser.close()
+
+
+LOCAL_WORDS = [
+  "hari", "ini", "kita", "akan", "belajar", "tentang", "aljabar", "linear",
+  "matriks", "vektor", "nilai", "eigen", "yang", "dan", "adalah", "sebuah",
+  "contoh", "persamaan", "solusi", "ruang", "basis", "dimensi", "transformasi",
+]
+
+DEFAULT_LOCAL_WORDS_PER_SEC = 2.5
+
+
+def generate_transcript_items(
+  duration_sec: float,
+  words_per_sec: float = DEFAULT_LOCAL_WORDS_PER_SEC,
+  seed=0,
+) -> Iterator[dict]:
+  """
+  Yields AWS Transcribe `results.items` for `duration_sec` seconds of synthetic speech.
+
+  About `words_per_sec` words per second, with short pauses between words,
+  a comma now and then, a sentence end every 8-20 words,
+  and a longer silence roughly every 60 words
+  """
+  rng = random.Random(seed)
+  slot = 1 / words_per_sec
+  start_time = 0.0
+  words_until_sentence_end = rng.randint(8, 20)
+
+  while True:
+    end_time = start_time + slot * rng.uniform(0.5, 0.95)
+    if end_time > duration_sec:
+      break
+
+    yield {
+      "type": "pronunciation",
+      "start_time": f"{start_time:.3f}",
+      "end_time": f"{end_time:.3f}",
+      "alternatives": [{"confidence": f"{rng.uniform(0.8, 1.0):.4f}", "content": rng.choice(LOCAL_WORDS)}],
+    }
+    start_time = end_time + slot * rng.uniform(0.05, 0.5)
+
+    words_until_sentence_end -= 1
+    if words_until_sentence_end == 0:
+      punctuation = "?" if rng.random() < 0.1 else "."
+      words_until_sentence_end = rng.randint(8, 20)
+    elif rng.random() < 0.05:
+      punctuation = ","
+    else:
+      punctuation = None
+
+    if punctuation is not None:
+      yield {"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": punctuation}]}
+
+    if rng.random() < 1 / 60:
+      start_time += rng.uniform(1.0, 3.0)
+
+
+@dataclass
+class LocalTranscriptionJob:
+  job_name: str
+  file_uri: str
+  file_format: str
+  language_code: str
+  started_at: float
+  will_fail: bool
+
+
+class LocalTranscriptionBackend(TranscriptionBackend):
+  """
+  An in-process stand-in for AWS Transcribe, for load tests and benchmarks.
+
+  Jobs complete `latency_sec` after they are started, with a deterministic
+  transcript (seeded by the job name) of `audio_duration_sec` seconds at
+  about `words_per_sec` words per second. Items are streamed at up to
+  `items_per_sec` (0 for unthrottled), and a `failure_rate` share of jobs fail.
+  Like an account quota, starting more than `max_running_jobs` (0 for unlimited)
+  jobs at once fails with LimitExceededException.
+  Subscribers get a state change event as each job finishes.
+  Nothing leaves the process, so the measured cost is the pipeline's own.
+  """
+
+  ITEMS_PER_BATCH = 500
+
+  def __init__(
+    self,
+    latency_sec: float = 2.0,
+    audio_duration_sec: float = 600.0,
+    words_per_sec: float = DEFAULT_LOCAL_WORDS_PER_SEC,
+    items_per_sec: float = 0.0,
+    failure_rate: float = 0.0,
+    max_running_jobs: int = 0,
+  ) -> None:
+    self.latency_sec = latency_sec
+    self.audio_duration_sec = audio_duration_sec
+    self.words_per_sec = words_per_sec
+    self.items_per_sec = items_per_sec
+    self.failure_rate = failure_rate
+    self.max_running_jobs = max_running_jobs
+
+    self._jobs: Dict[str, LocalTranscriptionJob] = {}
+    self._listeners: List[Callable[[dict], any]] = []
+
+  def subscribe(self, listener: Callable[[dict], any]) -> bool:
+    if listener not in self._listeners:
+      self._listeners.append(listener)
+
+    return True
+
+  def _emit_state_change(self, job_name: str) -> None:
+    job = self._jobs.get(job_name)
+    if job is None:
+      return
+
+    status = self._status(job)
+    if status == "IN_PROGRESS":
+      # Timers may fire a hair early
+      asyncio.get_running_loop().call_later(0.001, self._emit_state_change, job_name)
+      return
+
+    detail = {"TranscriptionJobName": job_name, "TranscriptionJobStatus": status}
+    if status == "FAILED":
+      detail["FailureReason"] = "Local backend simulated a failed job."
+
+    event = {
+      "version": "0",
+      "id": str(uuid.uuid4()),
+      "detail-type": "Transcribe Job State Change",
+      "source": "aws.transcribe",
+      "account": "local",
+      "time": get_datetime_now_jkt().isoformat(),
+      "region": "local",
+      "resources": [],
+      "detail": detail,
+    }
+
+    for listener in self._listeners:
+      try:
+        listener(event)
+      except Exception as e:
+        print(f"Transcription event listener failed: {e}")
+
+  def _error(self, code: str, message: str, operation_name: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation_name)
+
+  def _get(self, job_name: str, operation_name: str) -> LocalTranscriptionJob:
+    job = self._jobs.get(job_name)
+
+    if job is None:
+      raise self._error(
+        "BadRequestException",
+        "The requested job couldn't be found. Check the job name and try your request again.",
+        operation_name,
+      )
+
+    return job
+
+  def _status(self, job: LocalTranscriptionJob) -> str:
+    if time.monotonic() - job.started_at < self.latency_sec:
+      return "IN_PROGRESS"
+
+    return "FAILED" if job.will_fail else "COMPLETED"
+
+  def _job_response(self, job: LocalTranscriptionJob) -> dict:
+    status = self._status(job)
+
+    transcription_job = {
+      "TranscriptionJobName": job.job_name,
+      "TranscriptionJobStatus": status,
+      "LanguageCode": job.language_code,
+      "MediaFormat": job.file_format,
+      "Media": {"MediaFileUri": job.file_uri},
+    }
+
+    if status == "COMPLETED":
+      transcription_job["Transcript"] = {"TranscriptFileUri": f"local://{job.job_name}.json"}
+    elif status == "FAILED":
+      transcription_job["FailureReason"] = "Local backend simulated a failed job."
+
+    return {"TranscriptionJob": transcription_job}
+
+  def _completed(self, job_name: str, operation_name: str) -> LocalTranscriptionJob:
+    job = self._get(job_name, operation_name)
+
+    if self._status(job) != "COMPLETED":
+      raise self._error("BadRequestException", "The transcription job has not completed.", operation_name)
+
+    return job
+
+  def _generate_items(self, job: LocalTranscriptionJob) -> Iterator[dict]:
+    return generate_transcript_items(
+      self.audio_duration_sec, words_per_sec=self.words_per_sec, seed=job.job_name
+    )
+
+  async def start_job(
+    self,
+    job_name: str,
+    file_uri: str,
+    file_format: str,
+    language_code: str,
+  ) -> dict:
+    if job_name in self._jobs:
+      raise self._error(
+        "ConflictException",
+        "The requested job name already exists. Use a different job name.",
+        "StartTranscriptionJob",
+      )
+
+    if self.max_running_jobs and self.running_jobs() >= self.max_running_jobs:
+      raise self._error(
+        "LimitExceededException",
+        "You have reached your limit of concurrent transcription jobs.",
+        "StartTranscriptionJob",
+      )
+
+    job = LocalTranscriptionJob(
+      job_name=job_name,
+      file_uri=file_uri,
+      file_format=file_format,
+      language_code=language_code,
+      started_at=time.monotonic(),
+      will_fail=random.Random(job_name).random() < self.failure_rate,
+    )
+    self._jobs[job_name] = job
+
+    if self._listeners:
+      asyncio.get_running_loop().call_later(self.latency_sec, self._emit_state_change, job_name)
+
+    return self._job_response(job)
+
+  def running_jobs(self) -> int:
+    return sum(1 for job in self._jobs.values() if self._status(job) == "IN_PROGRESS")
+
+  async def get_job(self, job_name: str) -> dict:
+    return self._job_response(self._get(job_name, "GetTranscriptionJob"))
+
+  async def delete_job(self, job_name: str) -> dict:
+    self._get(job_name, "DeleteTranscriptionJob")
+    del self._jobs[job_name]
+
+    return {}
+
+  async def fetch_transcript(self, job_name: str) -> dict:
+    job = self._completed(job_name, "GetTranscript")
+    items = list(self._generate_items(job))
+
+    transcript = ""
+    for item in items:
+      content = item["alternatives"][0]["content"]
+      if item["type"] == "pronunciation" and transcript:
+        transcript += " "
+      transcript += content
+
+    return {
+      "jobName": job.job_name,
+      "accountId": "local",
+      "status": "COMPLETED",
+      "results": {"transcripts": [{"transcript": transcript}], "items": items},
+    }
+
+  async def iter_transcript_items(self, job_name: str) -> AsyncIterator[dict]:
+    """
+    Yields to the event loop every ITEMS_PER_BATCH items, the way a download
+    arrives in network reads, sleeping as needed to hold `items_per_sec`
+    """
+    job = self._completed(job_name, "GetTranscript")
+    batch_delay = self.ITEMS_PER_BATCH / self.items_per_sec if self.items_per_sec > 0 else 0
+
+    for index, item in enumerate(self._generate_items(job), start=1):
+      yield item
+
+      if index % self.ITEMS_PER_BATCH == 0:
+        await asyncio.sleep(batch_delay)
+
+
+def create_transcription_backend(name: str = None) -> TranscriptionBackend:
+  """
+  Builds the backend named by `name`, or by the TRANSCRIPTION_BACKEND setting
+  """
+  backend = TranscriptionBackendEnum(name or TRANSCRIPTION_BACKEND or TranscriptionBackendEnum.AWS)
+
+  if backend == TranscriptionBackendEnum.LOCAL:
+    return LocalTranscriptionBackend(
+      latency_sec=float(LOCAL_TRANSCRIBE_LATENCY_SEC or 2.0),
+      audio_duration_sec=float(LOCAL_TRANSCRIBE_AUDIO_DURATION_SEC or 600.0),
+      words_per_sec=float(LOCAL_TRANSCRIBE_WORDS_PER_SEC or DEFAULT_LOCAL_WORDS_PER_SEC),
+      items_per_sec=float(LOCAL_TRANSCRIBE_ITEMS_PER_SEC or 0.0),
+      failure_rate=float(LOCAL_TRANSCRIBE_FAILURE_RATE or 0.0),
+      max_running_jobs=int(LOCAL_TRANSCRIBE_MAX_RUNNING_JOBS or 0),
+    )
+
+  return AWSTranscriptionBackend()
+
+
+_transcription_backend: Optional[TranscriptionBackend] = None
+
+
+def get_transcription_backend() -> TranscriptionBackend:
+  """
+  Returns the process-wide backend, so jobs started by one request
+  can be followed by the supervisor and by later requests
+  """
+  global _transcription_backend
+
+  if _transcription_backend is None:
+    _transcription_backend = create_transcription_backend()
+
+  return _transcription_backend
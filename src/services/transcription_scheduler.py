@@ -0,0 +1,125 @@
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, NamedTuple, Optional
+
+
+class QueuedTranscription(NamedTuple):
+  owner_id: Hashable
+  job_name: str
+  # Backend jobs it runs, a segmented job runs one per segment
+  weight: int
+
+
+class TranscriptionScheduler:
+  """
+  Admission control for backend transcription jobs, so no more than
+  `max_running` run at once, below the account's concurrent job quota.
+
+  Jobs wait in a queue per user, and are admitted round-robin across users:
+  one user's burst can't hold everyone else back. Within a user's queue,
+  and at the head of the rotation, order is kept even when the next job
+  has to wait for several slots, so a heavy job can't be starved.
+
+  Runs on the event loop alone, so nothing here is locked.
+  """
+
+  def __init__(self, max_running: int) -> None:
+    self.max_running = max(max_running, 1)
+    self.running = 0
+
+    # Users in rotation order, each with their queued jobs in order
+    self._queues: OrderedDict[Hashable, Deque[QueuedTranscription]] = OrderedDict()
+    self._queued: Dict[str, QueuedTranscription] = {}
+
+  def __len__(self) -> int:
+    return len(self._queued)
+
+  def __contains__(self, job_name: str) -> bool:
+    return job_name in self._queued
+
+  def enqueue(self, owner_id: Hashable, job_name: str, weight: int = 1, front: bool = False) -> None:
+    """
+    Queues a job behind its user's other jobs, or ahead of them with `front`,
+    for a job which was admitted but couldn't be started. A job heavier than
+    the limit could never be admitted, and is refused
+    """
+    if weight > self.max_running:
+      raise ValueError(f"Job weight {weight} exceeds the limit of {self.max_running} running jobs.")
+
+    entry = QueuedTranscription(owner_id, job_name, max(weight, 1))
+
+    queue = self._queues.get(owner_id)
+    if queue is None:
+      queue = self._queues[owner_id] = deque()
+      if front:
+        self._queues.move_to_end(owner_id, last=False)
+
+    if front:
+      queue.appendleft(entry)
+    else:
+      queue.append(entry)
+
+    self._queued[job_name] = entry
+
+  def remove(self, job_name: str) -> bool:
+    entry = self._queued.pop(job_name, None)
+    if entry is None:
+      return False
+
+    queue = self._queues[entry.owner_id]
+    queue.remove(entry)
+    if not queue:
+      del self._queues[entry.owner_id]
+
+    return True
+
+  def admit(self) -> Optional[QueuedTranscription]:
+    """
+    Takes the next job in turn and counts its slots as running,
+    or returns None if it doesn't fit yet
+    """
+    if not self._queues:
+      return None
+
+    owner_id, queue = next(iter(self._queues.items()))
+    entry = queue[0]
+
+    if self.running + entry.weight > self.max_running:
+      return None
+
+    queue.popleft()
+    del self._queued[entry.job_name]
+
+    if queue:
+      self._queues.move_to_end(owner_id)
+    else:
+      del self._queues[owner_id]
+
+    self.running += entry.weight
+
+    return entry
+
+  def release(self, weight: int = 1) -> None:
+    self.running = max(self.running - weight, 0)
+
+  def position(self, job_name: str) -> Optional[int]:
+    """
+    1-based place of a queued job in admission order, or None if it isn't queued.
+    In every round of the rotation, each user with jobs left has one admitted
+    """
+    entry = self._queued.get(job_name)
+    if entry is None:
+      return None
+
+    queue = self._queues[entry.owner_id]
+    rounds = queue.index(entry)
+
+    ahead = 0
+    is_before = True
+    for owner_id, other_queue in self._queues.items():
+      if owner_id == entry.owner_id:
+        is_before = False
+        continue
+
+      ahead += min(len(other_queue), rounds + (1 if is_before else 0))
+
+    return ahead + rounds + 1
@@ -0,0 +1,723 @@
+import asyncio
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from src.utils.db import SessionLocal
+from src.utils.time import get_datetime_now_jkt
+from src.utils.settings import TRANSCRIPTION_EVENTS_SECRET, TRANSCRIBE_MAX_CONCURRENT_JOBS
+from src.utils.silence import TimeOffsetMap
+from src.utils.word_timings import WordTimingsBuilder
+
+from src.schemas.transcription import (
+  TranscriptionJobSchema,
+  TranscriptionJobStateChangeEventSchema,
+  TranscriptionJobStatusEnum,
+  TranscriptionSchema,
+)
+
+from src.services.transcription import TranscriptionQuotaExceededError, TranscriptionService
+from src.services.transcription_scheduler import TranscriptionScheduler
+
+# Backend job statuses after which a job no longer runs
+TERMINAL_JOB_STATUSES = ("COMPLETED", "FAILED")
+
+
+class TranscriptionJobSupervisor:
+  """
+  Tracks in-flight transcription jobs from a single background task.
+
+  Every tick, all pending jobs are polled concurrently through the service's
+  backend and the loop sleeps with `asyncio.sleep`, so one worker can
+  follow hundreds of jobs while still serving other traffic.
+  Completed jobs are formatted and stored to the db by a separate task each.
+
+  Segmented jobs are split and started in the background too, then complete
+  once every segment has, and are stitched back together when stored.
+
+  When job state changes are pushed, through POST /v1/transcription/events
+  or by the backend itself, jobs are resolved as soon as their event arrives,
+  and polling drops to a slow fallback for events which never came.
+
+  Audio identical to a stored or in-flight job's, in the same language,
+  isn't transcribed again: its job copies that transcription once it's stored.
+
+  New jobs are queued, and started as the TranscriptionScheduler admits them,
+  keeping the backend under its concurrent job quota. A slot is freed as soon
+  as its backend job, or segment, is finished.
+  """
+
+  DEFAULT_MAX_CONCURRENT_JOBS = 100
+  START_RETRY_DELAY_SEC = 5
+  MAX_CONCURRENT_PREPROCESSING = 2
+  POLL_INTERVAL_SEC = 5
+  FALLBACK_POLL_INTERVAL_SEC = 60
+  MAX_EARLY_STATES = 1024
+  JOB_TIMEOUT_SEC = 4 * 60 * 60
+  FINISHED_JOB_RETENTION_SEC = 60 * 60
+
+  def __init__(
+    self,
+    session_factory: Callable[[], Session] = SessionLocal,
+    service: Optional[TranscriptionService] = None,
+    event_driven: Optional[bool] = None,
+    scheduler: Optional[TranscriptionScheduler] = None,
+  ) -> None:
+    """
+    `event_driven` defaults to whether job state changes are pushed,
+    either by the backend or by AWS through TRANSCRIPTION_EVENTS_SECRET.
+    The scheduler's limit defaults to TRANSCRIBE_MAX_CONCURRENT_JOBS
+    """
+    self._session_factory = session_factory
+    self._event_driven = event_driven
+    self.event_driven = bool(event_driven)
+
+    self._jobs: Dict[str, TranscriptionJobSchema] = {}
+    # Segment job name -> segmented job name
+    self._segment_parents: Dict[str, str] = {}
+    # States pushed before their job was submitted or had started,
+    # replayed once it is. Bounded, as other workers' jobs land here too
+    self._early_states: OrderedDict[str, Tuple[str, Optional[str]]] = OrderedDict()
+    # Job name -> duplicate jobs waiting on its transcription
+    self._duplicates: Dict[str, List[TranscriptionJobSchema]] = {}
+    # Set once a job is COMPLETED or FAILED, for `wait_for_job`
+    self._finished_events: Dict[str, asyncio.Event] = {}
+    # Job name -> scheduler slots held by its running backend jobs
+    self._held_slots: Dict[str, int] = {}
+    self._background_tasks: Set[asyncio.Task] = set()
+    self._preprocess_slots = asyncio.Semaphore(self.MAX_CONCURRENT_PREPROCESSING)
+    self._task: Optional[asyncio.Task] = None
+    self._wakeup: Optional[asyncio.Event] = None
+
+    self.service = service or TranscriptionService()
+    # Not `or`, an empty scheduler is falsy
+    if scheduler is None:
+      scheduler = TranscriptionScheduler(
+        int(TRANSCRIBE_MAX_CONCURRENT_JOBS or self.DEFAULT_MAX_CONCURRENT_JOBS)
+      )
+    self.scheduler = scheduler
+
+  def is_running(self) -> bool:
+    return self._task is not None and not self._task.done()
+
+  @property
+  def poll_interval(self) -> float:
+    return self.FALLBACK_POLL_INTERVAL_SEC if self.event_driven else self.POLL_INTERVAL_SEC
+
+  async def start(self) -> None:
+    if self.is_running():
+      return
+
+    if self._event_driven is None:
+      is_pushed_by_backend = self.service.backend.subscribe(self.handle_event)
+      self.event_driven = is_pushed_by_backend or bool(TRANSCRIPTION_EVENTS_SECRET)
+    elif self._event_driven:
+      self.service.backend.subscribe(self.handle_event)
+
+    self._wakeup = asyncio.Event()
+    self._task = asyncio.create_task(self._run())
+
+  async def stop(self) -> None:
+    """
+    Stops polling, but lets jobs which are already being started or stored finish
+    """
+    if self._task is not None:
+      self._task.cancel()
+      await asyncio.gather(self._task, return_exceptions=True)
+      self._task = None
+
+    await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+  async def enqueue(self, job: TranscriptionJobSchema) -> TranscriptionJobSchema:
+    """
+    Queues a job to be started on the backend once the scheduler admits it.
+    The job stays QUEUED until then, with its `queue_position`
+    """
+    job.status = TranscriptionJobStatusEnum.QUEUED
+    job.updated_at = get_datetime_now_jkt()
+    self._jobs[job.job_name] = job
+    self.scheduler.enqueue(job.owner_id, job.job_name)
+
+    await self.start()
+    self._dispatch()
+
+    return self._with_queue_position(job)
+
+  async def submit_segmented(self, job: TranscriptionJobSchema) -> TranscriptionJobSchema:
+    """
+    Starts tracking a job whose audio has yet to be split, see
+    `TranscriptionService.split_segmented_transcription`, then queues it
+    with a slot per segment. The job stays QUEUED until it's started
+    """
+    job.segmented = True
+    job.status = TranscriptionJobStatusEnum.QUEUED
+    job.updated_at = get_datetime_now_jkt()
+    self._jobs[job.job_name] = job
+
+    await self.start()
+    self._spawn(self._split_segments(job))
+
+    return job
+
+  async def submit_preprocessed(self, job: TranscriptionJobSchema, segmented: bool = False) -> TranscriptionJobSchema:
+    """
+    Starts tracking a job whose audio has yet to be pre-processed, see
+    `TranscriptionService.preprocess_transcription`, then splits it if
+    `segmented`, and queues it. The job stays QUEUED until it's started
+    """
+    job.preprocess = True
+    job.segmented = segmented
+    job.status = TranscriptionJobStatusEnum.QUEUED
+    job.updated_at = get_datetime_now_jkt()
+    self._jobs[job.job_name] = job
+
+    await self.start()
+    self._spawn(self._preprocess(job))
+
+    return job
+
+  async def submit_if_duplicate(self, job: TranscriptionJobSchema) -> Optional[TranscriptionJobSchema]:
+    """
+    Tracks a job whose audio was already transcribed in the same language,
+    by a job still tracked here or into a stored transcription, and copies
+    that transcription instead of starting a new one. Returns None if there's
+    nothing to reuse, and the job has to be started as usual
+    """
+    if job.content_hash is None:
+      return None
+
+    original = self._find_job_by_content(job.content_hash, job.language_code)
+
+    if original is not None and original.status != TranscriptionJobStatusEnum.COMPLETED:
+      job.duplicate_of = original.job_name
+      job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+      job.updated_at = get_datetime_now_jkt()
+      self._jobs[job.job_name] = job
+      self._duplicates.setdefault(original.job_name, []).append(job)
+
+      await self.start()
+      return job
+
+    if original is not None:
+      source_id = original.transcription_id
+    else:
+      source_id = await asyncio.to_thread(self._find_transcription_by_content, job)
+      if source_id is None:
+        return None
+
+    self._jobs[job.job_name] = job
+    await self.start()
+    self._schedule_copy(job, source_id)
+
+    return job
+
+  def get_job(self, job_name: str) -> Optional[TranscriptionJobSchema]:
+    job = self._jobs.get(job_name)
+
+    return self._with_queue_position(job) if job is not None else None
+
+  def _with_queue_position(self, job: TranscriptionJobSchema) -> TranscriptionJobSchema:
+    job.queue_position = self.scheduler.position(job.job_name)
+    return job
+
+  async def wait_for_job(self, job_name: str, timeout: float) -> Optional[TranscriptionJobSchema]:
+    """
+    Returns the job once it is COMPLETED or FAILED, or as it is after `timeout` seconds
+    """
+    job = self._jobs.get(job_name)
+
+    if job is None or self._is_finished(job):
+      return job
+
+    finished = self._finished_events.setdefault(job_name, asyncio.Event())
+    try:
+      await asyncio.wait_for(finished.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+      pass
+
+    return self.get_job(job_name)
+
+  def handle_event(self, event: dict) -> bool:
+    """
+    Applies an EventBridge "Transcribe Job State Change" event, see `resolve`
+    """
+    detail = TranscriptionJobStateChangeEventSchema.model_validate(event).detail
+
+    return self.resolve(detail.job_name, detail.status, detail.failure_reason)
+
+  def resolve(self, job_name: str, status: str, failure_reason: Optional[str] = None) -> bool:
+    """
+    Applies a pushed job state change right away, instead of waiting for a sweep.
+    Returns whether the job, or the segmented job it belongs to, is tracked here
+    """
+    segment_job_name = None
+    job = self._jobs.get(job_name)
+
+    if job is None and job_name in self._segment_parents:
+      segment_job_name = job_name
+      job = self._jobs.get(self._segment_parents[job_name])
+
+    if job is None or job.status == TranscriptionJobStatusEnum.QUEUED:
+      self._early_states[job_name] = (status, failure_reason)
+      while len(self._early_states) > self.MAX_EARLY_STATES:
+        self._early_states.popitem(last=False)
+
+      return job is not None
+
+    if job.status != TranscriptionJobStatusEnum.IN_PROGRESS:
+      return True
+
+    if segment_job_name is not None:
+      status, failure_reason = self._resolve_segment(job, segment_job_name, status, failure_reason)
+
+    self._apply_status(job, status, failure_reason)
+
+    return True
+
+  def _replay_early_states(self, job_names: List[str]) -> None:
+    for job_name in job_names:
+      early_state = self._early_states.pop(job_name, None)
+
+      if early_state is not None:
+        self.resolve(job_name, *early_state)
+
+  def pending_jobs(self) -> List[TranscriptionJobSchema]:
+    # Duplicates have nothing running on the backend, they wait on another job
+    return [
+      job for job in self._jobs.values()
+      if job.status == TranscriptionJobStatusEnum.IN_PROGRESS and job.duplicate_of is None
+    ]
+
+  def _find_job_by_content(self, content_hash: str, language_code: str) -> Optional[TranscriptionJobSchema]:
+    for job in self._jobs.values():
+      if (
+        job.content_hash == content_hash
+        and job.language_code == language_code
+        and job.duplicate_of is None
+        and job.status != TranscriptionJobStatusEnum.FAILED
+      ):
+        return job
+
+    return None
+
+  def _find_transcription_by_content(self, job: TranscriptionJobSchema) -> Optional[UUID]:
+    session = self._session_factory()
+
+    try:
+      return self.service.find_transcription_by_content(
+        session=session,
+        content_hash=job.content_hash,
+        language=job.language_code,
+      )
+    finally:
+      session.close()
+
+  async def _run(self) -> None:
+    while True:
+      try:
+        await self.sweep()
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        print(f"Transcription supervisor sweep failed: {e}")
+
+      self._wakeup.clear()
+      try:
+        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+      except asyncio.TimeoutError:
+        pass
+
+  def _poll_soon(self) -> None:
+    # Pushed state changes resolve jobs, so there's nothing to poll early for
+    if not self.event_driven:
+      self._wakeup.set()
+
+  def _is_poll_due(self, job: TranscriptionJobSchema, now) -> bool:
+    return not self.event_driven or now - job.updated_at >= timedelta(seconds=self.poll_interval)
+
+  async def sweep(self) -> None:
+    """
+    Polls every pending job once, concurrently. When event driven,
+    only jobs which haven't changed for a fallback interval are polled
+    """
+    now = get_datetime_now_jkt()
+    pending = [job for job in self.pending_jobs() if self._is_poll_due(job, now)]
+
+    if pending:
+      await asyncio.gather(*[self._poll_job(job) for job in pending])
+
+    self._evict_finished_jobs()
+
+  async def _poll_job(self, job: TranscriptionJobSchema) -> None:
+    now = get_datetime_now_jkt()
+
+    if now - job.created_at > timedelta(seconds=self.JOB_TIMEOUT_SEC):
+      self._mark_failed(job, "Timeout when polling the transcription results")
+      return
+
+    try:
+      if job.segments:
+        job_status, failure_reason = await self._poll_segments(job)
+      else:
+        job_result = await self.service.get_transcription_job(job_name=job.job_name)
+        job_status = job_result["TranscriptionJob"]["TranscriptionJobStatus"]
+        failure_reason = job_result["TranscriptionJob"].get("FailureReason")
+    except Exception as e:
+      # Transient backend errors are retried on the next sweep
+      print(f"Failed to poll transcription job {job.job_name}: {e}")
+      return
+
+    # Another sweep, or a pushed event, may have resolved the job while this one was waiting
+    if job.status != TranscriptionJobStatusEnum.IN_PROGRESS:
+      return
+
+    self._apply_status(job, job_status, failure_reason)
+
+  def _apply_status(self, job: TranscriptionJobSchema, status: str, failure_reason: Optional[str]) -> None:
+    if status in TERMINAL_JOB_STATUSES:
+      self._release_slots(job.job_name)
+
+    if status == "COMPLETED":
+      self._schedule_finalize(job)
+    elif status == "FAILED":
+      self._mark_failed(job, failure_reason or "Audio Transcription job failed.")
+
+  async def _poll_segments(self, job: TranscriptionJobSchema) -> Tuple[str, Optional[str]]:
+    """
+    Polls the segments which are still running, and returns the job's
+    overall status: FAILED if any segment failed, COMPLETED once all have
+    """
+    # QUEUED on the backend is still running, as far as slots go
+    pending = [segment for segment in job.segments if segment.status not in TERMINAL_JOB_STATUSES]
+
+    job_results = await asyncio.gather(*[
+      self.service.get_transcription_job(job_name=segment.job_name)
+      for segment in pending
+    ])
+
+    for segment, job_result in zip(pending, job_results):
+      segment.status = job_result["TranscriptionJob"]["TranscriptionJobStatus"]
+      if segment.status in TERMINAL_JOB_STATUSES:
+        self._release_slots(job.job_name, 1)
+
+      if segment.status == "FAILED":
+        reason = job_result["TranscriptionJob"].get("FailureReason", "Audio Transcription job failed.")
+        return "FAILED", f"Segment {segment.index} failed: {reason}"
+
+    if all(segment.status == "COMPLETED" for segment in job.segments):
+      return "COMPLETED", None
+
+    return "IN_PROGRESS", None
+
+  def _resolve_segment(
+    self,
+    job: TranscriptionJobSchema,
+    segment_job_name: str,
+    status: str,
+    failure_reason: Optional[str],
+  ) -> Tuple[str, Optional[str]]:
+    """
+    Applies a segment's state change, and returns its segmented job's overall status
+    """
+    for segment in job.segments:
+      if segment.job_name == segment_job_name:
+        # Late or repeated events don't reopen a finished segment, nor free its slot twice
+        if segment.status in TERMINAL_JOB_STATUSES:
+          break
+
+        if status in TERMINAL_JOB_STATUSES:
+          self._release_slots(job.job_name, 1)
+
+        segment.status = status
+
+        if status == "FAILED":
+          return "FAILED", f"Segment {segment.index} failed: {failure_reason or 'Audio Transcription job failed.'}"
+
+    if all(segment.status == "COMPLETED" for segment in job.segments):
+      return "COMPLETED", None
+
+    return "IN_PROGRESS", None
+
+  def _spawn(self, coroutine) -> None:
+    task = asyncio.create_task(coroutine)
+    self._background_tasks.add(task)
+    task.add_done_callback(self._background_tasks.discard)
+
+  async def _preprocess(self, job: TranscriptionJobSchema) -> None:
+    try:
+      # Decoding and encoding take a core each
+      async with self._preprocess_slots:
+        await self.service.preprocess_transcription(job)
+    except asyncio.CancelledError:
+      raise
+    except Exception as e:
+      self._mark_failed(job, f"Error while pre-processing audio: {e}")
+      return
+
+    if job.segmented:
+      await self._split_segments(job)
+      return
+
+    self.scheduler.enqueue(job.owner_id, job.job_name)
+    self._dispatch()
+
+  async def _split_segments(self, job: TranscriptionJobSchema) -> None:
+    try:
+      # One segment per slot at most, so all of them can run at once
+      job.segments = await self.service.split_segmented_transcription(
+        job, max_segments=self.scheduler.max_running
+      )
+    except asyncio.CancelledError:
+      raise
+    except Exception as e:
+      self._mark_failed(job, f"Error while splitting segmented transcription: {e}")
+      return
+
+    for segment in job.segments:
+      self._segment_parents[segment.job_name] = job.job_name
+
+    self.scheduler.enqueue(job.owner_id, job.job_name, weight=max(len(job.segments), 1))
+    self._dispatch()
+
+  def _dispatch(self) -> None:
+    """
+    Starts every queued job the scheduler admits
+    """
+    while True:
+      entry = self.scheduler.admit()
+      if entry is None:
+        return
+
+      job = self._jobs.get(entry.job_name)
+      if job is None or job.status != TranscriptionJobStatusEnum.QUEUED:
+        self.scheduler.release(entry.weight)
+        continue
+
+      self._held_slots[job.job_name] = entry.weight
+      self._spawn(self._start_job(job, entry.weight))
+
+  async def _start_job(self, job: TranscriptionJobSchema, weight: int) -> None:
+    try:
+      if job.segmented:
+        await self.service.start_segmented_transcription(job)
+      else:
+        await self.service.transcribe_file(
+          job_name=job.job_name,
+          file_uri=job.file_uri,
+          file_format=job.file_format,
+          language_code=job.language_code,
+        )
+    except asyncio.CancelledError:
+      raise
+    except TranscriptionQuotaExceededError:
+      if job.segmented and job.segments:
+        # Some segments may have started, and can't be told apart from a retry
+        self._mark_failed(job, "Transcription job quota exceeded.")
+        return
+
+      # Another client shares the quota. Back in front of the queue, and retried later
+      self._release_slots(job.job_name, dispatch=False)
+      self.scheduler.enqueue(job.owner_id, job.job_name, weight=weight, front=True)
+      asyncio.get_running_loop().call_later(self.START_RETRY_DELAY_SEC, self._dispatch)
+      return
+    except Exception as e:
+      self._mark_failed(job, f"Error while starting transcription: {e}")
+      return
+
+    job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+    job.updated_at = get_datetime_now_jkt()
+    self._replay_early_states([job.job_name] + [segment.job_name for segment in job.segments])
+    self._poll_soon()
+
+  def _release_slots(self, job_name: str, count: Optional[int] = None, dispatch: bool = True) -> None:
+    """
+    Frees `count` of the job's slots, or all of them, and admits queued jobs in their place
+    """
+    held = self._held_slots.get(job_name, 0)
+    released = held if count is None else min(count, held)
+    if released == 0:
+      return
+
+    if released == held:
+      del self._held_slots[job_name]
+    else:
+      self._held_slots[job_name] = held - released
+
+    self.scheduler.release(released)
+
+    if dispatch:
+      self._dispatch()
+
+  def _schedule_finalize(self, job: TranscriptionJobSchema) -> None:
+    job.status = TranscriptionJobStatusEnum.STORING
+    job.updated_at = get_datetime_now_jkt()
+
+    self._spawn(self._finalize(job))
+
+  async def _finalize(self, job: TranscriptionJobSchema) -> None:
+    """
+    Formats the completed job's items into chunks and stores them to the db
+    """
+    try:
+      word_timings = WordTimingsBuilder()
+      time_map = TimeOffsetMap(job.time_offsets) if job.time_offsets else None
+
+      if job.segments:
+        grouped_chunks = await self.service.retrieve_grouped_chunks_from_segments(
+          segments=job.segments,
+          strategy=job.chunk_strategy,
+          word_timings=word_timings,
+          time_map=time_map,
+        )
+      else:
+        grouped_chunks = await self.service.retrieve_grouped_chunks_from_job_name(
+          job_name=job.job_name,
+          strategy=job.chunk_strategy,
+          word_timings=word_timings,
+          time_map=time_map,
+        )
+
+      generate_chunks_response = self.service.generate_transcription_chunks(
+        transcription_id=job.transcription_id,
+        items=grouped_chunks,
+      )
+
+      tsc_datetime_now = get_datetime_now_jkt()
+      tsc_create_schema = TranscriptionSchema(
+        id=job.transcription_id,
+        created_at=tsc_datetime_now,
+        updated_at=tsc_datetime_now,
+        is_deleted=False,
+        owner_id=job.owner_id,
+        title=job.title,
+        tags=job.tags,
+        duration=generate_chunks_response.duration,
+        language=job.language_code,
+        full_transcript=generate_chunks_response.full_transcript,
+        word_count=generate_chunks_response.word_count,
+        content_hash=job.content_hash,
+      )
+
+      await asyncio.to_thread(
+        self._store, tsc_create_schema, generate_chunks_response.chunks, word_timings
+      )
+
+      job.status = TranscriptionJobStatusEnum.COMPLETED
+      job.updated_at = get_datetime_now_jkt()
+      self._notify_finished(job)
+      print(f"Stored transcription for job {job.job_name}.")
+    except asyncio.CancelledError:
+      raise
+    except Exception as e:
+      self._mark_failed(job, f"Error while storing transcription: {e}")
+      return
+
+    await self._cleanup(job)
+
+  async def _cleanup(self, job: TranscriptionJobSchema) -> None:
+    """
+    Deletes the finished job's intermediate audio and backend jobs
+    """
+    await self.service.delete_segmented_transcription(job)
+    await self.service.delete_preprocessed_transcription(job)
+
+  def _schedule_copy(self, job: TranscriptionJobSchema, source_id: UUID) -> None:
+    job.status = TranscriptionJobStatusEnum.STORING
+    job.updated_at = get_datetime_now_jkt()
+
+    self._spawn(self._copy(job, source_id))
+
+  async def _copy(self, job: TranscriptionJobSchema, source_id: UUID) -> None:
+    """
+    Stores the job's transcription as a copy of an identical audio's transcription
+    """
+    try:
+      is_copied = await asyncio.to_thread(self._store_copy, source_id, job)
+
+      if not is_copied:
+        # The source was edited meanwhile, so its text isn't only the audio's any more
+        print(f"Transcription {source_id} was edited, transcribing job {job.job_name} instead.")
+        job.duplicate_of = None
+        await self.enqueue(job)
+        return
+
+      job.status = TranscriptionJobStatusEnum.COMPLETED
+      job.updated_at = get_datetime_now_jkt()
+      self._notify_finished(job)
+      print(f"Copied transcription {source_id} for job {job.job_name}.")
+    except asyncio.CancelledError:
+      raise
+    except Exception as e:
+      self._mark_failed(job, f"Error while storing transcription: {e}")
+
+  def _store_copy(self, source_id: UUID, job: TranscriptionJobSchema) -> bool:
+    session = self._session_factory()
+
+    try:
+      return self.service.clone_transcription(session=session, source_id=source_id, job=job) is not None
+    finally:
+      session.close()
+
+  def _release_duplicates(self, job: TranscriptionJobSchema) -> None:
+    for duplicate in self._duplicates.pop(job.job_name, []):
+      if job.status == TranscriptionJobStatusEnum.COMPLETED:
+        self._schedule_copy(duplicate, job.transcription_id)
+      else:
+        self._mark_failed(duplicate, job.failure_reason or "Audio Transcription job failed.")
+
+  def _store(self, transcription_data, transcription_chunks, word_timings) -> None:
+    session = self._session_factory()
+
+    try:
+      self.service.store_transcription_result(
+        session=session,
+        transcription_data=transcription_data,
+        transcription_chunks=transcription_chunks,
+        word_timings=word_timings,
+      )
+    finally:
+      session.close()
+
+  def _mark_failed(self, job: TranscriptionJobSchema, reason: str) -> None:
+    print(f"Job {job.job_name} is FAILED: {reason}")
+
+    self.scheduler.remove(job.job_name)
+    self._release_slots(job.job_name)
+
+    job.status = TranscriptionJobStatusEnum.FAILED
+    job.failure_reason = reason
+    job.updated_at = get_datetime_now_jkt()
+    self._notify_finished(job)
+
+    if job.segments or job.source_file_uri:
+      self._spawn(self._cleanup(job))
+
+  def _is_finished(self, job: TranscriptionJobSchema) -> bool:
+    return job.status in (
+      TranscriptionJobStatusEnum.COMPLETED,
+      TranscriptionJobStatusEnum.FAILED,
+    )
+
+  def _notify_finished(self, job: TranscriptionJobSchema) -> None:
+    finished = self._finished_events.pop(job.job_name, None)
+
+    if finished is not None:
+      finished.set()
+
+    self._release_duplicates(job)
+
+  def _evict_finished_jobs(self) -> None:
+    expiry = get_datetime_now_jkt() - timedelta(seconds=self.FINISHED_JOB_RETENTION_SEC)
+
+    for job_name, job in list(self._jobs.items()):
+      if self._is_finished(job) and job.updated_at < expiry:
+        del self._jobs[job_name]
+
+        for segment in job.segments:
+          self._segment_parents.pop(segment.job_name, None)
+
+
+transcription_supervisor = TranscriptionJobSupervisor()
@@ -1,7 +1,45 @@
+import asyncio
+import hashlib
+import math
+import mimetypes
 import secrets
 import string
+import uuid
+from typing import AsyncIterator, BinaryIO, List, Optional, Tuple
+
 from botocore.exceptions import ClientError
-import boto3
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.models.upload import AudioUpload, UploadSession, UploadSessionPart
+from src.services.audio_preprocess import AudioPreprocessService
+from src.services.waveform import WaveformService
+from src.schemas.upload import UploadPartURLSchema, UploadSessionSchema, UploadSessionStatusEnum
+from src.utils.audio import AudioProbe
+from src.utils.aws.clients import get_aws_client
+from src.utils.settings import UPLOAD_MAX_AUDIO_DURATION_SEC
+from src.utils.time import get_datetime_now_jkt
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+ALLOWED_AUDIO_TYPES = ("audio/mp4", "audio/mp4a-latm", "audio/x-m4a", "audio/mpeg")
+
+# S3 multipart limits: parts of at least 5 MiB but the last, and at most 10,000 of them
+MIN_PART_SIZE = 8 * 1024 * 1024
+MAX_PART_COUNT = 10000
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024 * 1024
+
+PRESIGNED_URL_EXPIRY_SEC = 60 * 60
+PRESIGNED_PARTS_PAGE_SIZE = 100
+
+# AWS Transcribe's limit
+DEFAULT_MAX_AUDIO_DURATION_SEC = 4 * 60 * 60
+MAX_AUDIO_DURATION_SEC = float(UPLOAD_MAX_AUDIO_DURATION_SEC or DEFAULT_MAX_AUDIO_DURATION_SEC)
+
+# Server-side streaming uploads hold at most (MAX_CONCURRENT_PARTS + 1) parts in memory
+STREAM_PART_SIZE = MIN_PART_SIZE
+MAX_CONCURRENT_PARTS = 4
 
 def sha():
     sha = ""
@@ -14,10 +52,549 @@ def sha():
 
     return sha
 
+def guess_audio_type(filename: str) -> Optional[str]:
+    """
+    Returns the file's MIME type, or None if it isn't an allowed audio type
+    """
+    file_type, _ = mimetypes.guess_type(filename)
+    return file_type if file_type in ALLOWED_AUDIO_TYPES else None
+
+def plan_parts(size: int) -> Tuple[int, int]:
+    """
+    Returns the part size and part count of a multipart upload of `size` bytes
+    """
+    part_size = max(MIN_PART_SIZE, math.ceil(size / MAX_PART_COUNT))
+    # Whole MiB, to keep part boundaries readable
+    part_size = math.ceil(part_size / (1024 * 1024)) * 1024 * 1024
+
+    return part_size, max(math.ceil(size / part_size), 1)
+
+def check_audio(filename: str, probe: AudioProbe) -> None:
+    """
+    Raises ValueError unless the probed content matches the file's extension,
+    which decides its Transcribe media format, and fits the duration limit
+    """
+    file_type = guess_audio_type(filename)
+    if file_type is None or (file_type == "audio/mpeg") != (probe.content_type == "audio/mpeg"):
+        raise ValueError("File content doesn't match its extension")
+
+    if probe.duration is not None and probe.duration > MAX_AUDIO_DURATION_SEC:
+        raise ValueError(f"Audio is longer than {MAX_AUDIO_DURATION_SEC / 3600:g} hours")
+
+async def peek_stream(
+    chunks: AsyncIterator[bytes],
+    size: int,
+) -> Tuple[bytes, AsyncIterator[bytes]]:
+    """
+    Reads at least `size` bytes off a stream, or all of it if shorter.
+    Returns them, and the stream from its start again
+    """
+    head = bytearray()
+    async for chunk in chunks:
+        head += chunk
+        if len(head) >= size:
+            break
+
+    head = bytes(head)
+
+    async def replay():
+        if head:
+            yield head
+        async for chunk in chunks:
+            yield chunk
+
+    return head, replay()
+
+def hash_file(file: BinaryIO) -> Tuple[str, int]:
+    """
+    Returns the SHA-256 hex digest and size of a file, read in chunks,
+    and rewinds it for the upload
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    for data in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(data)
+        size += len(data)
+
+    file.seek(0)
+
+    return digest.hexdigest(), size
+
 class UploadService:
-    def __init__(self, bucket_name):
+    def __init__(self, bucket_name, s3_client=None):
         self.bucket_name = bucket_name
-        self.s3_client = boto3.client('s3')
+        self._s3_client = s3_client
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            self._s3_client = get_aws_client('s3')
+
+        return self._s3_client
+
+    def store_audio(
+        self,
+        session: Session,
+        owner_id,
+        filename: str,
+        file: BinaryIO,
+    ) -> Tuple[AudioUpload, bool]:
+        """
+        Uploads the audio as `filename`, unless identical content is already
+        stored, in which case `filename` only becomes another name for that object.
+        Returns the upload, and whether its content was a duplicate
+        """
+        content_hash, size = hash_file(file)
+
+        object_key = self._find_object_key(session, content_hash, size)
+
+        is_duplicate = object_key is not None
+        if not is_duplicate:
+            self.s3_client.upload_fileobj(file, self.bucket_name, filename)
+            object_key = filename
+
+        upload = self._add_upload(session, owner_id, filename, content_hash, size, object_key)
+
+        return upload, is_duplicate
+
+    async def store_audio_stream(
+        self,
+        session: Session,
+        owner_id,
+        filename: str,
+        chunks: AsyncIterator[bytes],
+        part_size: int = STREAM_PART_SIZE,
+        max_concurrency: int = MAX_CONCURRENT_PARTS,
+    ) -> Tuple[AudioUpload, bool]:
+        """
+        Streams the audio to S3 as a multipart upload, hashing it on the way.
+        Parts are uploaded `max_concurrency` at a time on the default executor,
+        and reading waits for a free slot, so no more than `max_concurrency + 1`
+        parts are held in memory. If identical content turns out to be stored
+        already, the upload is aborted and `filename` refers to the stored object.
+        Returns the upload, and whether its content was a duplicate
+        """
+        s3_client = self.s3_client
+        response = await asyncio.to_thread(
+            s3_client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=filename,
+            ContentType=guess_audio_type(filename) or "application/octet-stream",
+        )
+        upload_id = response["UploadId"]
+
+        slots = asyncio.Semaphore(max_concurrency)
+        tasks: List[asyncio.Task] = []
+
+        async def upload_part(part_number: int, body: bytes) -> dict:
+            try:
+                response = await asyncio.to_thread(
+                    s3_client.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=filename,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                )
+            finally:
+                slots.release()
+
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+        async def submit(body: bytes) -> None:
+            await slots.acquire()
+
+            # Fail fast rather than keep reading once a part failed
+            for task in tasks:
+                if task.done() and task.exception() is not None:
+                    slots.release()
+                    raise task.exception()
+
+            tasks.append(asyncio.create_task(upload_part(len(tasks) + 1, body)))
+
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    raise ValueError("Upload is larger than 5 GiB")
+
+                buffer += chunk
+                while len(buffer) >= part_size:
+                    await submit(bytes(buffer[:part_size]))
+                    del buffer[:part_size]
+
+            if size == 0:
+                raise ValueError("Upload is empty")
+
+            if buffer:
+                await submit(bytes(buffer))
+            del buffer
+
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            await asyncio.to_thread(self._abort_multipart_upload, filename, upload_id)
+            raise
+
+        content_hash = digest.hexdigest()
+        object_key = await asyncio.to_thread(self._find_object_key, session, content_hash, size)
+
+        is_duplicate = object_key is not None
+        if is_duplicate:
+            await asyncio.to_thread(self._abort_multipart_upload, filename, upload_id)
+        else:
+            await asyncio.to_thread(
+                s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=filename,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            object_key = filename
+
+        upload = await asyncio.to_thread(
+            self._add_upload, session, owner_id, filename, content_hash, size, object_key,
+        )
+
+        return upload, is_duplicate
+
+    def _abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=key, UploadId=upload_id,
+            )
+        except ClientError:
+            # Left to the bucket's lifecycle rule for incomplete uploads
+            pass
+
+    def _find_object_key(self, session: Session, content_hash: str, size: int) -> Optional[str]:
+        return session.execute(
+            select(AudioUpload.object_key)
+                .where(AudioUpload.content_hash == content_hash, AudioUpload.size == size)
+                .limit(1)
+        ).scalar_one_or_none()
+
+    def _add_upload(
+        self,
+        session: Session,
+        owner_id,
+        filename: str,
+        content_hash: str,
+        size: int,
+        object_key: str,
+    ) -> AudioUpload:
+        upload = AudioUpload(
+            filename=filename,
+            owner_id=owner_id,
+            content_hash=content_hash,
+            size=size,
+            object_key=object_key,
+        )
+
+        try:
+            session.add(upload)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return upload
+
+    def resolve_audio(self, session: Session, filename: str) -> Optional[AudioUpload]:
+        """
+        Returns the upload behind `filename`, or None for files uploaded before uploads were tracked
+        """
+        return session.get(AudioUpload, filename)
+
+    def delete_audio(self, session: Session, filename: str) -> None:
+        """
+        Deletes an uploaded file. The S3 object goes once no other upload shares it
+        """
+        upload = self.resolve_audio(session, filename)
+        if upload is None:
+            self.delete_file(filename)
+            return
+
+        try:
+            session.delete(upload)
+            session.flush()
+
+            is_shared = session.execute(
+                select(AudioUpload.filename)
+                    .where(AudioUpload.object_key == upload.object_key)
+                    .limit(1)
+            ).first() is not None
+
+            if not is_shared:
+                self.delete_file(upload.object_key)
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    def create_upload_session(
+        self,
+        session: Session,
+        owner_id,
+        filename: str,
+        size: int,
+    ) -> UploadSessionSchema:
+        """
+        Starts a multipart upload straight to S3, and returns the session
+        with presigned URLs of its first parts
+        """
+        content_type = guess_audio_type(filename)
+        if content_type is None:
+            raise ValueError("Only MP3 or M4A files are allowed")
+
+        if size > MAX_UPLOAD_SIZE:
+            raise ValueError(f"Files can't be larger than {MAX_UPLOAD_SIZE} bytes")
+
+        key = str(owner_id) + "_" + str(sha()) + "_" + filename
+        part_size, part_count = plan_parts(size)
+
+        upload = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            ContentType=content_type,
+            Metadata={"owner-id": str(owner_id)},
+        )
+
+        upload_session = UploadSession(
+            id=uuid.uuid4(),
+            created_at=get_datetime_now_jkt(),
+            owner_id=owner_id,
+            filename=key,
+            content_type=content_type,
+            size=size,
+            upload_id=upload["UploadId"],
+            part_size=part_size,
+            part_count=part_count,
+            status=UploadSessionStatusEnum.IN_PROGRESS.value,
+        )
+
+        try:
+            session.add(upload_session)
+            session.commit()
+            session.refresh(upload_session)
+        except Exception:
+            session.rollback()
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=key, UploadId=upload["UploadId"]
+            )
+            raise
+
+        return self._to_session_schema(
+            upload_session,
+            completed_parts=[],
+            parts=self.presign_parts(upload_session, 1, PRESIGNED_PARTS_PAGE_SIZE),
+        )
+
+    def get_upload_session(
+        self,
+        session: Session,
+        owner_id,
+        session_id,
+        start: Optional[int] = None,
+        count: int = PRESIGNED_PARTS_PAGE_SIZE,
+    ) -> Optional[UploadSessionSchema]:
+        """
+        Returns the session with its completed parts, and presigned URLs of
+        `count` parts from `start`, to resume or continue an upload.
+        None if the session doesn't exist or isn't the user's
+        """
+        upload_session = self._get_session(session, owner_id, session_id)
+        if upload_session is None:
+            return None
+
+        parts = []
+        if start is not None and upload_session.status == UploadSessionStatusEnum.IN_PROGRESS.value:
+            parts = self.presign_parts(upload_session, start, count)
+
+        return self._to_session_schema(
+            upload_session,
+            completed_parts=[part_number for part_number, _ in self._get_parts(session, session_id)],
+            parts=parts,
+        )
+
+    def presign_parts(self, upload_session: UploadSession, start: int, count: int) -> List[UploadPartURLSchema]:
+        end = min(start + count, upload_session.part_count + 1)
+
+        return [
+            UploadPartURLSchema(
+                part_number=part_number,
+                url=self.s3_client.generate_presigned_url(
+                    "upload_part",
+                    Params={
+                        "Bucket": self.bucket_name,
+                        "Key": upload_session.filename,
+                        "UploadId": upload_session.upload_id,
+                        "PartNumber": part_number,
+                    },
+                    ExpiresIn=PRESIGNED_URL_EXPIRY_SEC,
+                ),
+            )
+            for part_number in range(max(start, 1), end)
+        ]
+
+    def record_upload_part(
+        self,
+        session: Session,
+        owner_id,
+        session_id,
+        part_number: int,
+        etag: str,
+    ) -> bool:
+        """
+        Records a part uploaded by the client, replacing an earlier upload of the same part.
+        Returns False if the session doesn't exist or isn't the user's
+        """
+        upload_session = self._get_session(session, owner_id, session_id)
+        if upload_session is None:
+            return False
+
+        if upload_session.status != UploadSessionStatusEnum.IN_PROGRESS.value:
+            raise ValueError(f"Upload session is {upload_session.status}")
+
+        if not 1 <= part_number <= upload_session.part_count:
+            raise ValueError(f"Part number must be between 1 and {upload_session.part_count}")
+
+        statement = insert(UploadSessionPart).values(
+            session_id=session_id, part_number=part_number, etag=etag
+        )
+
+        try:
+            session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[UploadSessionPart.session_id, UploadSessionPart.part_number],
+                    set_={"etag": statement.excluded.etag},
+                )
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return True
+
+    def complete_upload_session(self, session: Session, owner_id, session_id) -> Optional[str]:
+        """
+        Completes the multipart upload once every part is recorded, and returns
+        the object's filename. None if the session doesn't exist or isn't the user's
+        """
+        upload_session = self._get_session(session, owner_id, session_id, for_update=True)
+        if upload_session is None:
+            return None
+
+        try:
+            if upload_session.status == UploadSessionStatusEnum.COMPLETED.value:
+                return upload_session.filename
+
+            if upload_session.status != UploadSessionStatusEnum.IN_PROGRESS.value:
+                raise ValueError(f"Upload session is {upload_session.status}")
+
+            parts = self._get_parts(session, session_id)
+            missing = sorted(
+                set(range(1, upload_session.part_count + 1)) - {part_number for part_number, _ in parts}
+            )
+            if missing:
+                raise ValueError(f"Parts not uploaded yet: {missing[:20]}")
+
+            try:
+                self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=upload_session.filename,
+                    UploadId=upload_session.upload_id,
+                    MultipartUpload={
+                        "Parts": [{"ETag": etag, "PartNumber": part_number} for part_number, etag in parts]
+                    },
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] in ("InvalidPart", "InvalidPartOrder", "EntityTooSmall"):
+                    raise ValueError(f"Upload can't be completed: {e.response['Error']['Code']}")
+                raise
+
+            upload_session.status = UploadSessionStatusEnum.COMPLETED.value
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return upload_session.filename
+
+    def abort_upload_session(self, session: Session, owner_id, session_id) -> bool:
+        """
+        Aborts the multipart upload, so S3 drops its parts.
+        Returns False if the session doesn't exist or isn't the user's
+        """
+        upload_session = self._get_session(session, owner_id, session_id, for_update=True)
+        if upload_session is None:
+            return False
+
+        try:
+            if upload_session.status == UploadSessionStatusEnum.COMPLETED.value:
+                raise ValueError("Upload session is already COMPLETED, delete the file instead")
+
+            if upload_session.status == UploadSessionStatusEnum.IN_PROGRESS.value:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=upload_session.filename,
+                    UploadId=upload_session.upload_id,
+                )
+
+            upload_session.status = UploadSessionStatusEnum.ABORTED.value
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        return True
+
+    def _get_session(self, session: Session, owner_id, session_id, for_update: bool = False) -> Optional[UploadSession]:
+        statement = select(UploadSession).where(
+            UploadSession.id == session_id, UploadSession.owner_id == owner_id
+        )
+        if for_update:
+            statement = statement.with_for_update()
+
+        return session.execute(statement).scalar_one_or_none()
+
+    def _get_parts(self, session: Session, session_id) -> List[Tuple[int, str]]:
+        return session.execute(
+            select(UploadSessionPart.part_number, UploadSessionPart.etag)
+                .where(UploadSessionPart.session_id == session_id)
+                .order_by(UploadSessionPart.part_number)
+        ).all()
+
+    def _to_session_schema(
+        self,
+        upload_session: UploadSession,
+        completed_parts: List[int],
+        parts: List[UploadPartURLSchema],
+    ) -> UploadSessionSchema:
+        return UploadSessionSchema(
+            id=upload_session.id,
+            filename=upload_session.filename,
+            content_type=upload_session.content_type,
+            size=upload_session.size,
+            part_size=upload_session.part_size,
+            part_count=upload_session.part_count,
+            status=upload_session.status,
+            completed_parts=completed_parts,
+            parts=parts,
+            url_expires_in=PRESIGNED_URL_EXPIRY_SEC if parts else None,
+            created_at=upload_session.created_at,
+        )
 
     def check_user_ownership(self, filename, user_id):
         uuid_from_filename = filename.split('_')[0]
@@ -27,6 +604,9 @@ class UploadService:
         try:
             self.s3_client.head_object(Bucket=self.bucket_name, Key=filename)
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=filename)
+            WaveformService(self.bucket_name, s3_client=self.s3_client).delete_peaks(filename)
+            # Left behind only if its job never finished, see `preprocess_transcription`
+            AudioPreprocessService(s3_client=self.s3_client).delete_processed(self.bucket_name, filename)
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey' or e.response['Error']['Code'] == '404':
                 raise ValueError("File not found")
@@ -0,0 +1,98 @@
+import posixpath
+import threading
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from src.utils.aws.clients import get_aws_client
+from src.utils.cache import SizedLRUCache
+from src.utils.ffmpeg import iter_pcm
+from src.utils.waveform import WAVEFORM_MEDIA_TYPE, PeakBuilder, WaveformPeaks
+
+# Packed peaks of an hour of audio are about 360 KB
+peaks_cache = SizedLRUCache(max_size=32 * 1024 * 1024, max_entry_size=4 * 1024 * 1024)
+
+
+class WaveformService:
+  """
+  Waveform peaks of audio stored on S3, for players to draw without
+  downloading the audio. The audio is decoded once with ffmpeg, and its
+  peaks are stored next to it at PEAKS_PER_SEC, then downsampled per request.
+  """
+
+  SAMPLE_RATE = 8000
+  PEAKS_PER_SEC = 50
+  URL_EXPIRY_SEC = 60 * 60
+  # Decoding takes a core, and runs on the threads serving requests
+  MAX_CONCURRENT_DECODES = 2
+
+  _decode_slots = threading.BoundedSemaphore(MAX_CONCURRENT_DECODES)
+
+  def __init__(self, bucket_name: str, s3_client=None, ffmpeg_path: str = "ffmpeg") -> None:
+    self.bucket_name = bucket_name
+    self._s3_client = s3_client
+    self.ffmpeg_path = ffmpeg_path
+
+  @property
+  def s3_client(self):
+    if self._s3_client is None:
+      self._s3_client = get_aws_client("s3")
+
+    return self._s3_client
+
+  def peaks_key(self, key: str) -> str:
+    stem, _ = posixpath.splitext(key)
+    return f"{stem}.peaks"
+
+  def compute_peaks(self, key: str) -> bytes:
+    source = self.s3_client.generate_presigned_url(
+      "get_object",
+      Params={"Bucket": self.bucket_name, "Key": key},
+      ExpiresIn=self.URL_EXPIRY_SEC,
+    )
+    builder = PeakBuilder(self.SAMPLE_RATE, self.SAMPLE_RATE // self.PEAKS_PER_SEC)
+
+    with self._decode_slots:
+      for samples in iter_pcm(source, self.SAMPLE_RATE, self.ffmpeg_path):
+        builder.feed(samples)
+
+    return builder.pack()
+
+  def store_peaks(self, key: str) -> None:
+    """
+    Computes and stores the peaks of the audio at `key`. Run in the
+    background after an upload, so failures are only logged
+    """
+    try:
+      self.s3_client.put_object(
+        Bucket=self.bucket_name,
+        Key=self.peaks_key(key),
+        Body=self.compute_peaks(key),
+        ContentType=WAVEFORM_MEDIA_TYPE,
+      )
+    except Exception as e:
+      print(f"Error while computing waveform peaks of {key}: {e}")
+
+  def fetch_peaks(self, key: str) -> Optional[WaveformPeaks]:
+    """
+    Returns the stored peaks of the audio at `key`, or None if there are none yet
+    """
+    peaks_key = self.peaks_key(key)
+
+    packed = peaks_cache.get(peaks_key)
+    if packed is None:
+      try:
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=peaks_key)
+      except ClientError as e:
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+          return None
+        raise
+
+      packed = response["Body"].read()
+      peaks_cache.set(peaks_key, packed)
+
+    return WaveformPeaks(packed)
+
+  def delete_peaks(self, key: str) -> None:
+    peaks_cache.delete(self.peaks_key(key))
+    self.s3_client.delete_object(Bucket=self.bucket_name, Key=self.peaks_key(key))
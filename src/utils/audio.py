@@ -0,0 +1,428 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
+
+# MPEG audio Layer III tables, indexed by the frame header fields
+MPEG1_BITRATES_KBPS = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MPEG2_BITRATES_KBPS = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+SAMPLE_RATES = {
+  3: (44100, 48000, 32000),  # MPEG-1
+  2: (22050, 24000, 16000),  # MPEG-2
+  0: (11025, 12000, 8000),  # MPEG-2.5
+}
+
+ID3V2_HEADER_SIZE = 10
+
+# Bytes read from the start of an upload to identify it
+PROBE_SIZE = 64 * 1024
+# Also enough to get past ID3 tags with cover art
+MAX_PROBE_SIZE = 4 * 1024 * 1024
+# Bytes after the ID3 tag searched for the first frame, past padding or junk
+MP3_SYNC_SEARCH_SIZE = 4 * 1024
+
+MP4_AUDIO_BRANDS = (b"M4A ", b"M4B ", b"mp42", b"mp41", b"isom", b"iso2", b"dash")
+# Sample tables of hours of audio stay well below this
+MAX_MOOV_SIZE = 32 * 1024 * 1024
+
+
+def id3v2_tag_size(data: bytes, offset: int = 0) -> int:
+  """
+  Size of the ID3v2 tag at `offset`, header and footer included, or 0 if there's none
+  """
+  if data[offset:offset + 3] != b"ID3" or len(data) < offset + ID3V2_HEADER_SIZE:
+    return 0
+
+  # Tag size is a 28-bit "syncsafe" integer, plus a footer if flagged
+  size = ID3V2_HEADER_SIZE + (
+    (data[offset + 6] << 21)
+    | (data[offset + 7] << 14)
+    | (data[offset + 8] << 7)
+    | data[offset + 9]
+  )
+  if data[offset + 5] & 0x10:
+    size += ID3V2_HEADER_SIZE
+
+  return size
+
+
+class MP3FrameHeader(NamedTuple):
+  length: int
+  duration: float
+
+
+def parse_mp3_frame_header(header: bytes) -> Optional[MP3FrameHeader]:
+  """
+  Parses a 4-byte MPEG Layer III frame header, or returns None if it isn't one
+  """
+  if header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+    return None
+
+  version = (header[1] >> 3) & 0x03
+  layer = (header[1] >> 1) & 0x03
+  bitrate_index = header[2] >> 4
+  sample_rate_index = (header[2] >> 2) & 0x03
+  padding = (header[2] >> 1) & 0x01
+
+  # Layer III only, and no free-format or reserved values
+  if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+    return None
+
+  sample_rate = SAMPLE_RATES[version][sample_rate_index]
+
+  if version == 3:
+    bitrate = MPEG1_BITRATES_KBPS[bitrate_index] * 1000
+    length = 144 * bitrate // sample_rate + padding
+    samples = 1152
+  else:
+    bitrate = MPEG2_BITRATES_KBPS[bitrate_index] * 1000
+    length = 72 * bitrate // sample_rate + padding
+    samples = 576
+
+  return MP3FrameHeader(length, samples / sample_rate)
+
+
+class AudioSegment(NamedTuple):
+  index: int
+  start_time: float
+  end_time: float
+  # Byte range of the segment in the source file, end exclusive
+  byte_start: int
+  byte_end: int
+
+
+class MP3FrameIndex:
+  """
+  Start offset and start time of every frame of an MP3 file, built in one pass
+  over its bytes. Bytes may be fed in chunks of any size, so a file can be
+  indexed while it downloads, holding only one partial frame in memory.
+
+  Anything which isn't a frame, like ID3 tags, is skipped.
+  """
+
+  def __init__(self) -> None:
+    self.offsets = array("q")
+    self.times = array("d")
+    self.duration = 0.0
+    # End of the last complete frame
+    self.end_offset = 0
+
+    self._buffer = b""
+    self._buffer_offset = 0
+    self._skip = 0
+
+  def feed(self, data: bytes) -> None:
+    buffer = self._buffer + data if self._buffer else data
+    position = 0
+    end = len(buffer)
+
+    offsets_append = self.offsets.append
+    times_append = self.times.append
+    duration = self.duration
+    frames_end = self.end_offset
+
+    if self._skip:
+      skipped = min(self._skip, end)
+      self._skip -= skipped
+      position = skipped
+
+    while end - position >= ID3V2_HEADER_SIZE or (end - position >= 4 and buffer[position] == 0xFF):
+      if buffer[position] == 0xFF:
+        header = parse_mp3_frame_header(buffer[position:position + 4])
+
+        if header is not None:
+          if position + header.length > end:
+            break
+
+          offsets_append(self._buffer_offset + position)
+          times_append(duration)
+          duration += header.duration
+          position += header.length
+          frames_end = self._buffer_offset + position
+          continue
+
+      elif buffer[position:position + 3] == b"ID3":
+        size = id3v2_tag_size(buffer, position)
+
+        skipped = min(size, end - position)
+        self._skip = size - skipped
+        position += skipped
+        continue
+
+      position += 1
+
+    self.duration = duration
+    self.end_offset = frames_end
+    self._buffer = buffer[position:]
+    self._buffer_offset += position
+
+  def frame_at(self, time: float) -> int:
+    """
+    Index of the frame playing at `time`
+    """
+    return max(bisect_right(self.times, time) - 1, 0)
+
+  def frame_from(self, time: float) -> int:
+    """
+    Index of the first frame starting at or after `time`, or the frame count
+    """
+    return bisect_left(self.times, time)
+
+
+def plan_audio_segments(
+  frame_index: MP3FrameIndex,
+  segment_duration: float,
+  overlap: float,
+  max_segments: Optional[int] = None,
+) -> List[AudioSegment]:
+  """
+  Splits the indexed audio into segments of about `segment_duration` seconds,
+  each running `overlap` seconds into the next one. Cuts fall on frame
+  boundaries, so every segment is a playable MP3 on its own.
+
+  With `max_segments`, audio too long for that many segments is split into
+  longer segments instead.
+  """
+  frame_count = len(frame_index.offsets)
+  if frame_count == 0:
+    return []
+
+  duration = frame_index.duration
+  if max_segments is not None:
+    # Slightly longer, so rounding can't leave a sliver for one more segment
+    segment_duration = max(segment_duration, (duration - overlap) / max(max_segments, 1) * (1 + 1e-9))
+
+  file_end = frame_index.end_offset
+  segments: List[AudioSegment] = []
+
+  nominal_start = 0.0
+  while True:
+    start_frame = frame_index.frame_at(nominal_start)
+
+    is_last = nominal_start + segment_duration + overlap >= duration
+    end_frame = frame_count if is_last else frame_index.frame_from(nominal_start + segment_duration + overlap)
+
+    segments.append(AudioSegment(
+      index=len(segments),
+      start_time=frame_index.times[start_frame],
+      end_time=duration if end_frame == frame_count else frame_index.times[end_frame],
+      byte_start=frame_index.offsets[start_frame],
+      byte_end=file_end if end_frame == frame_count else frame_index.offsets[end_frame],
+    ))
+
+    if is_last:
+      return segments
+
+    nominal_start += segment_duration
+
+
+class AudioProbe(NamedTuple):
+  content_type: str
+  # Seconds, or None if the headers read don't give it
+  duration: Optional[float]
+
+
+class AudioProbeError(ValueError):
+  pass
+
+
+def probe_size(head: bytes) -> int:
+  """
+  Bytes from the start of a file needed to probe it, given its first bytes
+  """
+  return min(id3v2_tag_size(head) + PROBE_SIZE, MAX_PROBE_SIZE)
+
+
+def probe_audio(head: bytes, size: Optional[int] = None, moov: Optional[bytes] = None) -> AudioProbe:
+  """
+  Identifies an MP3 or M4A file by the signature in its first bytes, and reads
+  its duration from the headers there. The duration of a constant bitrate MP3
+  needs the file `size`, and of an M4A its `moov` box, unless it's in `head`.
+  Raises AudioProbeError for anything else
+  """
+  if head[4:8] == b"ftyp":
+    return _probe_mp4(head, moov)
+
+  return _probe_mp3(head, size)
+
+
+def probe_audio_file(file: BinaryIO) -> AudioProbe:
+  """
+  Probes a seekable file, reading its head and, for an M4A, its `moov` box
+  wherever it is. Rewinds the file
+  """
+  size = file.seek(0, 2)
+  file.seek(0)
+
+  head = file.read(PROBE_SIZE)
+  needed = probe_size(head)
+  if needed > len(head):
+    head += file.read(needed - len(head))
+
+  moov = _read_moov(file, size) if head[4:8] == b"ftyp" else None
+  file.seek(0)
+
+  return probe_audio(head, size, moov)
+
+
+def _probe_mp3(head: bytes, size: Optional[int]) -> AudioProbe:
+  start = id3v2_tag_size(head)
+  if start and start >= len(head):
+    raise AudioProbeError("ID3 tag is too large")
+
+  for position in range(start, min(start + MP3_SYNC_SEARCH_SIZE, len(head) - 3)):
+    if head[position] != 0xFF:
+      continue
+
+    header = parse_mp3_frame_header(head[position:position + 4])
+    if header is None:
+      continue
+
+    # The next frame must follow, against sync bytes occurring by chance
+    following = position + header.length
+    if following + 4 <= len(head) and parse_mp3_frame_header(head[following:following + 4]) is None:
+      continue
+
+    return AudioProbe("audio/mpeg", _mp3_duration(head, position, header, size))
+
+  raise AudioProbeError("Not an MP3 or M4A file")
+
+
+def _mp3_duration(head: bytes, position: int, header: MP3FrameHeader, size: Optional[int]) -> Optional[float]:
+  frame = head[position:position + header.length]
+
+  # Variable bitrate files count their frames in a Xing or VBRI header in the first frame
+  for tag in (b"Xing", b"Info"):
+    index = frame.find(tag, 4, 40)
+    if index != -1 and len(frame) >= index + 12 and frame[index + 7] & 0x01:
+      return int.from_bytes(frame[index + 8:index + 12], "big") * header.duration
+
+  if frame[36:40] == b"VBRI" and len(frame) >= 54:
+    return int.from_bytes(frame[50:54], "big") * header.duration
+
+  if size is None:
+    return None
+
+  # Constant bitrate: every frame is about as long as the first
+  return (size - position) / header.length * header.duration
+
+
+def _box_header(data: bytes, offset: int, end: int) -> Optional[Tuple[bytes, int, int]]:
+  """
+  Type, header size and size of the MP4 box at `offset`, or None if its header is cut off
+  """
+  if offset + 8 > len(data):
+    return None
+
+  size = int.from_bytes(data[offset:offset + 4], "big")
+  box_type = bytes(data[offset + 4:offset + 8])
+  header_size = 8
+
+  if size == 1:
+    if offset + 16 > len(data):
+      return None
+    size = int.from_bytes(data[offset + 8:offset + 16], "big")
+    header_size = 16
+  elif size == 0:
+    # Runs to the end of the file
+    size = end - offset
+
+  if size < header_size:
+    raise AudioProbeError("Malformed M4A file")
+
+  return box_type, header_size, size
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+  """
+  Type, payload start and end of every box in `data[start:end]`,
+  the last one possibly running past the end of `data`
+  """
+  end = len(data) if end is None else end
+
+  while start < end:
+    header = _box_header(data, start, end)
+    if header is None:
+      return
+
+    box_type, header_size, size = header
+    yield box_type, start + header_size, start + size
+    start += size
+
+
+def _read_moov(file: BinaryIO, size: int) -> Optional[bytes]:
+  offset = 0
+
+  while offset < size:
+    file.seek(offset)
+    header = _box_header(file.read(16), 0, size - offset)
+    if header is None:
+      return None
+
+    box_type, header_size, box_size = header
+    if box_type == b"moov":
+      if box_size > MAX_MOOV_SIZE:
+        return None
+
+      file.seek(offset + header_size)
+      return file.read(box_size - header_size)
+
+    offset += box_size
+
+  return None
+
+
+def _probe_mp4(head: bytes, moov: Optional[bytes]) -> AudioProbe:
+  ftyp = next(_iter_boxes(head))
+  brands = head[ftyp[1]:min(ftyp[2], len(head))]
+  # Major brand, minor version, then compatible brands
+  brands = [brands[0:4]] + [brands[index:index + 4] for index in range(8, len(brands) - 3, 4)]
+
+  if not any(brand in MP4_AUDIO_BRANDS for brand in brands):
+    raise AudioProbeError("Not an MP3 or M4A file")
+
+  if moov is None:
+    for box_type, payload_start, box_end in _iter_boxes(head):
+      if box_type == b"moov" and box_end <= len(head):
+        moov = head[payload_start:box_end]
+        break
+
+  if moov is None:
+    # Written at the end of the file, after the audio
+    return AudioProbe("audio/mp4", None)
+
+  duration = None
+  handler_types = set()
+
+  for box_type, payload_start, box_end in _iter_boxes(moov):
+    if box_type == b"mvhd":
+      duration = _mvhd_duration(moov[payload_start:box_end])
+
+    elif box_type == b"trak":
+      for mdia_type, mdia_start, mdia_end in _iter_boxes(moov, payload_start, box_end):
+        if mdia_type != b"mdia":
+          continue
+
+        for child_type, child_start, _ in _iter_boxes(moov, mdia_start, mdia_end):
+          if child_type == b"hdlr":
+            # Version and flags, pre-defined, then the handler type
+            handler_types.add(bytes(moov[child_start + 8:child_start + 12]))
+
+  if b"vide" in handler_types:
+    raise AudioProbeError("Video files aren't allowed")
+
+  if b"soun" not in handler_types:
+    raise AudioProbeError("File has no audio track")
+
+  return AudioProbe("audio/mp4", duration)
+
+
+def _mvhd_duration(mvhd: bytes) -> Optional[float]:
+  if mvhd[0] == 1:
+    timescale = int.from_bytes(mvhd[20:24], "big")
+    duration = int.from_bytes(mvhd[24:32], "big")
+  else:
+    timescale = int.from_bytes(mvhd[12:16], "big")
+    duration = int.from_bytes(mvhd[16:20], "big")
+
+  return duration / timescale if timescale else None
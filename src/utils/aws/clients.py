@@ -0,0 +1,88 @@
+import threading
+from typing import Any, Dict, Iterable, Tuple
+
+import boto3
+from botocore.config import Config
+
+from src.utils.settings import (
+  AWS_ACCESS_KEY_ID,
+  AWS_SECRET_ACCESS_KEY,
+  AWS_REGION,
+  AWS_MAX_POOL_CONNECTIONS,
+)
+
+DEFAULT_REGION = "us-west-2"
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+
+# Connection pool sized for concurrent range copies, part uploads and
+# supervisor polls. Standard retries back off on throttling and 5xx
+CLIENT_CONFIG = Config(
+  max_pool_connections=int(AWS_MAX_POOL_CONNECTIONS or DEFAULT_MAX_POOL_CONNECTIONS),
+  retries={"mode": "standard", "max_attempts": 5},
+  connect_timeout=5,
+  read_timeout=60,
+  tcp_keepalive=True,
+)
+
+WARM_UP_SERVICES = ("s3", "transcribe")
+
+
+class AWSClientRegistry:
+  """
+  Process-wide boto3 clients, one per service and region, each with its own
+  connection pool. boto3 clients are thread-safe once built, but building
+  them isn't, and takes tens of milliseconds, so it happens once under a lock.
+  """
+
+  def __init__(self, config: Config = CLIENT_CONFIG) -> None:
+    self.config = config
+
+    self._clients: Dict[Tuple[str, str], Any] = {}
+    self._lock = threading.Lock()
+    self._session = None
+
+  def get_client(self, service_name: str, region_name: str = None) -> Any:
+    key = (service_name, region_name or AWS_REGION or DEFAULT_REGION)
+
+    client = self._clients.get(key)
+    if client is not None:
+      return client
+
+    with self._lock:
+      client = self._clients.get(key)
+
+      if client is None:
+        if self._session is None:
+          self._session = boto3.session.Session(
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+          )
+
+        client = self._session.client(service_name, region_name=key[1], config=self.config)
+        self._clients[key] = client
+
+      return client
+
+  def warm_up(self, service_names: Iterable[str] = WARM_UP_SERVICES) -> None:
+    """
+    Builds the clients ahead of the first request which needs them
+    """
+    for service_name in service_names:
+      self.get_client(service_name)
+
+  def clear(self) -> None:
+    with self._lock:
+      for client in self._clients.values():
+        client.close()
+
+      self._clients.clear()
+
+
+aws_clients = AWSClientRegistry()
+
+
+def get_aws_client(service_name: str, region_name: str = None) -> Any:
+  """
+  Returns the process-wide boto3 client of a service
+  """
+  return aws_clients.get_client(service_name, region_name)
@@ -1,23 +1,18 @@
 import time
 import logging
-import boto3
 import uuid
 from typing import Any
-from src.utils.settings import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY
+
+from src.utils.aws.clients import get_aws_client
 
 from botocore.exceptions import ClientError
 
 CLIENT_NAME = "transcribe"
-DEFAULT_REGION = "us-west-2"
 
 class AWSTranscribeClient:
   def __init__(self):
-    self._transcribe_client = boto3.client(
-                                CLIENT_NAME, 
-                                aws_access_key_id=AWS_ACCESS_KEY_ID, 
-                                aws_secret_access_key=AWS_SECRET_ACCESS_KEY, 
-                                region_name=DEFAULT_REGION
-                              )
+    # Shared with the rest of the process, see `AWSClientRegistry`
+    self._transcribe_client = get_aws_client(CLIENT_NAME)
   
   def get_client(self) -> Any:
     return self._transcribe_client
\ No newline at end of file
@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Sized
+
+
+class SizedLRUCache:
+  """
+  Thread-safe LRU cache bounded by the total `len()` of its values,
+  like rendered text or packed bytes
+  """
+
+  def __init__(self, max_size: int, max_entry_size: int) -> None:
+    self.max_size = max_size
+    self.max_entry_size = max_entry_size
+
+    self._entries: "OrderedDict[Hashable, Sized]" = OrderedDict()
+    self._size = 0
+    self._lock = threading.Lock()
+
+  def get(self, key: Hashable) -> Optional[Sized]:
+    with self._lock:
+      value = self._entries.get(key)
+      if value is not None:
+        self._entries.move_to_end(key)
+
+      return value
+
+  def set(self, key: Hashable, value: Sized) -> None:
+    size = len(value)
+    if size > self.max_entry_size:
+      return
+
+    with self._lock:
+      previous = self._entries.pop(key, None)
+      if previous is not None:
+        self._size -= len(previous)
+
+      self._entries[key] = value
+      self._size += size
+
+      while self._size > self.max_size:
+        _, evicted = self._entries.popitem(last=False)
+        self._size -= len(evicted)
+
+  def delete(self, key: Hashable) -> None:
+    with self._lock:
+      value = self._entries.pop(key, None)
+      if value is not None:
+        self._size -= len(value)
@@ -0,0 +1,170 @@
+from enum import Enum
+from typing import Iterable, List, NamedTuple, Optional
+
+
+class ChunkGroupingStrategyEnum(str, Enum):
+  WORD_COUNT = "word_count"
+  DURATION = "duration"
+  SENTENCE = "sentence"
+  SILENCE = "silence"
+
+
+class GroupedChunk(NamedTuple):
+  content: str
+  start_time: float
+  end_time: float
+  duration: float
+
+
+DEFAULT_STRATEGY = ChunkGroupingStrategyEnum.SENTENCE
+DEFAULT_MAX_WORDS = 5
+DEFAULT_MAX_DURATION_SEC = 10.0
+DEFAULT_SILENCE_GAP_SEC = 0.8
+
+# Hard limits shared by every strategy. Chunk content is stored as String(255),
+# and time-range queries rely on chunks never spanning more than MAX_CHUNK_DURATION_SEC
+MAX_CHUNK_CHARS = 255
+MAX_CHUNK_DURATION_SEC = 30.0
+
+SENTENCE_END_PUNCTUATION = frozenset({".", "?", "!"})
+
+
+class ChunkGrouper:
+  """
+  Groups AWS Transcribe `results.items` into chunks in a single pass.
+
+  Items are pushed one by one with `feed`, which returns a chunk whenever one
+  is closed, so it works the same over a list or a stream of items.
+  Punctuation items are attached to the preceding word. A chunk is closed
+  lazily, when the next word arrives, so trailing punctuation stays with it.
+
+  Every strategy also keeps chunks within MAX_CHUNK_CHARS and MAX_CHUNK_DURATION_SEC.
+
+  Strategies:
+  - WORD_COUNT: `max_words` words per chunk
+  - DURATION: chunks no longer than `max_duration` seconds
+  - SENTENCE: a chunk per sentence, ended by `.`, `?` or `!`,
+    split when it runs longer than `max_duration` seconds
+  - SILENCE: a new chunk whenever the pause between words reaches `silence_gap` seconds
+  """
+
+  def __init__(
+    self,
+    strategy: ChunkGroupingStrategyEnum = DEFAULT_STRATEGY,
+    max_words: int = DEFAULT_MAX_WORDS,
+    max_duration: float = DEFAULT_MAX_DURATION_SEC,
+    silence_gap: float = DEFAULT_SILENCE_GAP_SEC,
+  ) -> None:
+    self.strategy = ChunkGroupingStrategyEnum(strategy)
+    self.max_words = max_words
+    self.max_duration = min(max_duration, MAX_CHUNK_DURATION_SEC)
+    self.silence_gap = silence_gap
+
+    # Resolved once, to keep enum comparisons out of the per-item path
+    self._by_word_count = self.strategy == ChunkGroupingStrategyEnum.WORD_COUNT
+    self._by_sentence = self.strategy == ChunkGroupingStrategyEnum.SENTENCE
+    self._by_silence = self.strategy == ChunkGroupingStrategyEnum.SILENCE
+    self._duration_limit = (
+      self.max_duration
+      if self.strategy in (ChunkGroupingStrategyEnum.DURATION, ChunkGroupingStrategyEnum.SENTENCE)
+      else MAX_CHUNK_DURATION_SEC
+    )
+
+    self._words: List[str] = []
+    self._length = 0
+    self._start_time = 0.0
+    self._end_time = 0.0
+    self._close_pending = False
+
+  def feed(self, item: dict) -> Optional[GroupedChunk]:
+    """
+    Adds one item, and returns the chunk it closed, if any
+    """
+    content = item["alternatives"][0]["content"]
+
+    if item.get("type") != "pronunciation":
+      self._attach_punctuation(content)
+      return None
+
+    start_time = float(item["start_time"])
+    end_time = float(item["end_time"])
+    words = self._words
+
+    closed = None
+    if words and (
+      self._close_pending
+      or self._length + 1 + len(content) > MAX_CHUNK_CHARS
+      or end_time - self._start_time > self._duration_limit
+      or (self._by_silence and start_time - self._end_time >= self.silence_gap)
+    ):
+      closed = self.flush()
+      words = self._words
+
+    if words:
+      self._length += len(content) + 1
+    else:
+      self._start_time = start_time
+      self._length = len(content)
+
+    words.append(content)
+    self._end_time = end_time
+
+    if self._by_word_count and len(words) >= self.max_words:
+      self._close_pending = True
+
+    return closed
+
+  def flush(self) -> Optional[GroupedChunk]:
+    """
+    Closes and returns the current chunk, if there is one
+    """
+    if not self._words:
+      return None
+
+    chunk = GroupedChunk(
+      " ".join(self._words),
+      self._start_time,
+      self._end_time,
+      round(self._end_time - self._start_time, 2),
+    )
+
+    self._words = []
+    self._length = 0
+    self._close_pending = False
+
+    return chunk
+
+  def _attach_punctuation(self, content: str) -> None:
+    if not self._words:
+      return
+
+    if self._length + len(content) <= MAX_CHUNK_CHARS:
+      self._words[-1] += content
+      self._length += len(content)
+
+    if self._by_sentence and content in SENTENCE_END_PUNCTUATION:
+      self._close_pending = True
+
+
+def group_transcript_items(
+  items: Iterable[dict],
+  strategy: ChunkGroupingStrategyEnum = DEFAULT_STRATEGY,
+  **options,
+) -> List[GroupedChunk]:
+  """
+  Groups a list (or any iterable) of AWS Transcribe items into chunks
+  """
+  grouper = ChunkGrouper(strategy=strategy, **options)
+  chunks: List[GroupedChunk] = []
+  feed = grouper.feed
+
+  for item in items:
+    chunk = feed(item)
+    if chunk is not None:
+      chunks.append(chunk)
+
+  last_chunk = grouper.flush()
+  if last_chunk is not None:
+    chunks.append(last_chunk)
+
+  return chunks
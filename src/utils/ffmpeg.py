@@ -0,0 +1,69 @@
+import os
+import subprocess
+import tempfile
+from typing import IO, Iterator, List
+
+import numpy as np
+
+READ_CHUNK_SIZE = 1024 * 1024
+# Tail of ffmpeg's log kept in errors. A damaged input can make it log a lot
+MAX_ERROR_OUTPUT_SIZE = 4096
+
+
+def decode_command(source: str, sample_rate: int, ffmpeg_path: str = "ffmpeg") -> List[str]:
+  return [
+    ffmpeg_path, "-nostdin", "-v", "error",
+    "-i", source,
+    "-ac", "1", "-ar", str(sample_rate),
+    "-f", "s16le", "pipe:1",
+  ]
+
+
+def read_error_output(log: IO[bytes]) -> str:
+  """
+  Tail of ffmpeg's log, from a file its stderr was written to. stderr goes to
+  a file rather than a pipe, which would block ffmpeg once full, since it's
+  only read after ffmpeg exits
+  """
+  log.seek(0, os.SEEK_END)
+  log.seek(max(log.tell() - MAX_ERROR_OUTPUT_SIZE, 0))
+
+  return log.read().decode(errors="replace").strip()
+
+
+def iter_pcm(
+  source: str,
+  sample_rate: int,
+  ffmpeg_path: str = "ffmpeg",
+  chunk_size: int = READ_CHUNK_SIZE,
+) -> Iterator[np.ndarray]:
+  """
+  Decodes audio from a path or URL with ffmpeg into 16-bit mono PCM at
+  `sample_rate`, yielded in chunks as it's decoded. Raises RuntimeError if
+  ffmpeg fails. ffmpeg is killed if the iterator is closed early
+  """
+  with tempfile.TemporaryFile() as log:
+    process = subprocess.Popen(
+      decode_command(source, sample_rate, ffmpeg_path),
+      stdout=subprocess.PIPE,
+      stderr=log,
+    )
+
+    try:
+      remainder = b""
+      for data in iter(lambda: process.stdout.read(chunk_size), b""):
+        data = remainder + data
+        # Pipe reads may end mid-sample
+        end = len(data) - len(data) % 2
+        remainder = data[end:]
+
+        yield np.frombuffer(data[:end], dtype="<i2")
+
+      if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg couldn't decode the audio: {read_error_output(log)}")
+    finally:
+      if process.poll() is None:
+        process.kill()
+
+      process.wait()
+      process.stdout.close()
@@ -0,0 +1,38 @@
+import json
+from typing import Any, Optional
+
+import httpx
+
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide async HTTP client, so connections are pooled and reused
+    """
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def format_sse_event(event: str, data: Any) -> str:
+    """
+    Formats a server-sent event, with its data as one line of JSON
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
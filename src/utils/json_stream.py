@@ -0,0 +1,134 @@
+import re
+import json
+import codecs
+from typing import Any, List, Tuple
+
+# Keeps enough of the unmatched tail to find a key split across two chunks
+SEEK_TAIL_SIZE = 64
+
+
+class JSONArrayStreamParser:
+  """
+  Incrementally decodes the elements of one array in a JSON document,
+  e.g. `results.items` of an AWS Transcribe output, as bytes arrive.
+
+  Everything before the array is skipped without being kept in memory,
+  and only the element currently being decoded is buffered.
+  The array is located by the first `"<key>": [` in the document; a key
+  can't match inside a string value, where its quotes would be escaped.
+  """
+
+  def __init__(self, key: str) -> None:
+    self._key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    self._decoder = json.JSONDecoder()
+    self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    self._buffer = ""
+    self._in_array = False
+    self.is_done = False
+
+  def feed(self, data: bytes) -> List:
+    """
+    Feeds the next bytes of the document, and returns the elements completed by them
+    """
+    if self.is_done:
+      return []
+
+    self._buffer += self._text_decoder.decode(data)
+
+    if not self._in_array:
+      match = self._key_pattern.search(self._buffer)
+
+      if match is None:
+        self._buffer = self._buffer[-SEEK_TAIL_SIZE:]
+        return []
+
+      self._buffer = self._buffer[match.end():]
+      self._in_array = True
+
+    return self._decode_elements()
+
+  def close(self) -> None:
+    """
+    Raises ValueError if the document ended before the array did
+    """
+    self._buffer += self._text_decoder.decode(b"", final=True)
+    self._decode_elements()
+
+    if not self.is_done:
+      raise ValueError("JSON document ended before the array was closed")
+
+  def _decode_elements(self) -> List:
+    elements = []
+    buffer = self._buffer
+    pos = 0
+    size = len(buffer)
+
+    while pos < size:
+      char = buffer[pos]
+
+      if char in " \t\r\n,":
+        pos += 1
+        continue
+
+      if char == "]":
+        self.is_done = True
+        pos += 1
+        break
+
+      try:
+        element, pos = self._decoder.raw_decode(buffer, pos)
+      except json.JSONDecodeError:
+        # The element is incomplete, wait for more data
+        break
+
+      elements.append(element)
+
+    # What follows the array is kept for JSONObjectArraysStreamParser to read on
+    self._buffer = buffer[pos:]
+
+    return elements
+
+
+class JSONObjectArraysStreamParser(JSONArrayStreamParser):
+  """
+  Incrementally decodes the elements of every array in a JSON object, as
+  (key, element) pairs, e.g. the sections of an LLM's JSON answer while its
+  tokens stream in. Each array is located by the next `"<key>": [` after the
+  previous one closed, so anything around the object, like a code fence, is skipped.
+  """
+
+  def __init__(self) -> None:
+    super().__init__(key="")
+    self._key_pattern = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:\s*\[')
+    self.key = None
+
+  def feed(self, data: bytes) -> List[Tuple[str, Any]]:
+    return self.feed_text(self._text_decoder.decode(data))
+
+  def feed_text(self, text: str) -> List[Tuple[str, Any]]:
+    """
+    Feeds the next text of the document, and returns the elements completed by it
+    """
+    self._buffer += text
+    pairs = []
+
+    while True:
+      if not self._in_array:
+        match = self._key_pattern.search(self._buffer)
+
+        if match is None:
+          self._buffer = self._buffer[-SEEK_TAIL_SIZE:]
+          return pairs
+
+        self.key = json.loads(f'"{match.group(1)}"')
+        self._buffer = self._buffer[match.end():]
+        self._in_array = True
+        self.is_done = False
+
+      pairs.extend((self.key, element) for element in self._decode_elements())
+
+      if not self.is_done:
+        return pairs
+
+      self._in_array = False
@@ -1,3 +1,35 @@
+from typing import Optional
+
+from openai import AsyncOpenAI
+
+from src.utils.settings import OPENAI_API_KEY, OPENAI_ORG_ID
+
+_async_openai_client: Optional[AsyncOpenAI] = None
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Returns the process-wide async OpenAI client, so connections are pooled and reused
+    """
+    global _async_openai_client
+
+    if _async_openai_client is None or _async_openai_client.is_closed():
+        _async_openai_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            organization=OPENAI_ORG_ID,
+        )
+
+    return _async_openai_client
+
+
+async def close_async_openai_client() -> None:
+    global _async_openai_client
+
+    if _async_openai_client is not None:
+        await _async_openai_client.close()
+        _async_openai_client = None
+
+
 def construct_system_instructions(context: str, language: str):
     llm_instructions = f"""
     Your name is vlecture. You are an adept notetaker and a good student.
@@ -47,6 +79,46 @@ def construct_system_instructions(context: str, language: str):
     return llm_instructions
 
 
+def construct_map_instructions(context: str, part: int, part_count: int, language: str):
+    llm_instructions = f"""
+    Your name is vlecture. You are an adept notetaker and a good student.
+
+    You will be provided part {part} of {part_count} of a transcription text from transcribing a lecture audio recording. The parts are taken notes of separately, then merged into a single note.
+
+    From this part only, structure its content into the Cornell Notetaking system which contains three parts: main notes content, cues (keywords, review questions and useful facts), and summary. Keep every important point, term, example and mathematical notation (you may use LaTEX) of this part, since anything left out here is lost from the final note. The main notes of this part should contain anywhere between 100 and 250 words, and its summary should be one or two sentences.
+
+    Your answer SHOULD BE IN JSON FORMAT, with three (3) keys namely "main", "cues", and "summary". Each keys will correspond to ARRAY OF STRINGS values only. Each item within the array correspond to a single text block (e.g. a paragraph of text).
+
+    You should write your answers in the USER SPECIFIED LANGUAGE ONLY.
+    The user specified language is: {language}
+
+    PART {part} OF {part_count} OF THE CONTEXT (LECTURE TRANSCRIPTION) IS ADDED BELOW:
+    {context}
+  """
+
+    return llm_instructions
+
+
+def construct_reduce_instructions(context: str, language: str):
+    llm_instructions = f"""
+    Your name is vlecture. You are an adept notetaker and a good student.
+
+    You will be provided Cornell notes taken of consecutive parts of one lecture, in order, as a JSON array. Each note has three (3) keys namely "main", "cues", and "summary".
+
+    Merge them into a single Cornell note of the entire lecture. The main notes content should follow the order of the lecture, without repeating points made in more than one part, and should contain anywhere between 200 and 500 words. You may use LaTEX if there are recognizable mathematical notations. The cues section should keep the most useful keywords and questions of all parts, without duplicates. The summary should represent the entire lecture and should be helpful if the reader needs to recall the big picture of the lecture material.
+
+    Your answer SHOULD BE IN JSON FORMAT, with three (3) keys namely "main", "cues", and "summary". Each keys will correspond to ARRAY OF STRINGS values only. Each item within the array correspond to a single text block (e.g. a paragraph of text).
+
+    You should write your answers in the USER SPECIFIED LANGUAGE ONLY.
+    The user specified language is: {language}
+
+    THE NOTES OF EVERY PART (JSON ARRAY) ARE ADDED BELOW:
+    {context}
+  """
+
+    return llm_instructions
+
+
 def construct_system_flashcard_instructions(context: str, num_of_flashcards: int, language: str):
     llm_instructions = f"""
     You are vlecture. You are a Flashcards AI. Your primary role is to transform educational material into flashcards, enhancing learning and retention. Your capabilities include creating flashcards from the text module provided by users. 
@@ -0,0 +1,27 @@
+import json
+import base64
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encodes the sort key of the last row in a page into an opaque cursor
+    """
+    payload = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decodes a cursor made by `encode_cursor`, raises ValueError if it is malformed
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+
+    return values
@@ -0,0 +1,20 @@
+# Postgres text search configurations by transcription language. Chunks are
+# indexed with their transcription's configuration, so words are stemmed and
+# stop words dropped the way that language needs
+SEARCH_CONFIGS = {
+  "id": "indonesian",
+  "en": "english",
+}
+DEFAULT_SEARCH_CONFIG = "simple"
+
+SUPPORTED_SEARCH_CONFIGS = (*SEARCH_CONFIGS.values(), DEFAULT_SEARCH_CONFIG)
+
+
+def get_search_config(language: str) -> str:
+  """
+  Maps a language, as "id" or "id-ID", to its text search configuration
+  """
+  if not language:
+    return DEFAULT_SEARCH_CONFIG
+
+  return SEARCH_CONFIGS.get(language.split("-")[0].lower(), DEFAULT_SEARCH_CONFIG)
@@ -35,6 +35,28 @@ ACCESS_TOKEN_SECRET = os.getenv("ACCESS_TOKEN_SECRET")
 AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
+AWS_REGION = os.getenv("AWS_REGION")
+# Connections each shared boto3 client keeps open
+AWS_MAX_POOL_CONNECTIONS = os.getenv("AWS_MAX_POOL_CONNECTIONS")
+
+# Longest audio accepted on upload, in seconds
+UPLOAD_MAX_AUDIO_DURATION_SEC = os.getenv("UPLOAD_MAX_AUDIO_DURATION_SEC")
+
+# TRANSCRIPTION BACKEND, "aws" or "local"
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND")
+
+# Shared secret of the EventBridge API destination posting job state changes
+TRANSCRIPTION_EVENTS_SECRET = os.getenv("TRANSCRIPTION_EVENTS_SECRET")
+
+# Transcription jobs running at once, kept under the account's concurrent job quota
+TRANSCRIBE_MAX_CONCURRENT_JOBS = os.getenv("TRANSCRIBE_MAX_CONCURRENT_JOBS")
+
+LOCAL_TRANSCRIBE_LATENCY_SEC = os.getenv("LOCAL_TRANSCRIBE_LATENCY_SEC")
+LOCAL_TRANSCRIBE_AUDIO_DURATION_SEC = os.getenv("LOCAL_TRANSCRIBE_AUDIO_DURATION_SEC")
+LOCAL_TRANSCRIBE_WORDS_PER_SEC = os.getenv("LOCAL_TRANSCRIBE_WORDS_PER_SEC")
+LOCAL_TRANSCRIBE_ITEMS_PER_SEC = os.getenv("LOCAL_TRANSCRIBE_ITEMS_PER_SEC")
+LOCAL_TRANSCRIBE_FAILURE_RATE = os.getenv("LOCAL_TRANSCRIBE_FAILURE_RATE")
+LOCAL_TRANSCRIBE_MAX_RUNNING_JOBS = os.getenv("LOCAL_TRANSCRIBE_MAX_RUNNING_JOBS")
 
 SENTRY_DSN = os.getenv("SENTRY_DSN")
 
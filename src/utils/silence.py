@@ -0,0 +1,184 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Frames quieter than this are silent, in dB below a full-scale sine
+SILENCE_THRESHOLD_DBFS = -40.0
+# Shorter pauses are kept whole
+MIN_SILENCE_SEC = 1.5
+# Silence left on either side of a cut, so words aren't clipped
+KEEP_SILENCE_SEC = 0.25
+FRAME_SEC = 0.02
+
+
+class TimeOffsetMap:
+  """
+  Maps times on trimmed audio back onto the original recording. Every entry
+  is where a stretch of kept audio starts, on both timelines, in seconds
+  """
+
+  def __init__(self, pairs: Sequence[Tuple[float, float]] = ((0.0, 0.0),)) -> None:
+    self.processed_starts = [processed for processed, _ in pairs]
+    self.original_starts = [original for _, original in pairs]
+
+  def __len__(self) -> int:
+    return len(self.processed_starts)
+
+  def add(self, processed_start: float, original_start: float) -> None:
+    self.processed_starts.append(processed_start)
+    self.original_starts.append(original_start)
+
+  def to_pairs(self) -> List[Tuple[float, float]]:
+    return list(zip(self.processed_starts, self.original_starts))
+
+  def to_original(self, time: float, is_end: bool = False) -> float:
+    """
+    With `is_end`, a time right on a cut is taken as the end of the stretch before it
+    """
+    find = bisect_left if is_end else bisect_right
+    index = max(find(self.processed_starts, time) - 1, 0)
+
+    return self.original_starts[index] + time - self.processed_starts[index]
+
+  def map_item(self, item: dict) -> dict:
+    """
+    A copy of an AWS Transcribe item with its times on the original recording
+    """
+    if "start_time" not in item:
+      return item
+
+    item = dict(item)
+    item["start_time"] = f"{self.to_original(float(item['start_time'])):.3f}"
+    item["end_time"] = f"{self.to_original(float(item['end_time']), is_end=True):.3f}"
+
+    return item
+
+
+class SilenceTrimmer:
+  """
+  Cuts pauses longer than `min_silence_sec` out of 16-bit mono PCM, fed in
+  chunks of any size as it's decoded, and records the cuts in `offset_map`.
+
+  Frames are told silent by their energy, computed with NumPy a chunk at a
+  time, and then walked run by run rather than frame by frame. No more than
+  `min_silence_sec` of audio is held back while a pause is still undecided.
+  """
+
+  def __init__(
+    self,
+    sample_rate: int,
+    threshold_dbfs: float = SILENCE_THRESHOLD_DBFS,
+    min_silence_sec: float = MIN_SILENCE_SEC,
+    keep_silence_sec: float = KEEP_SILENCE_SEC,
+    frame_sec: float = FRAME_SEC,
+  ) -> None:
+    self.sample_rate = sample_rate
+    self.frame_size = max(int(sample_rate * frame_sec), 1)
+    self.min_silence = int(sample_rate * min_silence_sec)
+    self.keep_silence = int(sample_rate * keep_silence_sec)
+    # Mean square of a full-scale sine at the threshold
+    self.threshold_power = (32767 * 10 ** (threshold_dbfs / 20)) ** 2 / 2
+
+    self.offset_map = TimeOffsetMap()
+    self.input_samples = 0
+    self.output_samples = 0
+
+    self._remainder = np.zeros(0, dtype=np.int16)
+    self._output: List[np.ndarray] = []
+    # The pause so far while undecided, or only its last `keep_silence` samples once cut
+    self._silence: List[np.ndarray] = []
+    self._silence_length = 0
+    self._is_cutting = False
+
+  def feed(self, samples: np.ndarray) -> np.ndarray:
+    """
+    Returns the samples to keep so far
+    """
+    if len(self._remainder):
+      samples = np.concatenate((self._remainder, samples))
+
+    frame_count = len(samples) // self.frame_size
+    self._remainder = samples[frame_count * self.frame_size:]
+    samples = samples[:frame_count * self.frame_size]
+
+    if frame_count:
+      frames = samples.reshape(frame_count, self.frame_size).astype(np.float32)
+      is_silent = np.mean(frames * frames, axis=1) < self.threshold_power
+
+      bounds = np.flatnonzero(np.diff(is_silent)) + 1
+      starts = np.concatenate(([0], bounds))
+      ends = np.concatenate((bounds, [frame_count]))
+
+      for start, end in zip(starts.tolist(), ends.tolist()):
+        run = samples[start * self.frame_size:end * self.frame_size]
+
+        if is_silent[start]:
+          self._add_silence(run)
+        else:
+          self._end_silence()
+          self._emit(run)
+
+        self.input_samples += len(run)
+
+    return self._take_output()
+
+  def flush(self) -> np.ndarray:
+    """
+    Returns the rest of the samples to keep. A pause at the very end is cut
+    after its first `keep_silence` samples
+    """
+    if not self._is_cutting:
+      self._emit_silence()
+      self._emit(self._remainder)
+
+    self.input_samples += len(self._remainder)
+    self._remainder = np.zeros(0, dtype=np.int16)
+    self._reset_silence()
+
+    return self._take_output()
+
+  def _add_silence(self, run: np.ndarray) -> None:
+    self._silence.append(run)
+    self._silence_length += len(run)
+
+    if not self._is_cutting and self._silence_length > self.min_silence:
+      self._is_cutting = True
+      silence = np.concatenate(self._silence)
+      self._emit(silence[:self.keep_silence])
+      self._silence = [silence[-self.keep_silence:]] if self.keep_silence else []
+
+    elif self._is_cutting:
+      silence = np.concatenate(self._silence)
+      self._silence = [silence[-self.keep_silence:]] if self.keep_silence else []
+
+  def _end_silence(self) -> None:
+    if self._is_cutting:
+      tail_length = sum(len(samples) for samples in self._silence)
+      self.offset_map.add(
+        self.output_samples / self.sample_rate,
+        (self.input_samples - tail_length) / self.sample_rate,
+      )
+
+    self._emit_silence()
+    self._reset_silence()
+
+  def _emit_silence(self) -> None:
+    for samples in self._silence:
+      self._emit(samples)
+
+  def _reset_silence(self) -> None:
+    self._silence = []
+    self._silence_length = 0
+    self._is_cutting = False
+
+  def _emit(self, samples: np.ndarray) -> None:
+    if len(samples):
+      self._output.append(samples)
+      self.output_samples += len(samples)
+
+  def _take_output(self) -> np.ndarray:
+    output = np.concatenate(self._output) if self._output else np.zeros(0, dtype=np.int16)
+    self._output = []
+
+    return output
@@ -0,0 +1,63 @@
+from typing import List, Optional, Sequence, Tuple
+
+# A word transcribed by two overlapping segments may come back with slightly
+# different timings, anything starting before the last kept word ends is a repeat
+DUPLICATE_TOLERANCE_SEC = 0.05
+
+
+class SegmentItemStitcher:
+  """
+  Merges AWS Transcribe items of overlapping audio segments into one timeline.
+
+  Segments are given as (start_time, end_time) in the source audio, and their
+  items are fed in segment order, each with times relative to its segment.
+  Each overlap is cut at its midpoint: a word is kept from the segment which
+  owns its start time, unless it starts before the last kept word ended.
+  Punctuation follows the word before it.
+  """
+
+  def __init__(self, segments: Sequence[Tuple[float, float]]) -> None:
+    self._cuts: List[float] = [
+      (next_start + end_time) / 2
+      for (_, end_time), (next_start, _) in zip(segments, segments[1:])
+    ]
+    self._segments = segments
+
+    self._offset = 0.0
+    self._own_start = 0.0
+    self._own_end = float("inf")
+    self._last_end = float("-inf")
+    self._keep_punctuation = False
+
+  def begin_segment(self, index: int) -> None:
+    self._offset = self._segments[index][0]
+    self._own_start = self._cuts[index - 1] if index > 0 else float("-inf")
+    self._own_end = self._cuts[index] if index < len(self._cuts) else float("inf")
+    self._keep_punctuation = False
+
+  def feed(self, item: dict) -> Optional[dict]:
+    """
+    Returns the item with times shifted onto the source audio, or None if it's dropped
+    """
+    if item.get("type") != "pronunciation":
+      return item if self._keep_punctuation else None
+
+    start_time = float(item["start_time"]) + self._offset
+
+    keep = (
+      self._own_start <= start_time < self._own_end
+      and start_time >= self._last_end - DUPLICATE_TOLERANCE_SEC
+    )
+    self._keep_punctuation = keep
+
+    if not keep:
+      return None
+
+    end_time = float(item["end_time"]) + self._offset
+    self._last_end = end_time
+
+    return {
+      **item,
+      "start_time": f"{start_time:.3f}",
+      "end_time": f"{end_time:.3f}",
+    }
@@ -0,0 +1,54 @@
+from enum import Enum
+
+from src.utils.cache import SizedLRUCache
+
+
+class SubtitleFormatEnum(str, Enum):
+  SRT = "srt"
+  VTT = "vtt"
+
+
+SUBTITLE_MEDIA_TYPES = {
+  SubtitleFormatEnum.SRT: "application/x-subrip",
+  SubtitleFormatEnum.VTT: "text/vtt",
+}
+
+VTT_HEADER = "WEBVTT\n\n"
+
+
+def format_timestamp(seconds: float, fmt: SubtitleFormatEnum) -> str:
+  """
+  Formats seconds as `HH:MM:SS,mmm` for SRT, or `HH:MM:SS.mmm` for WebVTT
+  """
+  total_ms = int(round(max(seconds, 0) * 1000))
+  hours, rest = divmod(total_ms, 3600 * 1000)
+  minutes, rest = divmod(rest, 60 * 1000)
+  secs, ms = divmod(rest, 1000)
+
+  separator = "," if fmt == SubtitleFormatEnum.SRT else "."
+  return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+
+def render_cue(
+  index: int,
+  start_time: float,
+  end_time: float,
+  content: str,
+  fmt: SubtitleFormatEnum,
+) -> str:
+  """
+  Renders a single cue; `index` starts from 1
+  """
+  timing = f"{format_timestamp(start_time, fmt)} --> {format_timestamp(end_time, fmt)}"
+
+  # A blank line ends a cue, so it can't appear within one
+  text = " ".join(content.split())
+
+  return f"{index}\n{timing}\n{text}\n\n"
+
+
+class SubtitleCache(SizedLRUCache):
+  """
+  LRU cache of rendered subtitle files, bounded by the total length of the cached files.
+  Keys should include the transcription version, so edits never serve stale output
+  """
@@ -0,0 +1,93 @@
+import re
+import threading
+from typing import Dict, List, Optional
+
+import tiktoken
+
+DEFAULT_ENCODING = "cl100k_base"
+# Rough size of a token, for when no encoding could be loaded
+CHARS_PER_TOKEN = 4
+
+# Ends of sentences, keeping the punctuation with the sentence
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+_encodings: Dict[Optional[str], tiktoken.Encoding] = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model_name: Optional[str] = None) -> Optional[tiktoken.Encoding]:
+  """
+  Returns the tiktoken encoding of a model, or None if it can't be loaded.
+  Encodings are downloaded on first use, so a failure isn't cached and is retried later
+  """
+  encoding = _encodings.get(model_name)
+  if encoding is not None:
+    return encoding
+
+  with _encodings_lock:
+    try:
+      try:
+        encoding = tiktoken.encoding_for_model(model_name) if model_name else tiktoken.get_encoding(DEFAULT_ENCODING)
+      except KeyError:
+        encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+      print(f"Error while loading token encoding, counting approximately: {e}")
+      return None
+
+    _encodings[model_name] = encoding
+
+  return encoding
+
+
+def count_tokens(text: str, encoding: Optional[tiktoken.Encoding] = None) -> int:
+  if encoding is None:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+  # Ordinary, so text which looks like a special token is counted as text
+  return len(encoding.encode_ordinary(text))
+
+
+def split_into_token_windows(
+  text: str,
+  max_tokens: int,
+  encoding: Optional[tiktoken.Encoding] = None,
+) -> List[str]:
+  """
+  Splits text into windows of at most `max_tokens` tokens, on sentence
+  boundaries. A sentence longer than a window is cut on token boundaries
+  """
+  windows: List[str] = []
+  sentences: List[str] = []
+  window_tokens = 0
+
+  for sentence in SENTENCE_END_PATTERN.split(text.strip()):
+    if not sentence:
+      continue
+
+    tokens = count_tokens(sentence, encoding)
+
+    if sentences and window_tokens + tokens > max_tokens:
+      windows.append(" ".join(sentences))
+      sentences = []
+      window_tokens = 0
+
+    if tokens > max_tokens:
+      windows.extend(_cut_sentence(sentence, max_tokens, encoding))
+      continue
+
+    sentences.append(sentence)
+    window_tokens += tokens
+
+  if sentences:
+    windows.append(" ".join(sentences))
+
+  return windows
+
+
+def _cut_sentence(sentence: str, max_tokens: int, encoding: Optional[tiktoken.Encoding]) -> List[str]:
+  if encoding is None:
+    size = max_tokens * CHARS_PER_TOKEN
+    return [sentence[start:start + size] for start in range(0, len(sentence), size)]
+
+  tokens = encoding.encode_ordinary(sentence)
+  return [encoding.decode(tokens[start:start + max_tokens]) for start in range(0, len(tokens), max_tokens)]
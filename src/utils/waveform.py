@@ -0,0 +1,116 @@
+import struct
+from enum import Enum
+from typing import List
+
+import numpy as np
+
+# Packed layout, little-endian:
+#   magic, peaks per second float32, peak count n
+#   peaks   int8[2 * n], the min and max of every window in turn
+WAVEFORM_MAGIC = b"VLP1"
+WAVEFORM_HEADER = struct.Struct("<4sfI")
+
+WAVEFORM_MEDIA_TYPE = "application/octet-stream"
+
+
+class WaveformFormatEnum(str, Enum):
+  JSON = "json"
+  BINARY = "binary"
+
+
+def _pack(peaks: np.ndarray, peaks_per_sec: float) -> bytes:
+  return WAVEFORM_HEADER.pack(WAVEFORM_MAGIC, peaks_per_sec, len(peaks)) + peaks.tobytes()
+
+
+class PeakBuilder:
+  """
+  Min and max of every window of `samples_per_peak` samples of 16-bit PCM,
+  fed in chunks of any size, computed a chunk at a time with NumPy and
+  scaled down to int8. A partial window at the end is a peak of its own.
+  """
+
+  def __init__(self, sample_rate: int, samples_per_peak: int) -> None:
+    self.sample_rate = sample_rate
+    self.samples_per_peak = samples_per_peak
+
+    self._remainder = np.zeros(0, dtype=np.int16)
+    self._peaks: List[np.ndarray] = []
+
+  def __len__(self) -> int:
+    return sum(len(peaks) for peaks in self._peaks)
+
+  def feed(self, samples: np.ndarray) -> None:
+    if len(self._remainder):
+      samples = np.concatenate((self._remainder, samples))
+
+    window_count = len(samples) // self.samples_per_peak
+    self._remainder = samples[window_count * self.samples_per_peak:]
+
+    if window_count:
+      self._add(samples[:window_count * self.samples_per_peak].reshape(window_count, self.samples_per_peak))
+
+  def pack(self) -> bytes:
+    if len(self._remainder):
+      self._add(self._remainder.reshape(1, -1))
+      self._remainder = np.zeros(0, dtype=np.int16)
+
+    peaks = np.concatenate(self._peaks) if self._peaks else np.zeros((0, 2), dtype=np.int8)
+
+    return _pack(peaks, self.sample_rate / self.samples_per_peak)
+
+  def _add(self, windows: np.ndarray) -> None:
+    peaks = np.empty((len(windows), 2), dtype=np.int8)
+    # Top byte of the sample, so -32768..32767 becomes -128..127
+    peaks[:, 0] = windows.min(axis=1) >> 8
+    peaks[:, 1] = windows.max(axis=1) >> 8
+
+    self._peaks.append(peaks)
+
+
+class WaveformPeaks:
+  """
+  Read-only view over packed peaks, as a NumPy (n, 2) array into the packed bytes
+  """
+
+  def __init__(self, packed: bytes) -> None:
+    magic, peaks_per_sec, count = WAVEFORM_HEADER.unpack_from(packed)
+    if magic != WAVEFORM_MAGIC:
+      raise ValueError("Not packed waveform peaks")
+
+    self.peaks_per_sec = peaks_per_sec
+    self.peaks = np.frombuffer(
+      packed, dtype=np.int8, count=2 * count, offset=WAVEFORM_HEADER.size
+    ).reshape(count, 2)
+
+  def __len__(self) -> int:
+    return len(self.peaks)
+
+  @property
+  def duration(self) -> float:
+    return len(self) / self.peaks_per_sec if self.peaks_per_sec else 0.0
+
+  def downsample(self, count: int) -> "WaveformPeaks":
+    """
+    At most `count` peaks over the whole audio, every one the min and max
+    of the peaks it covers, so short spikes aren't lost
+    """
+    if count >= len(self):
+      return self
+
+    starts = np.arange(count, dtype=np.int64) * len(self) // count
+    peaks = np.empty((count, 2), dtype=np.int8)
+    peaks[:, 0] = np.minimum.reduceat(self.peaks[:, 0], starts)
+    peaks[:, 1] = np.maximum.reduceat(self.peaks[:, 1], starts)
+
+    return WaveformPeaks(_pack(peaks, self.peaks_per_sec * count / len(self)))
+
+  def pack(self) -> bytes:
+    return _pack(self.peaks, self.peaks_per_sec)
+
+  def to_dict(self) -> dict:
+    return {
+      "peaks_per_sec": round(float(self.peaks_per_sec), 6),
+      "duration": round(self.duration, 3),
+      "min": self.peaks[:, 0].tolist(),
+      "max": self.peaks[:, 1].tolist(),
+    }
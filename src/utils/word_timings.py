@@ -0,0 +1,160 @@
+import struct
+import sys
+from array import array
+from enum import Enum
+from typing import List
+
+import numpy as np
+
+# Packed layout, little-endian:
+#   magic, word count n
+#   start times   float32[n]
+#   end times     float32[n]
+#   word offsets  uint32[n + 1], into the text
+#   text          UTF-8, words back to back
+WORD_TIMINGS_MAGIC = b"VLW1"
+WORD_TIMINGS_HEADER = struct.Struct("<4sI")
+
+WORD_TIMINGS_MEDIA_TYPE = "application/octet-stream"
+
+
+class WordTimingsFormatEnum(str, Enum):
+  JSON = "json"
+  BINARY = "binary"
+
+
+def _pack_arrays(
+  start_times: bytes,
+  end_times: bytes,
+  offsets: bytes,
+  text: bytes,
+  word_count: int,
+) -> bytes:
+  return b"".join((
+    WORD_TIMINGS_HEADER.pack(WORD_TIMINGS_MAGIC, word_count),
+    start_times,
+    end_times,
+    offsets,
+    text,
+  ))
+
+
+class WordTimingsBuilder:
+  """
+  Collects the timing of every word of a transcript from AWS Transcribe items,
+  in flat arrays rather than a dict per word, and packs them into one blob.
+  Punctuation is appended to the word before it.
+  """
+
+  def __init__(self) -> None:
+    self._start_times = array("f")
+    self._end_times = array("f")
+    self._offsets = array("I", [0])
+    self._text = bytearray()
+
+  def __len__(self) -> int:
+    return len(self._start_times)
+
+  def feed(self, item: dict) -> None:
+    content = item["alternatives"][0]["content"].encode()
+
+    if item.get("type") != "pronunciation":
+      if self._start_times:
+        self._text += content
+        self._offsets[-1] = len(self._text)
+      return
+
+    self._start_times.append(float(item["start_time"]))
+    self._end_times.append(float(item["end_time"]))
+    self._text += content
+    self._offsets.append(len(self._text))
+
+  def pack(self) -> bytes:
+    arrays = [self._start_times, self._end_times, self._offsets]
+
+    if sys.byteorder == "big":
+      arrays = [array(values.typecode, values) for values in arrays]
+      for values in arrays:
+        values.byteswap()
+
+    return _pack_arrays(
+      *(values.tobytes() for values in arrays),
+      bytes(self._text),
+      len(self),
+    )
+
+
+class WordTimings:
+  """
+  Read-only view over packed word timings. The arrays are NumPy views into
+  the packed bytes, so neither loading nor slicing builds an object per word.
+  """
+
+  def __init__(self, packed: bytes) -> None:
+    magic, word_count = WORD_TIMINGS_HEADER.unpack_from(packed)
+    if magic != WORD_TIMINGS_MAGIC:
+      raise ValueError("Not packed word timings")
+
+    offset = WORD_TIMINGS_HEADER.size
+    self.start_times = np.frombuffer(packed, dtype="<f4", count=word_count, offset=offset)
+    offset += 4 * word_count
+    self.end_times = np.frombuffer(packed, dtype="<f4", count=word_count, offset=offset)
+    offset += 4 * word_count
+    self.offsets = np.frombuffer(packed, dtype="<u4", count=word_count + 1, offset=offset)
+    offset += 4 * (word_count + 1)
+
+    self.text = memoryview(packed)[offset:]
+
+  def __len__(self) -> int:
+    return len(self.start_times)
+
+  def window(self, t_start: float, t_end: float) -> slice:
+    """
+    Words overlapping `[t_start, t_end]`, found by binary search on both time arrays
+    """
+    first = int(np.searchsorted(self.end_times, t_start, side="left"))
+    last = int(np.searchsorted(self.start_times, t_end, side="right"))
+
+    return slice(first, max(first, last))
+
+  def words(self, window: slice) -> List[str]:
+    offsets = self.offsets[window.start:window.stop + 1]
+    if len(offsets) < 2:
+      return []
+
+    text = self.text[offsets[0]:offsets[-1]].tobytes()
+    bounds = (offsets - offsets[0]).tolist()
+
+    # Offsets count bytes, which only match string indices for ASCII text
+    if text.isascii():
+      text = text.decode()
+      return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    return [text[start:end].decode() for start, end in zip(bounds, bounds[1:])]
+
+  def to_columns(self, window: slice) -> dict:
+    """
+    A slice of the words as parallel lists, with times rounded to milliseconds
+    """
+    return {
+      "word_index": window.start,
+      "start_times": np.round(self.start_times[window].astype(np.float64), 3).tolist(),
+      "end_times": np.round(self.end_times[window].astype(np.float64), 3).tolist(),
+      "words": self.words(window),
+    }
+
+  def pack_window(self, window: slice) -> bytes:
+    """
+    Packs a slice of the words in the same layout, with offsets rebased onto its own text
+    """
+    offsets = self.offsets[window.start:window.stop + 1]
+    if len(offsets) < 2:
+      return _pack_arrays(b"", b"", np.zeros(1, dtype="<u4").tobytes(), b"", 0)
+
+    return _pack_arrays(
+      self.start_times[window].tobytes(),
+      self.end_times[window].tobytes(),
+      (offsets - offsets[0]).astype("<u4").tobytes(),
+      self.text[offsets[0]:offsets[-1]].tobytes(),
+      window.stop - window.start,
+    )
@@ -1,8 +1,13 @@
-from unittest.mock import MagicMock
+import json
+import re
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 
 from src.services.note import (
    NoteService,
 )
+from src.utils.tokens import count_tokens, split_into_token_windows
 
 from .utils import (
   # GENERIC OBJECTS
@@ -45,4 +50,115 @@ def test_fetch_note_mongodb():
 
     service.fetch_note_from_mongodb(**input_values)
 
-    service.fetch_note_from_mongodb.assert_called_once_with(**input_values)
\ No newline at end of file
+    service.fetch_note_from_mongodb.assert_called_once_with(**input_values)
+
+def make_stream_chunk(content):
+  return MagicMock(choices=[MagicMock(delta=MagicMock(content=content))])
+
+
+@pytest.mark.asyncio
+async def test_stream_cornell_sections(mocker):
+  answer = json.dumps(EXPECTED_RESPONSE_CONVERT_CORNELL_JSON)
+
+  async def stream():
+    # Tokens split blocks anywhere
+    for start in range(0, len(answer), 7):
+      yield make_stream_chunk(answer[start:start + 7])
+    yield MagicMock(choices=[])
+
+  client = MagicMock()
+  client.chat.completions.create = AsyncMock(return_value=stream())
+  mocker.patch("src.services.note.get_async_openai_client", return_value=client)
+
+  sections = [
+    section
+    async for section in NoteService().stream_cornell_sections(
+      transcript=TRANSCRIPT, language=NOTE_LANGUAGE,
+    )
+  ]
+
+  assert sections == [
+    (section, text)
+    for section in ("main", "cues", "summary")
+    for text in EXPECTED_RESPONSE_CONVERT_CORNELL_JSON[section]
+  ]
+  assert client.chat.completions.create.call_args.kwargs["stream"] is True
+
+@pytest.mark.asyncio
+async def test_stream_cornell_sections_map_reduce(mocker):
+  mocker.patch("src.services.note.get_encoding", return_value=None)
+  mocker.patch.object(NoteService, "MAP_WINDOW_TOKENS", 20)
+  mocker.patch.object(NoteService, "REDUCE_INPUT_TOKENS", 10 ** 6)
+
+  async def stream():
+    yield make_stream_chunk(json.dumps({"main": ["merged"], "cues": [], "summary": []}))
+
+  client = MagicMock()
+  client.chat.completions.create = AsyncMock(return_value=stream())
+  mocker.patch("src.services.note.get_async_openai_client", return_value=client)
+
+  service = NoteService()
+  mocker.patch.object(service, "complete_cornell_json", return_value={"main": ["note of part"]})
+  transcript = " ".join(f"Sentence number {i} is here." for i in range(20))
+
+  sections = [
+    section
+    async for section in service.stream_cornell_sections(
+      transcript=transcript, language=NOTE_LANGUAGE, map_reduce=True,
+    )
+  ]
+
+  # Windows are noted without streaming, and only their merge is streamed
+  assert service.complete_cornell_json.call_count == len(split_into_token_windows(transcript, 20))
+  reduce_prompt = client.chat.completions.create.call_args.kwargs["messages"][0]["content"]
+  assert "note of part" in reduce_prompt
+  assert sections == [("main", "merged")]
+
+def test_split_into_token_windows():
+  transcript = " ".join(f"Sentence number {i} is here." for i in range(50))
+
+  windows = split_into_token_windows(transcript, max_tokens=20)
+
+  assert len(windows) > 1
+  assert all(count_tokens(window) <= 20 for window in windows)
+  assert " ".join(windows) == transcript
+
+def test_split_cuts_long_sentences():
+  windows = split_into_token_windows("a" * 100, max_tokens=10)
+
+  assert windows == ["a" * 40, "a" * 40, "a" * 20]
+
+def test_convert_text_into_cornell_json_map_reduce(mocker):
+  mocker.patch("src.services.note.get_encoding", return_value=None)
+  mocker.patch.object(NoteService, "MAP_WINDOW_TOKENS", 20)
+  mocker.patch.object(NoteService, "REDUCE_INPUT_TOKENS", 10 ** 6)
+
+  prompts = []
+  def complete(system_prompt):
+    prompts.append(system_prompt)
+    part = re.search(r"PART (\d+) OF", system_prompt)
+    return {"main": [f"note of part {part.group(1)}" if part else "merged"]}
+
+  service = NoteService()
+  mocker.patch.object(service, "complete_cornell_json", side_effect=complete)
+  transcript = " ".join(f"Sentence number {i} is here." for i in range(20))
+  window_count = len(split_into_token_windows(transcript, 20))
+
+  note = service.convert_text_into_cornell_json_map_reduce(transcript, NOTE_LANGUAGE)
+
+  # Every window is noted, then the notes are merged in one step, in order
+  assert window_count > 1
+  assert len(prompts) == window_count + 1
+  reduce_prompt = prompts[-1]
+  positions = [reduce_prompt.index(f"note of part {part}") for part in range(1, window_count + 1)]
+  assert positions == sorted(positions)
+  assert note == {"main": ["merged"]}
+
+def test_group_notes_for_reduce(mocker):
+  mocker.patch.object(NoteService, "REDUCE_INPUT_TOKENS", 50)
+  notes = [{"main": ["x" * 80], "cues": [], "summary": []} for _ in range(5)]
+
+  groups = NoteService().group_notes_for_reduce(notes)
+
+  # Oversized notes still pair up, and the last one isn't left alone
+  assert [len(group) for group in groups] == [2, 3]
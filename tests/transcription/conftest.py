@@ -0,0 +1,13 @@
+import pytest
+from src.services.transcription import (
+  TranscriptionService
+)
+
+@pytest.fixture(scope="session")
+def transcription_service():
+  """
+  Create Transcription Service object
+  """
+
+  transcription_service = TranscriptionService()
+  return transcription_service
@@ -0,0 +1,91 @@
+# UNIT TEST FOR CHUNK GROUPING
+from src.utils.chunking import (
+  ChunkGrouper,
+  ChunkGroupingStrategyEnum,
+  MAX_CHUNK_CHARS,
+  group_transcript_items,
+)
+
+from .utils import (
+  AWS_TRANSCRIPT_ITEMS,
+)
+
+
+def word(content, start_time, end_time):
+  return {
+    "type": "pronunciation",
+    "start_time": str(start_time),
+    "end_time": str(end_time),
+    "alternatives": [{"confidence": "0.99", "content": content}],
+  }
+
+
+def punctuation(content):
+  return {"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": content}]}
+
+
+def test_group_by_word_count_keeps_trailing_punctuation():
+  chunks = group_transcript_items(
+    AWS_TRANSCRIPT_ITEMS, strategy=ChunkGroupingStrategyEnum.WORD_COUNT, max_words=5
+  )
+
+  assert [chunk.content for chunk in chunks] == [
+    "Selamat pagi, hari ini kita",
+    "belajar aljabar.",
+  ]
+  assert chunks[0].start_time == 0.0
+  assert chunks[0].end_time == 1.9
+  assert chunks[1].duration == 1.1
+
+
+def test_group_by_sentence():
+  items = AWS_TRANSCRIPT_ITEMS + [
+    word("Siap", 3.5, 3.9), punctuation("?"),
+  ]
+
+  chunks = group_transcript_items(items, strategy=ChunkGroupingStrategyEnum.SENTENCE)
+
+  assert [chunk.content for chunk in chunks] == [
+    "Selamat pagi, hari ini kita belajar aljabar.",
+    "Siap?",
+  ]
+
+
+def test_group_by_silence():
+  items = [word("satu", 0.0, 0.5), word("dua", 0.6, 1.0), word("tiga", 2.5, 3.0)]
+
+  chunks = group_transcript_items(
+    items, strategy=ChunkGroupingStrategyEnum.SILENCE, silence_gap=1.0
+  )
+
+  assert [chunk.content for chunk in chunks] == ["satu dua", "tiga"]
+
+
+def test_group_by_duration():
+  items = [word(f"w{i}", i * 1.0, i * 1.0 + 0.9) for i in range(10)]
+
+  chunks = group_transcript_items(
+    items, strategy=ChunkGroupingStrategyEnum.DURATION, max_duration=3.0
+  )
+
+  assert all(chunk.end_time - chunk.start_time <= 3.0 for chunk in chunks)
+  assert " ".join(chunk.content for chunk in chunks) == " ".join(f"w{i}" for i in range(10))
+
+
+def test_chunks_never_exceed_max_chars():
+  items = [word("panjang" * 5, i * 0.1, i * 0.1 + 0.05) for i in range(50)]
+
+  chunks = group_transcript_items(items, strategy=ChunkGroupingStrategyEnum.SENTENCE)
+
+  assert len(chunks) > 1
+  assert all(len(chunk.content) <= MAX_CHUNK_CHARS for chunk in chunks)
+
+
+def test_grouper_feed_is_incremental():
+  grouper = ChunkGrouper(strategy=ChunkGroupingStrategyEnum.WORD_COUNT, max_words=1)
+
+  assert grouper.feed(word("satu", 0.0, 0.5)) is None
+  assert grouper.feed(punctuation(",")) is None
+  assert grouper.feed(word("dua", 0.6, 1.0)).content == "satu,"
+  assert grouper.flush().content == "dua"
+  assert grouper.flush() is None
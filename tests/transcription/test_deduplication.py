@@ -0,0 +1,175 @@
+# UNIT TEST FOR AUDIO AND TRANSCRIPTION DEDUPLICATION
+import hashlib
+import io
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.models.upload import AudioUpload
+from src.schemas.transcription import TranscriptionJobStatusEnum
+from src.services.transcription import TranscriptionService
+from src.services.transcription_backend import LocalTranscriptionBackend
+from src.services.transcription_supervisor import TranscriptionJobSupervisor
+from src.services.upload import UploadService, hash_file
+
+from .utils import (
+  OWNER_ID,
+  make_transcription_job,
+)
+
+AUDIO = b"ID3" + bytes(range(256)) * 64
+AUDIO_HASH = hashlib.sha256(AUDIO).hexdigest()
+
+
+def make_supervisor():
+  backend = LocalTranscriptionBackend(latency_sec=0, audio_duration_sec=30)
+  supervisor = TranscriptionJobSupervisor(
+    session_factory=MagicMock,
+    service=TranscriptionService(backend=backend),
+    event_driven=False,
+  )
+  supervisor.service.store_transcription_result = MagicMock()
+  supervisor.service.clone_transcription = MagicMock()
+  supervisor.service.find_transcription_by_content = MagicMock(return_value=None)
+
+  return supervisor
+
+
+def make_job(job_name: str):
+  job = make_transcription_job(job_name)
+  job.content_hash = AUDIO_HASH
+
+  return job
+
+
+def test_hash_file_rewinds():
+  file = io.BytesIO(AUDIO)
+
+  assert hash_file(file) == (AUDIO_HASH, len(AUDIO))
+  assert file.tell() == 0
+
+
+def test_store_audio_reuses_identical_object():
+  s3_client = MagicMock()
+  session = MagicMock()
+  session.execute.return_value.scalar_one_or_none.return_value = "first_abc123_lecture.mp3"
+
+  upload, is_duplicate = UploadService("bucket", s3_client=s3_client).store_audio(
+    session, OWNER_ID, "second_def456_lecture.mp3", io.BytesIO(AUDIO)
+  )
+
+  assert is_duplicate
+  assert upload.object_key == "first_abc123_lecture.mp3"
+  assert upload.content_hash == AUDIO_HASH
+  s3_client.upload_fileobj.assert_not_called()
+
+
+def test_store_audio_uploads_new_content():
+  s3_client = MagicMock()
+  session = MagicMock()
+  session.execute.return_value.scalar_one_or_none.return_value = None
+
+  upload, is_duplicate = UploadService("bucket", s3_client=s3_client).store_audio(
+    session, OWNER_ID, "first_abc123_lecture.mp3", io.BytesIO(AUDIO)
+  )
+
+  assert not is_duplicate
+  assert upload.object_key == "first_abc123_lecture.mp3"
+  s3_client.upload_fileobj.assert_called_once()
+
+
+@pytest.mark.parametrize("is_shared", [True, False])
+def test_delete_audio_keeps_shared_object(is_shared):
+  s3_client = MagicMock()
+  session = MagicMock()
+  session.get.return_value = AudioUpload(
+    filename="second_def456_lecture.mp3", object_key="first_abc123_lecture.mp3"
+  )
+  session.execute.return_value.first.return_value = ("first_abc123_lecture.mp3",) if is_shared else None
+
+  UploadService("bucket", s3_client=s3_client).delete_audio(session, "second_def456_lecture.mp3")
+
+  if is_shared:
+    s3_client.delete_object.assert_not_called()
+  else:
+    # With its waveform peaks and pre-processed audio
+    assert [call.kwargs["Key"] for call in s3_client.delete_object.call_args_list] == [
+      "first_abc123_lecture.mp3", "first_abc123_lecture.peaks", "first_abc123_lecture_16k.mp3"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_job_waits_for_original():
+  supervisor = make_supervisor()
+
+  original = await supervisor.enqueue(make_job("original"))
+
+  duplicate = await supervisor.submit_if_duplicate(make_job("duplicate"))
+  assert duplicate.duplicate_of == original.job_name
+  assert duplicate not in supervisor.pending_jobs()
+
+  duplicate = await supervisor.wait_for_job(duplicate.job_name, timeout=5)
+  await supervisor.stop()
+
+  assert duplicate.status == TranscriptionJobStatusEnum.COMPLETED
+  supervisor.service.store_transcription_result.assert_called_once()
+
+  cloned = supervisor.service.clone_transcription.call_args.kwargs
+  assert cloned["source_id"] == original.transcription_id
+  assert cloned["job"] is duplicate
+
+
+@pytest.mark.asyncio
+async def test_duplicate_of_stored_transcription_is_copied():
+  supervisor = make_supervisor()
+  source_id = uuid.uuid4()
+  supervisor.service.find_transcription_by_content.return_value = source_id
+
+  job = await supervisor.submit_if_duplicate(make_job("duplicate"))
+  job = await supervisor.wait_for_job(job.job_name, timeout=5)
+  await supervisor.stop()
+
+  assert job.status == TranscriptionJobStatusEnum.COMPLETED
+  assert supervisor.service.clone_transcription.call_args.kwargs["source_id"] == source_id
+
+
+@pytest.mark.asyncio
+async def test_new_audio_is_not_a_duplicate():
+  supervisor = make_supervisor()
+
+  assert await supervisor.submit_if_duplicate(make_job("new")) is None
+  assert await supervisor.submit_if_duplicate(make_transcription_job("unhashed")) is None
+
+
+@pytest.mark.asyncio
+async def test_edited_source_is_transcribed_instead():
+  supervisor = make_supervisor()
+  supervisor.service.find_transcription_by_content.return_value = uuid.uuid4()
+  supervisor.service.clone_transcription.return_value = None
+
+  job = await supervisor.submit_if_duplicate(make_job("duplicate"))
+  job = await supervisor.wait_for_job(job.job_name, timeout=5)
+  await supervisor.stop()
+
+  assert job.status == TranscriptionJobStatusEnum.COMPLETED
+  supervisor.service.store_transcription_result.assert_called_once()
+
+
+def test_only_unedited_transcriptions_are_reused():
+  session = MagicMock()
+  TranscriptionService(backend=MagicMock()).find_transcription_by_content(
+    session=session, content_hash=AUDIO_HASH, language="id-ID"
+  )
+
+  query = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+  assert "NOT (EXISTS (SELECT transcription_chunks.id" in query
+  assert "transcription_chunks.is_edited = true" in query
+
+  # Nor copied, once edited after being found
+  session.execute.return_value.scalar_one_or_none.return_value = None
+  assert TranscriptionService(backend=MagicMock()).clone_transcription(
+    session=session, source_id=uuid.uuid4(), job=make_job("duplicate")
+  ) is None
+  session.add.assert_not_called()
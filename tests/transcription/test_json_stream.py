@@ -0,0 +1,70 @@
+# UNIT TEST FOR INCREMENTAL TRANSCRIPT PARSING
+import json
+import pytest
+
+from src.utils.json_stream import JSONArrayStreamParser, JSONObjectArraysStreamParser
+
+from .utils import (
+  AWS_TRANSCRIPT_DATA,
+  AWS_TRANSCRIPT_ITEMS,
+)
+
+
+def parse_in_slices(document: bytes, slice_size: int):
+  parser = JSONArrayStreamParser(key="items")
+  items = []
+
+  for i in range(0, len(document), slice_size):
+    items.extend(parser.feed(document[i:i + slice_size]))
+
+  parser.close()
+  return items
+
+
+@pytest.mark.parametrize("slice_size", [1, 7, 64, 100_000])
+def test_parse_items_in_slices(slice_size):
+  document = json.dumps(AWS_TRANSCRIPT_DATA, ensure_ascii=False).encode()
+
+  assert parse_in_slices(document, slice_size) == AWS_TRANSCRIPT_ITEMS
+
+
+def test_parse_ignores_key_inside_strings_and_later_arrays():
+  data = {
+    "jobName": "job",
+    "results": {
+      "transcripts": [{"transcript": 'kata "items": [1] dan "é"'}],
+      "items": [{"content": "é"}],
+      "audio_segments": [{"items": [0]}],
+    },
+  }
+  document = json.dumps(data, ensure_ascii=False).encode()
+
+  assert parse_in_slices(document, 3) == [{"content": "é"}]
+
+
+def test_parse_skips_prefix_without_buffering_it():
+  parser = JSONArrayStreamParser(key="items")
+
+  parser.feed(b'{"results": {"transcripts": [{"transcript": "' + b"a" * 10_000)
+
+  assert len(parser._buffer) <= 64
+
+
+def test_truncated_document_raises():
+  document = json.dumps(AWS_TRANSCRIPT_DATA).encode()
+
+  with pytest.raises(ValueError):
+    parse_in_slices(document[: len(document) // 2], 16)
+
+
+@pytest.mark.parametrize("slice_size", [1, 5, 100_000])
+def test_parse_every_array_of_an_object(slice_size):
+  answer = {"main": ['kata "cues": [1]', "dua"], "cues": [], "summary": ["tiga"]}
+  document = "```json\n" + json.dumps(answer, indent=2) + "\n```"
+
+  parser = JSONObjectArraysStreamParser()
+  pairs = []
+  for i in range(0, len(document), slice_size):
+    pairs.extend(parser.feed_text(document[i:i + slice_size]))
+
+  assert pairs == [("main", 'kata "cues": [1]'), ("main", "dua"), ("summary", "tiga")]
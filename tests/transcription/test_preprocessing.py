@@ -0,0 +1,144 @@
+# UNIT TEST FOR AUDIO PRE-PROCESSING
+import sys
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from src.schemas.transcription import TranscriptionJobStatusEnum
+from src.services.audio_preprocess import AudioPreprocessService
+from src.services.transcription import TranscriptionService
+from src.services.transcription_backend import LocalTranscriptionBackend
+from src.services.transcription_supervisor import TranscriptionJobSupervisor
+from src.utils.silence import SilenceTrimmer, TimeOffsetMap
+
+from .utils import make_transcription_job
+
+SAMPLE_RATE = 16000
+
+# Stands in for ffmpeg: decodes to a second of silence, and fails to encode
+# after logging more than a pipe holds
+FAKE_FFMPEG = f"""#!{sys.executable}
+import sys
+
+if "pipe:0" in sys.argv:
+  sys.stdin.buffer.read()
+  sys.stderr.write("lame: bad frame\\n" * 100000)
+  sys.exit(1)
+
+sys.stdout.buffer.write(bytes({SAMPLE_RATE} * 2))
+"""
+
+
+def tone(seconds, amplitude=8000):
+  t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+  return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def silence(seconds):
+  return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+def trim(samples, chunk_size):
+  trimmer = SilenceTrimmer(SAMPLE_RATE, min_silence_sec=1.0, keep_silence_sec=0.2)
+  output = [
+    trimmer.feed(samples[start:start + chunk_size])
+    for start in range(0, len(samples), chunk_size)
+  ]
+  output.append(trimmer.flush())
+
+  return trimmer, np.concatenate(output)
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 16001, 10 ** 6])
+def test_trimmer_cuts_long_silences(chunk_size):
+  # Speech at 0-2s, 12-14s and 14.5-16.5s, then 3s of silence
+  samples = np.concatenate((tone(2), silence(10), tone(2), silence(0.5), tone(2), silence(3)))
+
+  trimmer, output = trim(samples, chunk_size)
+
+  # The short pause is kept, and 0.2s on both sides of the long one, and after the last word
+  assert len(output) == trimmer.output_samples == int(SAMPLE_RATE * (6.5 + 0.4 + 0.2))
+  assert trimmer.input_samples == len(samples)
+
+  offset_map = trimmer.offset_map
+  assert offset_map.to_pairs() == [(0.0, 0.0), (2.2, pytest.approx(11.8))]
+  assert offset_map.to_original(2.2 + 0.2) == pytest.approx(12.0)
+  assert offset_map.to_original(6.4) == pytest.approx(16.0)
+
+
+def test_trimmer_keeps_audio_without_long_silences():
+  samples = np.concatenate((tone(1), silence(0.5), tone(1)))
+
+  trimmer, output = trim(samples, 4096)
+
+  assert np.array_equal(output, samples)
+  assert len(trimmer.offset_map) == 1
+
+
+def test_offset_map_maps_items():
+  offset_map = TimeOffsetMap([(0.0, 0.0), (5.0, 65.0)])
+  punctuation = {"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": "."}]}
+
+  assert offset_map.map_item(punctuation) is punctuation
+
+  item = offset_map.map_item({
+    "type": "pronunciation",
+    "start_time": "4.5",
+    "end_time": "5.0",
+    "alternatives": [{"confidence": "0.99", "content": "pagi"}],
+  })
+  assert (item["start_time"], item["end_time"]) == ("4.500", "5.000")
+
+  item = offset_map.map_item({**item, "start_time": "5.0", "end_time": "5.4"})
+  assert (item["start_time"], item["end_time"]) == ("65.000", "65.400")
+
+
+@pytest.mark.asyncio
+async def test_preprocessed_job_is_stored_on_original_times():
+  backend = LocalTranscriptionBackend(latency_sec=0, audio_duration_sec=20)
+  service = TranscriptionService(backend=backend)
+
+  preprocess_service = MagicMock()
+  # 10s kept, a minute cut, then the rest
+  preprocess_service.preprocess.return_value = (
+    "test_audio_16k.mp3", TimeOffsetMap([(0.0, 0.0), (10.0, 70.0)])
+  )
+
+  original_preprocess = service.preprocess_transcription
+  service.preprocess_transcription = lambda job: original_preprocess(job, preprocess_service=preprocess_service)
+  original_delete = service.delete_preprocessed_transcription
+  service.delete_preprocessed_transcription = lambda job: original_delete(job, preprocess_service=preprocess_service)
+
+  supervisor = TranscriptionJobSupervisor(session_factory=MagicMock, service=service)
+  supervisor.service.store_transcription_result = MagicMock()
+
+  job = await supervisor.submit_preprocessed(make_transcription_job())
+  assert job.status == TranscriptionJobStatusEnum.QUEUED
+
+  job = await supervisor.wait_for_job(job.job_name, timeout=5)
+  await supervisor.stop()
+
+  assert job.status == TranscriptionJobStatusEnum.COMPLETED
+  assert job.file_uri == "s3://bucket/test_audio_16k.mp3"
+  preprocess_service.preprocess.assert_called_once_with("bucket", "test_audio.mp3")
+  # Only the upload is kept once the transcription is stored
+  preprocess_service.delete_processed.assert_called_once_with("bucket", "test_audio.mp3")
+
+  stored_chunks = supervisor.service.store_transcription_result.call_args.kwargs["transcription_chunks"]
+
+  assert all(not (10 < chunk.start_time < 70) for chunk in stored_chunks)
+  assert stored_chunks[-1].end_time > 70
+
+
+def test_failed_encoding_is_reported_and_deleted(tmp_path):
+  ffmpeg_path = tmp_path / "ffmpeg"
+  ffmpeg_path.write_text(FAKE_FFMPEG)
+  ffmpeg_path.chmod(0o755)
+
+  s3_client = MagicMock()
+  s3_client.upload_fileobj.side_effect = lambda file, *args, **kwargs: file.read()
+
+  with pytest.raises(RuntimeError, match="lame: bad frame$"):
+    AudioPreprocessService(s3_client=s3_client, ffmpeg_path=str(ffmpeg_path)).preprocess("bucket", "lecture.mp3")
+
+  s3_client.delete_object.assert_called_once_with(Bucket="bucket", Key="lecture_16k.mp3")
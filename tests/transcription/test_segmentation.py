@@ -0,0 +1,164 @@
+# UNIT TEST FOR SEGMENTED TRANSCRIPTION
+import pytest
+from unittest.mock import MagicMock
+
+from src.schemas.transcription import TranscriptionJobStatusEnum
+from src.services.audio_segment import AudioSegmentService
+from src.services.transcription import TranscriptionService
+from src.services.transcription_backend import LocalTranscriptionBackend
+from src.services.transcription_supervisor import TranscriptionJobSupervisor
+from src.utils.audio import MP3FrameIndex, plan_audio_segments
+from src.utils.stitching import SegmentItemStitcher
+from src.utils.word_timings import WordTimings
+
+from .utils import make_transcription_job
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417 byte frames of 1152 samples
+MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x00]) + b"\x00" * 413
+MP3_FRAME_DURATION = 1152 / 44100
+ID3_TAG = b"ID3\x03\x00\x00" + bytes([0, 0, 0, 20]) + b"x" * 20
+
+
+def word(content, start_time, end_time):
+  return {
+    "type": "pronunciation",
+    "start_time": str(start_time),
+    "end_time": str(end_time),
+    "alternatives": [{"confidence": "0.99", "content": content}],
+  }
+
+
+def test_frame_index_skips_tags_across_feeds():
+  data = ID3_TAG + MP3_FRAME * 1000 + b"TAG" + b"\x00" * 125
+
+  frame_index = MP3FrameIndex()
+  for start in range(0, len(data), 1000):
+    frame_index.feed(data[start:start + 1000])
+
+  assert len(frame_index.offsets) == 1000
+  assert frame_index.offsets[0] == len(ID3_TAG)
+  assert frame_index.end_offset == len(ID3_TAG) + len(MP3_FRAME) * 1000
+  assert frame_index.duration == pytest.approx(1000 * MP3_FRAME_DURATION)
+
+
+def test_segments_overlap_on_frame_boundaries():
+  frame_index = MP3FrameIndex()
+  frame_index.feed(MP3_FRAME * 4000)  # ~104s
+
+  segments = plan_audio_segments(frame_index, segment_duration=30, overlap=5)
+
+  assert len(segments) == 4
+  assert segments[0].start_time == 0 and segments[-1].end_time == frame_index.duration
+  assert segments[-1].byte_end == frame_index.end_offset
+
+  for segment, next_segment in zip(segments, segments[1:]):
+    assert segment.end_time - next_segment.start_time >= 5
+    assert segment.byte_end > next_segment.byte_start
+    assert next_segment.byte_start % len(MP3_FRAME) == 0
+
+
+def test_long_audio_gets_longer_segments_past_the_limit():
+  frame_index = MP3FrameIndex()
+  frame_index.feed(MP3_FRAME * 4000)  # ~104s
+
+  segments = plan_audio_segments(frame_index, segment_duration=30, overlap=5, max_segments=2)
+
+  assert len(segments) == 2
+  assert segments[0].end_time - segments[1].start_time >= 5
+  assert segments[-1].end_time == frame_index.duration
+
+
+def test_short_audio_is_a_single_segment():
+  frame_index = MP3FrameIndex()
+  frame_index.feed(MP3_FRAME * 100)
+
+  assert len(plan_audio_segments(frame_index, segment_duration=30, overlap=5)) == 1
+
+
+def test_stitcher_drops_overlap_duplicates():
+  # Segments [0, 12] and [10, 20], cut at 11
+  stitcher = SegmentItemStitcher([(0.0, 12.0), (10.0, 20.0)])
+  punctuation = {"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": "."}]}
+
+  stitcher.begin_segment(0)
+  first = [
+    stitcher.feed(word("satu", 9.5, 10.2)),
+    stitcher.feed(word("dua", 10.8, 11.4)),
+    stitcher.feed(punctuation),
+    stitcher.feed(word("tiga", 11.6, 11.9)),
+  ]
+
+  stitcher.begin_segment(1)
+  second = [
+    stitcher.feed(word("dua", 0.82, 1.4)),
+    stitcher.feed(punctuation),
+    stitcher.feed(word("tiga", 1.6, 1.9)),
+    stitcher.feed(word("empat", 2.0, 2.5)),
+  ]
+
+  kept = [item for item in first + second if item is not None]
+  words = [item["alternatives"][0]["content"] for item in kept]
+
+  assert words == ["satu", "dua", ".", "tiga", "empat"]
+  assert kept[-1]["start_time"] == "12.000"
+
+
+@pytest.mark.asyncio
+async def test_segmented_job_is_stitched_and_stored():
+  backend = LocalTranscriptionBackend(latency_sec=0, audio_duration_sec=60)
+  service = TranscriptionService(backend=backend)
+
+  segment_service = MagicMock()
+  segment_service.split_mp3.return_value = [
+    (MagicMock(index=0, start_time=0.0, end_time=60.0), "audio.part000.mp3"),
+    (MagicMock(index=1, start_time=50.0, end_time=110.0), "audio.part001.mp3"),
+  ]
+
+  original_split = service.split_segmented_transcription
+  service.split_segmented_transcription = lambda job, **kwargs: original_split(job, segment_service=segment_service, **kwargs)
+  original_delete = service.delete_segmented_transcription
+  service.delete_segmented_transcription = lambda job: original_delete(job, segment_service=segment_service)
+
+  supervisor = TranscriptionJobSupervisor(session_factory=MagicMock, service=service)
+  supervisor.service.store_transcription_result = MagicMock()
+
+  job = await supervisor.submit_segmented(make_transcription_job())
+  assert job.status == TranscriptionJobStatusEnum.QUEUED
+
+  # Segment completions are pushed by the local backend
+  job = await supervisor.wait_for_job(job.job_name, timeout=5)
+  await supervisor.stop()
+
+  assert job.status == TranscriptionJobStatusEnum.COMPLETED
+  assert [segment.job_name for segment in job.segments] == [
+    f"{job.job_name}-part000", f"{job.job_name}-part001"
+  ]
+
+  stored_chunks = supervisor.service.store_transcription_result.call_args.kwargs["transcription_chunks"]
+  start_times = [chunk.start_time for chunk in stored_chunks]
+
+  assert start_times == sorted(start_times)
+  assert 55 < stored_chunks[-1].end_time <= 110
+
+  word_timings = WordTimings(supervisor.service.store_transcription_result.call_args.kwargs["word_timings"].pack())
+  assert (word_timings.start_times[1:] >= word_timings.start_times[:-1]).all()
+
+  # Segments are deleted once stitched
+  segment_service.delete_segments.assert_called_once_with(
+    "bucket", ["audio.part000.mp3", "audio.part001.mp3"]
+  )
+  assert not any(job_name.startswith(f"{job.job_name}-part") for job_name in backend._jobs)
+
+
+def test_failed_split_deletes_copied_segments():
+  s3_client = MagicMock()
+  s3_client.get_object.return_value = {"Body": MagicMock(iter_chunks=lambda chunk_size: iter([MP3_FRAME * 4000]))}
+  s3_client.create_multipart_upload.return_value = {"UploadId": "upload"}
+  s3_client.upload_part_copy.side_effect = [{"CopyPartResult": {"ETag": "etag"}}] * 2 + [RuntimeError("copy failed")] * 10
+  s3_client.delete_objects.return_value = {}
+
+  with pytest.raises(RuntimeError):
+    AudioSegmentService(s3_client=s3_client).split_mp3("bucket", "audio.mp3", segment_duration=30, overlap=5)
+
+  deleted = s3_client.delete_objects.call_args.kwargs["Delete"]["Objects"]
+  assert [item["Key"] for item in deleted] == [f"audio.part{index:03d}.mp3" for index in range(4)]
@@ -0,0 +1,91 @@
+# UNIT TEST FOR SUBTITLE EXPORT
+import uuid
+from unittest.mock import MagicMock
+
+from src.utils.time import get_datetime_now_jkt
+from src.utils.subtitles import (
+  SubtitleCache,
+  SubtitleFormatEnum,
+  format_timestamp,
+  render_cue,
+)
+
+from .utils import (
+  FakeRow,
+)
+
+CHUNK_ROWS = [
+  FakeRow(start_time=0.0, end_time=1.9, content="Selamat pagi hari ini kita"),
+  FakeRow(start_time=1.9, end_time=3661.25, content="belajar\n\naljabar"),
+]
+
+
+def make_session_factory(rows):
+  session = MagicMock()
+  session.execute.return_value = iter(rows)
+
+  return MagicMock(return_value=session)
+
+
+def test_format_timestamp():
+  assert format_timestamp(3661.25, SubtitleFormatEnum.SRT) == "01:01:01,250"
+  assert format_timestamp(3661.25, SubtitleFormatEnum.VTT) == "01:01:01.250"
+  assert format_timestamp(0.0004, SubtitleFormatEnum.SRT) == "00:00:00,000"
+
+
+def test_render_cue_collapses_blank_lines():
+  cue = render_cue(
+    index=2, start_time=1.9, end_time=3.0, content="belajar\n\naljabar", fmt=SubtitleFormatEnum.SRT
+  )
+
+  assert cue == "2\n00:00:01,900 --> 00:00:03,000\nbelajar aljabar\n\n"
+
+
+def test_iter_transcription_subtitles_vtt(transcription_service):
+  output = "".join(transcription_service.iter_transcription_subtitles(
+    tsc_id=uuid.uuid4(),
+    version=get_datetime_now_jkt(),
+    fmt=SubtitleFormatEnum.VTT,
+    session_factory=make_session_factory(CHUNK_ROWS),
+  ))
+
+  assert output.startswith("WEBVTT\n\n1\n00:00:00.000 --> 00:00:01.900\n")
+  assert output.endswith("2\n00:00:01.900 --> 01:01:01.250\nbelajar aljabar\n\n")
+
+
+def test_iter_transcription_subtitles_served_from_cache(transcription_service):
+  tsc_id = uuid.uuid4()
+  version = get_datetime_now_jkt()
+
+  first = "".join(transcription_service.iter_transcription_subtitles(
+    tsc_id=tsc_id,
+    version=version,
+    fmt=SubtitleFormatEnum.SRT,
+    session_factory=make_session_factory(CHUNK_ROWS),
+  ))
+
+  session_factory = make_session_factory(CHUNK_ROWS)
+  second = "".join(transcription_service.iter_transcription_subtitles(
+    tsc_id=tsc_id,
+    version=version,
+    fmt=SubtitleFormatEnum.SRT,
+    session_factory=session_factory,
+  ))
+
+  assert first == second
+  session_factory.assert_not_called()
+
+
+def test_subtitle_cache_evicts_least_recently_used():
+  cache = SubtitleCache(max_size=10, max_entry_size=8)
+
+  cache.set("a", "aaaa")
+  cache.set("b", "bbbb")
+  cache.get("a")
+  cache.set("c", "cccc")
+  cache.set("d", "d" * 9)
+
+  assert cache.get("a") == "aaaa"
+  assert cache.get("b") is None
+  assert cache.get("c") == "cccc"
+  assert cache.get("d") is None
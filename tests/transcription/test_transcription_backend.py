@@ -0,0 +1,95 @@
+# UNIT TEST FOR TRANSCRIPTION BACKENDS
+import pytest
+from botocore.exceptions import ClientError
+
+from src.services.transcription_backend import (
+  AWSTranscriptionBackend,
+  LocalTranscriptionBackend,
+  create_transcription_backend,
+  generate_transcript_items,
+)
+
+from .utils import (
+  JOB_NAME,
+  FakeTranscribeClient,
+)
+
+
+async def start_local_job(backend: LocalTranscriptionBackend):
+  return await backend.start_job(
+    job_name=JOB_NAME,
+    file_uri="s3://bucket/test_audio.mp3",
+    file_format="mp3",
+    language_code="id-ID",
+  )
+
+
+def test_generated_items_follow_words_per_sec():
+  items = list(generate_transcript_items(600, words_per_sec=2.5, seed="lecture"))
+  words = [item for item in items if item["type"] == "pronunciation"]
+
+  assert 1200 <= len(words) <= 1500
+  assert float(words[-1]["end_time"]) <= 600
+  assert all(float(a["end_time"]) <= float(b["start_time"]) for a, b in zip(words, words[1:]))
+  assert items == list(generate_transcript_items(600, words_per_sec=2.5, seed="lecture"))
+
+
+@pytest.mark.asyncio
+async def test_local_job_completes_after_latency():
+  backend = LocalTranscriptionBackend(latency_sec=60)
+  job_result = await start_local_job(backend)
+  assert job_result["TranscriptionJob"]["TranscriptionJobStatus"] == "IN_PROGRESS"
+
+  with pytest.raises(ClientError):
+    await backend.fetch_transcript(JOB_NAME)
+
+  backend.latency_sec = 0
+  job_result = await backend.get_job(JOB_NAME)
+  assert job_result["TranscriptionJob"]["TranscriptionJobStatus"] == "COMPLETED"
+
+
+@pytest.mark.asyncio
+async def test_local_job_name_conflict_and_delete():
+  backend = LocalTranscriptionBackend(latency_sec=0)
+  await start_local_job(backend)
+
+  with pytest.raises(ClientError):
+    await start_local_job(backend)
+
+  await backend.delete_job(JOB_NAME)
+
+  with pytest.raises(ClientError):
+    await backend.get_job(JOB_NAME)
+
+
+@pytest.mark.asyncio
+async def test_local_streamed_items_match_transcript_document():
+  backend = LocalTranscriptionBackend(latency_sec=0, audio_duration_sec=60)
+  await start_local_job(backend)
+
+  streamed = [item async for item in backend.iter_transcript_items(JOB_NAME)]
+  document = await backend.fetch_transcript(JOB_NAME)
+
+  assert streamed == document["results"]["items"]
+  assert document["results"]["transcripts"][0]["transcript"].startswith(
+    streamed[0]["alternatives"][0]["content"]
+  )
+
+
+@pytest.mark.asyncio
+async def test_aws_backend_wraps_boto3_client():
+  client = FakeTranscribeClient(["COMPLETED"])
+  backend = AWSTranscriptionBackend(client_factory=lambda: client)
+
+  job_result = await backend.get_job(JOB_NAME)
+
+  assert job_result["TranscriptionJob"]["TranscriptionJobStatus"] == "COMPLETED"
+  assert client.calls == 1
+
+
+def test_create_backend_by_name():
+  assert isinstance(create_transcription_backend("local"), LocalTranscriptionBackend)
+  assert isinstance(create_transcription_backend("aws"), AWSTranscriptionBackend)
+
+  with pytest.raises(ValueError):
+    create_transcription_backend("unknown")
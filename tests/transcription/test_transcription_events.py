@@ -0,0 +1,154 @@
+# UNIT TEST FOR PUSHED TRANSCRIPTION JOB STATE CHANGES
+import pytest
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.controllers.transcription as transcription_controller
+from src.schemas.transcription import (
+  TranscriptionJobSegmentSchema,
+  TranscriptionJobStatusEnum,
+)
+from src.services.transcription import TranscriptionService
+from src.services.transcription_backend import LocalTranscriptionBackend
+from src.services.transcription_supervisor import TranscriptionJobSupervisor
+
+from .utils import JOB_NAME, make_transcription_job
+
+
+def make_event(job_name: str, status: str) -> dict:
+  return {
+    "source": "aws.transcribe",
+    "detail-type": "Transcribe Job State Change",
+    "detail": {"TranscriptionJobName": job_name, "TranscriptionJobStatus": status},
+  }
+
+
+def make_supervisor(**backend_options) -> TranscriptionJobSupervisor:
+  backend = LocalTranscriptionBackend(audio_duration_sec=30, **backend_options)
+  supervisor = TranscriptionJobSupervisor(
+    session_factory=MagicMock,
+    service=TranscriptionService(backend=backend),
+  )
+  supervisor.service.store_transcription_result = MagicMock()
+
+  return supervisor
+
+
+@pytest.mark.asyncio
+async def test_local_backend_event_resolves_job_without_polling():
+  supervisor = make_supervisor(latency_sec=0.01)
+  backend = supervisor.service.backend
+  backend.get_job = MagicMock(side_effect=AssertionError("polled"))
+
+  await supervisor.start()
+  assert supervisor.event_driven
+
+  job = await supervisor.enqueue(make_transcription_job())
+  job = await supervisor.wait_for_job(job.job_name, timeout=5)
+  await supervisor.stop()
+
+  assert job.status == TranscriptionJobStatusEnum.COMPLETED
+  supervisor.service.store_transcription_result.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_event_marks_job_failed():
+  supervisor = make_supervisor()
+  job = make_transcription_job()
+  job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+  supervisor._jobs[job.job_name] = job
+
+  assert supervisor.handle_event(make_event(job.job_name, "FAILED"))
+  assert job.status == TranscriptionJobStatusEnum.FAILED
+  assert not supervisor.resolve("untracked-job", "COMPLETED")
+
+
+@pytest.mark.asyncio
+async def test_segment_events_complete_segmented_job_together():
+  supervisor = make_supervisor()
+  supervisor._schedule_finalize = MagicMock()
+
+  job = make_transcription_job()
+  job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+  job.segments = [
+    TranscriptionJobSegmentSchema(
+      index=index, job_name=f"{job.job_name}-part{index:03d}",
+      file_uri="s3://bucket/audio.mp3", start_time=index * 600.0, end_time=index * 600.0 + 615,
+    )
+    for index in range(2)
+  ]
+  supervisor._jobs[job.job_name] = job
+  supervisor._segment_parents.update({segment.job_name: job.job_name for segment in job.segments})
+
+  supervisor.resolve(job.segments[0].job_name, "COMPLETED")
+  supervisor._schedule_finalize.assert_not_called()
+
+  supervisor.resolve(job.segments[1].job_name, "COMPLETED")
+  supervisor._schedule_finalize.assert_called_once_with(job)
+
+
+@pytest.mark.asyncio
+async def test_queued_segment_event_keeps_its_slot():
+  supervisor = make_supervisor()
+  supervisor._schedule_finalize = MagicMock()
+
+  job = make_transcription_job()
+  job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+  job.segments = [
+    TranscriptionJobSegmentSchema(
+      index=0, job_name=f"{job.job_name}-part000",
+      file_uri="s3://bucket/audio.mp3", start_time=0.0, end_time=615.0,
+    )
+  ]
+  supervisor._jobs[job.job_name] = job
+  supervisor._segment_parents[job.segments[0].job_name] = job.job_name
+  supervisor._held_slots[job.job_name] = 1
+  supervisor.scheduler.running = 1
+
+  supervisor.resolve(job.segments[0].job_name, "QUEUED")
+
+  # Still running, and still polled by the fallback sweep
+  assert supervisor.scheduler.running == 1
+  supervisor.service.get_transcription_job = MagicMock(side_effect=AssertionError("polled"))
+  with pytest.raises(AssertionError, match="polled"):
+    await supervisor._poll_segments(job)
+
+  supervisor.resolve(job.segments[0].job_name, "COMPLETED")
+
+  assert supervisor.scheduler.running == 0
+  supervisor._schedule_finalize.assert_called_once_with(job)
+
+
+@pytest.mark.asyncio
+async def test_wait_for_job_returns_pending_job_on_timeout():
+  supervisor = make_supervisor()
+  job = make_transcription_job()
+  job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+  supervisor._jobs[job.job_name] = job
+
+  waited = await supervisor.wait_for_job(job.job_name, timeout=0.01)
+
+  assert waited.status == TranscriptionJobStatusEnum.IN_PROGRESS
+
+
+def test_events_endpoint_requires_secret(mocker):
+  mocker.patch.object(transcription_controller, "TRANSCRIPTION_EVENTS_SECRET", "s3cret")
+  resolve = mocker.patch.object(transcription_controller.transcription_supervisor, "resolve", return_value=True)
+
+  app = FastAPI()
+  app.include_router(transcription_controller.transcription_router)
+  client = TestClient(app)
+
+  response = client.post("/v1/transcription/events", json=make_event(JOB_NAME, "COMPLETED"))
+  assert response.status_code == 401
+  resolve.assert_not_called()
+
+  response = client.post(
+    "/v1/transcription/events",
+    json=make_event(JOB_NAME, "COMPLETED"),
+    headers={"X-Transcription-Events-Secret": "s3cret"},
+  )
+  assert response.status_code == 202
+  resolve.assert_called_once_with(job_name=JOB_NAME, status="COMPLETED", failure_reason=None)
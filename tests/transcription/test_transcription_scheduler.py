@@ -0,0 +1,124 @@
+# UNIT TEST FOR TRANSCRIPTION ADMISSION CONTROL
+import asyncio
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.schemas.transcription import TranscriptionJobStatusEnum
+from src.services.transcription import TranscriptionService
+from src.services.transcription_backend import LocalTranscriptionBackend
+from src.services.transcription_scheduler import TranscriptionScheduler
+from src.services.transcription_supervisor import TranscriptionJobSupervisor
+
+from .utils import make_transcription_job
+
+ALICE = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+BOB = uuid.UUID("00000000-0000-0000-0000-00000000000b")
+
+
+def admit_all(scheduler: TranscriptionScheduler):
+  admitted = []
+  while (entry := scheduler.admit()) is not None:
+    admitted.append(entry.job_name)
+
+  return admitted
+
+
+def test_admits_round_robin_across_users():
+  scheduler = TranscriptionScheduler(max_running=10)
+  for job_name in ("a1", "a2", "a3"):
+    scheduler.enqueue(ALICE, job_name)
+  scheduler.enqueue(BOB, "b1")
+
+  assert [scheduler.position(job_name) for job_name in ("a1", "a2", "a3", "b1")] == [1, 3, 4, 2]
+  assert admit_all(scheduler) == ["a1", "b1", "a2", "a3"]
+  assert scheduler.running == 4
+
+
+def test_admits_up_to_limit_in_order():
+  scheduler = TranscriptionScheduler(max_running=3)
+  scheduler.enqueue(ALICE, "a1")
+  scheduler.enqueue(BOB, "b1", weight=3)
+  scheduler.enqueue(ALICE, "a2")
+
+  # The heavy job waits at the head, rather than being overtaken
+  assert admit_all(scheduler) == ["a1"]
+
+  scheduler.release()
+  assert admit_all(scheduler) == ["b1"]
+
+  scheduler.release(3)
+  assert admit_all(scheduler) == ["a2"]
+
+
+def test_refuses_jobs_heavier_than_the_limit():
+  scheduler = TranscriptionScheduler(max_running=3)
+
+  with pytest.raises(ValueError):
+    scheduler.enqueue(ALICE, "a1", weight=4)
+
+  assert len(scheduler) == 0
+
+
+def test_requeued_job_goes_first():
+  scheduler = TranscriptionScheduler(max_running=1)
+  scheduler.enqueue(ALICE, "a1")
+  scheduler.enqueue(BOB, "b1", front=True)
+
+  assert scheduler.position("b1") == 1
+  assert scheduler.remove("a1")
+  assert admit_all(scheduler) == ["b1"]
+  assert len(scheduler) == 0
+
+
+def make_supervisor(max_running: int, backend_max_running: int = 0):
+  backend = LocalTranscriptionBackend(
+    latency_sec=0.05, audio_duration_sec=10, max_running_jobs=backend_max_running
+  )
+  supervisor = TranscriptionJobSupervisor(
+    session_factory=MagicMock,
+    service=TranscriptionService(backend=backend),
+    scheduler=TranscriptionScheduler(max_running=max_running),
+  )
+  supervisor.service.store_transcription_result = MagicMock()
+
+  return supervisor
+
+
+def make_job(job_name: str, owner_id: uuid.UUID):
+  job = make_transcription_job(job_name)
+  job.owner_id = owner_id
+
+  return job
+
+
+@pytest.mark.asyncio
+async def test_queued_jobs_run_within_limit():
+  supervisor = make_supervisor(max_running=2, backend_max_running=2)
+
+  jobs = [
+    await supervisor.enqueue(make_job(f"job-{index}", ALICE if index < 4 else BOB))
+    for index in range(6)
+  ]
+  positions = [supervisor.get_job(job.job_name).queue_position for job in jobs]
+  assert positions == [None, None, 1, 3, 2, 4]
+
+  jobs = await asyncio.gather(*[supervisor.wait_for_job(job.job_name, timeout=5) for job in jobs])
+  await supervisor.stop()
+
+  assert all(job.status == TranscriptionJobStatusEnum.COMPLETED for job in jobs)
+  assert supervisor.scheduler.running == 0
+
+
+@pytest.mark.asyncio
+async def test_quota_errors_are_retried(monkeypatch):
+  supervisor = make_supervisor(max_running=3, backend_max_running=1)
+  monkeypatch.setattr(supervisor, "START_RETRY_DELAY_SEC", 0.02)
+
+  jobs = [await supervisor.enqueue(make_job(f"job-{index}", ALICE)) for index in range(3)]
+  jobs = await asyncio.gather(*[supervisor.wait_for_job(job.job_name, timeout=5) for job in jobs])
+  await supervisor.stop()
+
+  assert all(job.status == TranscriptionJobStatusEnum.COMPLETED for job in jobs)
+  assert supervisor.scheduler.running == 0
@@ -0,0 +1,112 @@
+# UNIT TEST FOR TRANSCRIPTION SUPERVISOR
+import pytest
+from unittest.mock import MagicMock
+
+from src.schemas.transcription import (
+  TranscriptionJobSegmentSchema,
+  TranscriptionJobStatusEnum,
+)
+from src.services.transcription import TranscriptionService
+from src.services.transcription_backend import LocalTranscriptionBackend
+from src.services.transcription_supervisor import TranscriptionJobSupervisor
+
+from .utils import (
+  make_transcription_job,
+)
+
+
+async def make_supervisor(started: bool = True, **backend_options):
+  backend = LocalTranscriptionBackend(audio_duration_sec=30, **backend_options)
+  supervisor = TranscriptionJobSupervisor(
+    session_factory=MagicMock,
+    service=TranscriptionService(backend=backend),
+    event_driven=False,
+  )
+  supervisor.service.store_transcription_result = MagicMock()
+
+  job = make_transcription_job()
+  if started:
+    await supervisor.service.transcribe_file(
+      job_name=job.job_name,
+      file_uri=job.file_uri,
+      file_format=job.file_format,
+      language_code=job.language_code,
+    )
+
+  return supervisor, job
+
+
+@pytest.mark.asyncio
+async def test_sweep_keeps_in_progress_job_pending():
+  supervisor, job = await make_supervisor(latency_sec=60)
+  supervisor._jobs[job.job_name] = job
+  job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+
+  await supervisor.sweep()
+
+  assert job.status == TranscriptionJobStatusEnum.IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_completed_job_is_stored():
+  supervisor, job = await make_supervisor(started=False, latency_sec=0)
+
+  job = await supervisor.enqueue(job)
+  job = await supervisor.wait_for_job(job.job_name, timeout=5)
+  await supervisor.stop()
+
+  assert job.status == TranscriptionJobStatusEnum.COMPLETED
+  supervisor.service.store_transcription_result.assert_called_once()
+
+  stored = supervisor.service.store_transcription_result.call_args.kwargs
+  assert stored["transcription_data"].id == job.transcription_id
+  assert stored["transcription_data"].word_count > 0
+  assert len(stored["transcription_chunks"]) > 0
+  assert len(stored["word_timings"]) == stored["transcription_data"].word_count
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_marked_failed():
+  supervisor, job = await make_supervisor(latency_sec=0, failure_rate=1.0)
+  supervisor._jobs[job.job_name] = job
+  job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+
+  await supervisor.sweep()
+
+  assert job.status == TranscriptionJobStatusEnum.FAILED
+  supervisor.service.store_transcription_result.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_queued_segments_are_polled_until_finished():
+  supervisor, job = await make_supervisor(latency_sec=0)
+  supervisor._schedule_finalize = MagicMock()
+
+  job.status = TranscriptionJobStatusEnum.IN_PROGRESS
+  job.segments = [
+    TranscriptionJobSegmentSchema(
+      index=index, job_name=f"{job.job_name}-part{index:03d}",
+      file_uri="s3://bucket/audio.mp3", start_time=index * 600.0, end_time=index * 600.0 + 615,
+    )
+    for index in range(2)
+  ]
+  supervisor._jobs[job.job_name] = job
+  supervisor._held_slots[job.job_name] = 2
+  supervisor.scheduler.running = 2
+
+  # The backend accepts the first segment before running it
+  statuses = {job.segments[0].job_name: ["QUEUED", "COMPLETED"], job.segments[1].job_name: ["COMPLETED"]}
+  async def get_transcription_job(job_name):
+    return {"TranscriptionJob": {"TranscriptionJobStatus": statuses[job_name].pop(0)}}
+  supervisor.service.get_transcription_job = get_transcription_job
+
+  await supervisor.sweep()
+
+  assert [segment.status for segment in job.segments] == ["QUEUED", "COMPLETED"]
+  assert supervisor.scheduler.running == 1
+  supervisor._schedule_finalize.assert_not_called()
+
+  await supervisor.sweep()
+
+  assert supervisor.scheduler.running == 0
+  supervisor._schedule_finalize.assert_called_once_with(job)
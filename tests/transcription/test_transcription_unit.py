@@ -0,0 +1,314 @@
+# UNIT TEST FOR TRANSCRIPTION
+import uuid
+import pytest
+from datetime import timedelta
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+
+from src.utils.time import get_datetime_now_jkt
+from src.utils.pagination import encode_cursor, decode_cursor
+from src.utils.search import get_search_config
+
+from src.schemas.transcription import (
+  TranscriptionSchema,
+  TranscriptionChunkEditSchema,
+  ServiceRetrieveTranscriptionChunkItemSchema,
+)
+from src.services.transcription import TranscriptionEditConflictError
+
+from .utils import (
+  FakeRow,
+)
+
+GROUPED_ITEMS = [
+  ServiceRetrieveTranscriptionChunkItemSchema(
+    content="Selamat pagi hari ini kita", start_time="0.0", end_time="1.9", duration="1.90"
+  ),
+  ServiceRetrieveTranscriptionChunkItemSchema(
+    content="belajar aljabar", start_time="1.9", end_time="3.0", duration="1.10"
+  ),
+]
+
+
+def make_transcription_schema(tsc_id: uuid.UUID) -> TranscriptionSchema:
+  datetime_now = get_datetime_now_jkt()
+
+  return TranscriptionSchema(
+    id=tsc_id,
+    created_at=datetime_now,
+    updated_at=datetime_now,
+    is_deleted=False,
+    owner_id=uuid.uuid4(),
+    title="My Transcription",
+    tags=[],
+    duration=3.0,
+    language="id-ID",
+  )
+
+
+def test_generate_transcription_chunks(transcription_service):
+  tsc_id = uuid.uuid4()
+
+  response = transcription_service.generate_transcription_chunks(
+    transcription_id=tsc_id, items=GROUPED_ITEMS
+  )
+
+  assert round(response.duration, 2) == 3.0
+  assert [chunk.content for chunk in response.chunks] == [
+    "Selamat pagi hari ini kita", "belajar aljabar"
+  ]
+  assert all(chunk.transcription_id == tsc_id for chunk in response.chunks)
+
+  # All chunks of one transcription share a single timestamp
+  assert len({chunk.created_at for chunk in response.chunks}) == 1
+  assert len({chunk.id for chunk in response.chunks}) == 2
+
+
+def test_store_transcription_result_single_transaction(transcription_service):
+  tsc_id = uuid.uuid4()
+  chunks = transcription_service.generate_transcription_chunks(
+    transcription_id=tsc_id, items=GROUPED_ITEMS
+  ).chunks
+
+  session = MagicMock()
+
+  transcription_service.store_transcription_result(
+    session=session,
+    transcription_data=make_transcription_schema(tsc_id),
+    transcription_chunks=chunks,
+  )
+
+  # One executemany for all chunks, and one commit for the whole result
+  session.execute.assert_called_once()
+  assert len(session.execute.call_args.args[1]) == 2
+  session.commit.assert_called_once()
+
+
+def test_fetch_all_transcriptions_chunks_constant_queries(transcription_service):
+  tsc_ids = [uuid.uuid4(), uuid.uuid4()]
+  datetime_now = get_datetime_now_jkt()
+
+  transcriptions = [
+    FakeRow(id=tsc_id, created_at=datetime_now, title=f"Lecture {i}")
+    for i, tsc_id in enumerate(tsc_ids)
+  ]
+  chunks = [
+    FakeRow(id=uuid.uuid4(), transcription_id=tsc_ids[0], start_time=0.0, content="halo"),
+    FakeRow(id=uuid.uuid4(), transcription_id=tsc_ids[0], start_time=1.0, content="semua"),
+  ]
+
+  session = MagicMock()
+  session.execute.return_value.all.side_effect = [transcriptions, chunks]
+
+  response = transcription_service.fetch_all_transcriptions_chunks_db(
+    session=session, user=MagicMock()
+  )
+
+  assert session.execute.call_count == 2
+  assert response[0]["transcription"]["id"] == str(tsc_ids[0])
+  assert response[0]["transcription"]["created_at"] == datetime_now.isoformat()
+  assert [chunk["content"] for chunk in response[0]["chunks"]] == ["halo", "semua"]
+  assert response[1]["chunks"] == []
+
+
+def test_library_page_returns_cursor_when_more_rows(transcription_service):
+  datetime_now = get_datetime_now_jkt()
+  rows = [
+    FakeRow(id=uuid.uuid4(), created_at=datetime_now, title=f"Lecture {i}", chunk_count=i)
+    for i in range(3)
+  ]
+
+  session = MagicMock()
+  session.execute.return_value.all.return_value = rows
+
+  response = transcription_service.fetch_transcription_library_page(
+    session=session, user=MagicMock(), limit=2
+  )
+
+  assert len(response["transcriptions"]) == 2
+  assert response["transcriptions"][1]["chunk_count"] == 1
+  assert decode_cursor(response["next_cursor"], size=2) == [
+    datetime_now.isoformat(), str(rows[1].id)
+  ]
+
+
+def test_library_page_rejects_invalid_cursor(transcription_service):
+  with pytest.raises(ValueError):
+    transcription_service.fetch_transcription_library_page(
+      session=MagicMock(), user=MagicMock(), cursor="not-a-cursor"
+    )
+
+  with pytest.raises(ValueError):
+    transcription_service.fetch_transcription_library_page(
+      session=MagicMock(), user=MagicMock(), cursor=encode_cursor("yesterday", "abc")
+    )
+
+
+def test_generate_transcription_chunks_full_transcript(transcription_service):
+  response = transcription_service.generate_transcription_chunks(
+    transcription_id=uuid.uuid4(), items=GROUPED_ITEMS
+  )
+
+  assert response.full_transcript == "Selamat pagi hari ini kita belajar aljabar"
+  assert response.word_count == 7
+
+
+def test_fetch_one_transcription_single_lookup(transcription_service):
+  tsc_id = uuid.uuid4()
+  transcription = FakeRow(id=tsc_id, title="Lecture", full_transcript="halo semua")
+
+  session = MagicMock()
+  session.execute.return_value.first.return_value = transcription
+
+  response = transcription_service.fetch_one_transcriptions_chunks_db(
+    tsc_id=tsc_id, session=session, user=MagicMock(), include_chunks=False
+  )
+
+  session.execute.assert_called_once()
+  assert response["full_transcript"] == "halo semua"
+  assert "full_transcript" not in response["transcription"]
+  assert response["chunks"] == []
+
+
+def test_chunks_in_range_is_one_index_range_scan(transcription_service):
+  tsc_id = uuid.uuid4()
+  rows = [
+    FakeRow(id=uuid.uuid4(), transcription_id=tsc_id, start_time=float(i), end_time=i + 0.9, content=f"kata {i}")
+    for i in range(3)
+  ]
+
+  session = MagicMock()
+  session.execute.return_value.first.return_value = FakeRow(id=tsc_id)
+  session.execute.return_value.all.return_value = rows
+
+  response = transcription_service.fetch_transcription_chunks_in_range(
+    tsc_id=tsc_id, session=session, user=MagicMock(), t_start=60.0, t_end=90.0, limit=2
+  )
+
+  assert response["is_truncated"]
+  assert [chunk["content"] for chunk in response["chunks"]] == ["kata 0", "kata 1"]
+
+  query = str(session.execute.call_args.args[0].compile(compile_kwargs={"literal_binds": True}))
+  assert "transcription_chunks.start_time >= 30.0" in query
+  assert "transcription_chunks.start_time <= 90.0" in query
+  assert "transcription_chunks.end_time >= 60.0" in query
+
+
+def test_search_matches_each_config_through_the_gin_index(transcription_service):
+  rows = [
+    FakeRow(id=uuid.uuid4(), transcription_id=uuid.uuid4(), title="Aljabar", start_time=12.0, end_time=15.5, content="nilai eigen", rank=0.5 - i / 10)
+    for i in range(3)
+  ]
+
+  session = MagicMock()
+  session.execute.return_value.all.return_value = rows
+
+  response = transcription_service.search_transcription_chunks(
+    session=session, user=MagicMock(), query="nilai eigen", limit=2
+  )
+
+  assert [result["rank"] for result in response["results"]] == [0.5, 0.4]
+  assert decode_cursor(response["next_cursor"], size=2) == [0.4, str(rows[1].id)]
+
+  query = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+  assert query.count("transcription_chunks.search_vector @@ websearch_to_tsquery") == 3
+  assert "ORDER BY CASE" in query
+
+
+def test_search_config_follows_language():
+  assert get_search_config("id-ID") == "indonesian"
+  assert get_search_config("en") == "english"
+  assert get_search_config("ja-JP") == "simple"
+
+
+def make_edit_session(tsc_id, chunks, updated_at, with_offsets=True):
+  """
+  Session answering `update_transcription_chunks` reads, in order
+  """
+  transcription_result = MagicMock()
+  transcription_result.first.return_value = FakeRow(
+    id=tsc_id,
+    word_count=sum(len(content.split()) for _, content in chunks),
+  )
+
+  current_result = MagicMock()
+  current_result.all.return_value = []
+  offset = 0
+  for chunk_id, content in chunks:
+    current_result.all.return_value.append(
+      FakeRow(id=chunk_id, content=content, updated_at=updated_at, transcript_offset=offset if with_offsets else None)
+    )
+    offset += len(content) + 1
+
+  session = MagicMock()
+  session.execute.side_effect = [transcription_result, current_result] + [MagicMock() for _ in range(4)]
+
+  return session
+
+
+def test_update_chunks_splices_full_transcript(transcription_service):
+  tsc_id = uuid.uuid4()
+  updated_at = get_datetime_now_jkt()
+  chunks = [(uuid.uuid4(), "Selamat pagi hari"), (uuid.uuid4(), "ini kita belajar"), (uuid.uuid4(), "aljabar linear")]
+  session = make_edit_session(tsc_id, chunks, updated_at)
+
+  response = transcription_service.update_transcription_chunks(
+    tsc_id=tsc_id,
+    session=session,
+    user=MagicMock(),
+    chunk_edits=[TranscriptionChunkEditSchema(id=chunks[1][0], content="ini  kami pelajari bersama", updated_at=updated_at)],
+  )
+
+  assert response["chunks"][0]["content"] == "ini kami pelajari bersama"
+  session.commit.assert_called_once()
+
+  # Spliced within the db at the chunk's offset, checked against its old content
+  transcription_update = session.execute.call_args_list[-2].args[0].compile(dialect=postgresql.dialect())
+  assert "concat(substr(transcriptions.full_transcript" in str(transcription_update)
+  assert "ini kami pelajari bersama" in transcription_update.params.values()
+  assert "ini kita belajar" in transcription_update.params.values()
+  assert transcription_update.params["word_count"] == 9
+
+  # Only the chunks after the edit move, by its change in length
+  offset_update = session.execute.call_args_list[-1].args[0].compile(dialect=postgresql.dialect())
+  assert "transcription_chunks.transcript_offset > " in str(offset_update)
+  assert len("Selamat pagi hari ") in offset_update.params.values()
+  assert len("ini kami pelajari bersama") - len("ini kita belajar") in offset_update.params.values()
+
+
+def test_update_chunks_without_offsets_rebuilds_full_transcript(transcription_service):
+  tsc_id = uuid.uuid4()
+  updated_at = get_datetime_now_jkt()
+  chunks = [(uuid.uuid4(), "Selamat pagi hari"), (uuid.uuid4(), "ini kita belajar")]
+  session = make_edit_session(tsc_id, chunks, updated_at, with_offsets=False)
+  transcription_service.refresh_full_transcript = MagicMock()
+
+  transcription_service.update_transcription_chunks(
+    tsc_id=tsc_id,
+    session=session,
+    user=MagicMock(),
+    chunk_edits=[TranscriptionChunkEditSchema(id=chunks[0][0], content="Halo", updated_at=updated_at)],
+  )
+
+  transcription_service.refresh_full_transcript.assert_called_once_with(session=session, tsc_id=tsc_id)
+  session.commit.assert_called_once()
+
+
+def test_update_chunks_rejects_stale_edits(transcription_service):
+  tsc_id = uuid.uuid4()
+  updated_at = get_datetime_now_jkt()
+  chunks = [(uuid.uuid4(), "Selamat pagi hari")]
+  session = make_edit_session(tsc_id, chunks, updated_at)
+
+  with pytest.raises(TranscriptionEditConflictError) as e:
+    transcription_service.update_transcription_chunks(
+      tsc_id=tsc_id,
+      session=session,
+      user=MagicMock(),
+      chunk_edits=[TranscriptionChunkEditSchema(id=chunks[0][0], content="Halo", updated_at=updated_at - timedelta(seconds=1))],
+    )
+
+  assert e.value.chunk_ids == [chunks[0][0]]
+  assert session.execute.call_count == 2
+  session.rollback.assert_called_once()
+  session.commit.assert_not_called()
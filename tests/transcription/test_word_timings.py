@@ -0,0 +1,91 @@
+# UNIT TEST FOR WORD TIMINGS
+import struct
+import uuid
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from src.services.transcription import TranscriptionService
+from src.utils.word_timings import (
+  WORD_TIMINGS_HEADER,
+  WordTimings,
+  WordTimingsBuilder,
+)
+
+from .utils import FakeRow
+
+ITEMS = [
+  {"type": "pronunciation", "start_time": "0.0", "end_time": "0.4", "alternatives": [{"content": "Selamat"}]},
+  {"type": "pronunciation", "start_time": "0.5", "end_time": "0.9", "alternatives": [{"content": "pagi"}]},
+  {"type": "punctuation", "alternatives": [{"content": ","}]},
+  {"type": "pronunciation", "start_time": "1.2", "end_time": "1.6", "alternatives": [{"content": "ibu"}]},
+  {"type": "pronunciation", "start_time": "2.0", "end_time": "2.5", "alternatives": [{"content": "café"}]},
+  {"type": "punctuation", "alternatives": [{"content": "."}]},
+]
+
+
+def make_word_timings() -> WordTimings:
+  builder = WordTimingsBuilder()
+  for item in ITEMS:
+    builder.feed(item)
+
+  return WordTimings(builder.pack())
+
+
+def test_builder_attaches_punctuation():
+  word_timings = make_word_timings()
+
+  assert len(word_timings) == 4
+  assert word_timings.words(slice(0, 4)) == ["Selamat", "pagi,", "ibu", "café."]
+
+
+def test_window_selects_overlapping_words():
+  word_timings = make_word_timings()
+
+  assert word_timings.window(0.45, 1.3) == slice(1, 3)
+  assert word_timings.window(0.8, 0.8) == slice(1, 2)
+  assert word_timings.window(3.0, 9.0) == slice(4, 4)
+
+
+def test_to_columns_rounds_times():
+  columns = make_word_timings().to_columns(slice(2, 4))
+
+  assert columns == {
+    "word_index": 2,
+    "start_times": [1.2, 2.0],
+    "end_times": [1.6, 2.5],
+    "words": ["ibu", "café."],
+  }
+
+
+def test_pack_window_round_trips():
+  word_timings = make_word_timings()
+  packed = word_timings.pack_window(slice(1, 4))
+
+  _, word_count = WORD_TIMINGS_HEADER.unpack_from(packed)
+  assert word_count == 3
+
+  window = WordTimings(packed)
+  assert window.words(slice(0, 3)) == ["pagi,", "ibu", "café."]
+  assert window.start_times.tolist() == word_timings.start_times[1:4].tolist()
+  assert window.offsets[0] == 0
+
+
+def test_pack_empty_window():
+  packed = make_word_timings().pack_window(slice(4, 4))
+
+  assert len(WordTimings(packed)) == 0
+  assert len(packed) == WORD_TIMINGS_HEADER.size + struct.calcsize("<I")
+
+
+def test_edited_ranges_flag_stale_words():
+  session = MagicMock()
+  session.execute.return_value.all.return_value = [FakeRow(start_time=12.0, end_time=15.5)]
+
+  edited_ranges = TranscriptionService(backend=MagicMock()).fetch_edited_ranges(
+    tsc_id=uuid.uuid4(), session=session, t_start=10, t_end=20
+  )
+
+  assert edited_ranges == [(12.0, 15.5)]
+  query = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+  assert "transcription_chunks.is_edited = true" in query
@@ -0,0 +1,82 @@
+import uuid
+
+from src.utils.time import get_datetime_now_jkt
+
+from src.schemas.transcription import (
+  TranscriptionJobSchema,
+)
+
+JOB_NAME = "test-transcription-job"
+OWNER_ID = uuid.UUID("8338ad64-b029-45e8-ae40-883761acb4a9")
+
+# Trimmed `results.items` from an AWS Transcribe output document
+AWS_TRANSCRIPT_ITEMS = [
+  {"type": "pronunciation", "start_time": "0.0", "end_time": "0.4", "alternatives": [{"confidence": "0.99", "content": "Selamat"}]},
+  {"type": "pronunciation", "start_time": "0.4", "end_time": "0.8", "alternatives": [{"confidence": "0.99", "content": "pagi"}]},
+  {"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": ","}]},
+  {"type": "pronunciation", "start_time": "0.9", "end_time": "1.2", "alternatives": [{"confidence": "0.98", "content": "hari"}]},
+  {"type": "pronunciation", "start_time": "1.2", "end_time": "1.5", "alternatives": [{"confidence": "0.97", "content": "ini"}]},
+  {"type": "pronunciation", "start_time": "1.5", "end_time": "1.9", "alternatives": [{"confidence": "0.99", "content": "kita"}]},
+  {"type": "pronunciation", "start_time": "1.9", "end_time": "2.4", "alternatives": [{"confidence": "0.95", "content": "belajar"}]},
+  {"type": "pronunciation", "start_time": "2.4", "end_time": "3.0", "alternatives": [{"confidence": "0.96", "content": "aljabar"}]},
+  {"type": "punctuation", "alternatives": [{"confidence": "0.0", "content": "."}]},
+]
+
+AWS_TRANSCRIPT_DATA = {
+  "jobName": JOB_NAME,
+  "accountId": "123456789012",
+  "status": "COMPLETED",
+  "results": {
+    "transcripts": [{"transcript": "Selamat pagi, hari ini kita belajar aljabar."}],
+    "items": AWS_TRANSCRIPT_ITEMS,
+  },
+}
+
+
+def make_transcription_job(job_name: str = JOB_NAME) -> TranscriptionJobSchema:
+  datetime_now = get_datetime_now_jkt()
+
+  return TranscriptionJobSchema(
+    job_name=job_name,
+    transcription_id=uuid.uuid4(),
+    owner_id=OWNER_ID,
+    title="My Transcription",
+    tags=[],
+    language_code="id-ID",
+    file_uri="s3://bucket/test_audio.mp3",
+    file_format="mp3",
+    created_at=datetime_now,
+    updated_at=datetime_now,
+  )
+
+
+class FakeTranscribeClient:
+  """
+  Stand-in for the boto3 transcribe client, returning the queued statuses in order
+  """
+
+  def __init__(self, statuses):
+    self.statuses = list(statuses)
+    self.calls = 0
+
+  def get_transcription_job(self, TranscriptionJobName: str):
+    self.calls += 1
+    status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+
+    return {
+      "TranscriptionJob": {
+        "TranscriptionJobName": TranscriptionJobName,
+        "TranscriptionJobStatus": status,
+        "Transcript": {"TranscriptFileUri": "https://example.com/transcript.json"},
+      }
+    }
+
+
+class FakeRow:
+  """
+  Stand-in for a SQLAlchemy result row with attribute and `_mapping` access
+  """
+
+  def __init__(self, **fields):
+    self._mapping = fields
+    self.__dict__.update(fields)
@@ -0,0 +1,107 @@
+import io
+import os
+import struct
+
+import pytest
+
+from src.services.upload import MAX_AUDIO_DURATION_SEC, check_audio, peek_stream
+from src.utils.audio import AudioProbe, AudioProbeError, probe_audio, probe_audio_file
+
+DIR = os.path.dirname(__file__)
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417 bytes and 1152 samples a frame
+MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x00]) + b"\x00" * 413
+MP3_FRAME_DURATION = 1152 / 44100
+
+
+def read(name):
+  with open(os.path.join(DIR, name), "rb") as file:
+    return file.read()
+
+
+def box(box_type, payload):
+  return struct.pack(">I", 8 + len(payload)) + box_type + payload
+
+
+def make_m4a(duration_sec, handler_types=(b"soun",), moov_at_end=False):
+  ftyp = box(b"ftyp", b"M4A " + b"\x00\x00\x00\x00" + b"M4A isom")
+  # Version 0: version and flags, creation and modification times, timescale, duration
+  mvhd = box(b"mvhd", b"\x00" * 12 + struct.pack(">II", 1000, int(duration_sec * 1000)) + b"\x00" * 80)
+  traks = b"".join(
+    box(b"trak", box(b"mdia", box(b"hdlr", b"\x00" * 8 + handler_type + b"\x00" * 12)))
+    for handler_type in handler_types
+  )
+  moov = box(b"moov", mvhd + traks)
+  mdat = box(b"mdat", b"\x00" * 200_000)
+
+  return ftyp + mdat + moov if moov_at_end else ftyp + moov + mdat
+
+
+def test_probe_mp3_file():
+  probe = probe_audio_file(io.BytesIO(read("test_audio.mp3")))
+
+  assert probe.content_type == "audio/mpeg"
+  assert 250 < probe.duration < 270
+
+
+def test_probe_cbr_mp3_needs_size():
+  data = MP3_FRAME * 100
+
+  assert probe_audio(data[:4096]).duration is None
+  assert probe_audio(data[:4096], len(data)).duration == pytest.approx(100 * MP3_FRAME_DURATION)
+
+
+def test_probe_vbr_mp3_counts_frames():
+  # Xing header after the side information of a stereo MPEG-1 frame
+  xing = b"Xing" + struct.pack(">II", 0x01, 20000)
+  first_frame = MP3_FRAME[:36] + xing + MP3_FRAME[36 + len(xing):]
+  data = first_frame + MP3_FRAME * 10
+
+  assert probe_audio(data).duration == pytest.approx(20000 * MP3_FRAME_DURATION)
+
+
+def test_probe_m4a():
+  probe = probe_audio(make_m4a(3600)[:65536])
+
+  assert probe == AudioProbe("audio/mp4", 3600)
+
+
+def test_probe_m4a_file_reads_moov_at_end():
+  data = make_m4a(1800, moov_at_end=True)
+
+  assert probe_audio(data[:65536]).duration is None
+  assert probe_audio_file(io.BytesIO(data)).duration == 1800
+
+
+@pytest.mark.parametrize("handler_types", [(b"soun", b"vide"), ()])
+def test_probe_rejects_m4a_without_audio_only(handler_types):
+  with pytest.raises(AudioProbeError):
+    probe_audio(make_m4a(60, handler_types))
+
+
+def test_probe_rejects_renamed_image():
+  with pytest.raises(AudioProbeError):
+    probe_audio_file(io.BytesIO(read("test_image.jpg")))
+
+
+def test_check_audio():
+  check_audio("lecture.mp3", AudioProbe("audio/mpeg", 3600))
+  check_audio("lecture.m4a", AudioProbe("audio/mp4", None))
+
+  with pytest.raises(ValueError):
+    check_audio("lecture.mp3", AudioProbe("audio/mp4", 60))
+
+  with pytest.raises(ValueError):
+    check_audio("lecture.m4a", AudioProbe("audio/mp4", MAX_AUDIO_DURATION_SEC + 1))
+
+
+@pytest.mark.asyncio
+async def test_peek_stream_replays_head():
+  async def stream():
+    for chunk in (b"ab", b"cd", b"ef"):
+      yield chunk
+
+  head, chunks = await peek_stream(stream(), 3)
+
+  assert head == b"abcd"
+  assert b"".join([chunk async for chunk in chunks]) == b"abcdef"
@@ -0,0 +1,112 @@
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models.upload import UploadSession
+from src.schemas.upload import UploadSessionStatusEnum
+from src.services.upload import (
+    MIN_PART_SIZE,
+    PRESIGNED_PARTS_PAGE_SIZE,
+    UploadService,
+    plan_parts,
+)
+
+OWNER_ID = uuid.UUID("8338ad64-b029-45e8-ae40-883761acb4a9")
+MiB = 1024 * 1024
+
+
+def make_upload_session(part_count=3, status=UploadSessionStatusEnum.IN_PROGRESS):
+    return UploadSession(
+        id=uuid.uuid4(),
+        owner_id=OWNER_ID,
+        filename=f"{OWNER_ID}_abc123_lecture.mp3",
+        content_type="audio/mpeg",
+        size=part_count * MIN_PART_SIZE,
+        upload_id="upload-id",
+        part_size=MIN_PART_SIZE,
+        part_count=part_count,
+        status=status.value,
+    )
+
+
+def make_db_session(upload_session, parts=()):
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = upload_session
+    session.execute.return_value.all.return_value = list(parts)
+
+    return session
+
+
+def test_plan_parts():
+    assert plan_parts(1) == (MIN_PART_SIZE, 1)
+    assert plan_parts(200 * MiB) == (MIN_PART_SIZE, 25)
+
+    # Huge files get bigger parts, to stay within 10,000 of them
+    part_size, part_count = plan_parts(200 * 1024 * MiB)
+    assert part_size == 21 * MiB
+    assert part_count <= 10000
+
+
+def test_create_upload_session_presigns_first_parts():
+    s3_client = MagicMock()
+    s3_client.create_multipart_upload.return_value = {"UploadId": "upload-id"}
+    s3_client.generate_presigned_url.side_effect = lambda operation, Params, ExpiresIn: f"https://s3/{Params['PartNumber']}"
+
+    upload_session = UploadService("bucket", s3_client=s3_client).create_upload_session(
+        MagicMock(), OWNER_ID, "lecture.mp3", 2000 * MiB
+    )
+
+    request = s3_client.create_multipart_upload.call_args.kwargs
+    assert request["ContentType"] == "audio/mpeg"
+    assert request["Metadata"] == {"owner-id": str(OWNER_ID)}
+    assert request["Key"].startswith(f"{OWNER_ID}_") and request["Key"].endswith("_lecture.mp3")
+
+    assert upload_session.part_count == 250
+    assert [part.part_number for part in upload_session.parts] == list(range(1, PRESIGNED_PARTS_PAGE_SIZE + 1))
+
+
+def test_create_upload_session_rejects_non_audio():
+    s3_client = MagicMock()
+
+    with pytest.raises(ValueError):
+        UploadService("bucket", s3_client=s3_client).create_upload_session(
+            MagicMock(), OWNER_ID, "slides.pdf", MiB
+        )
+
+    s3_client.create_multipart_upload.assert_not_called()
+
+
+def test_record_upload_part_checks_part_number():
+    session = make_db_session(make_upload_session(part_count=3))
+
+    with pytest.raises(ValueError):
+        UploadService("bucket", s3_client=MagicMock()).record_upload_part(
+            session, OWNER_ID, uuid.uuid4(), 4, '"etag"'
+        )
+
+
+def test_complete_upload_session_needs_every_part():
+    s3_client = MagicMock()
+    session = make_db_session(make_upload_session(part_count=3), parts=[(1, '"a"'), (3, '"c"')])
+
+    with pytest.raises(ValueError, match=r"\[2\]"):
+        UploadService("bucket", s3_client=s3_client).complete_upload_session(session, OWNER_ID, uuid.uuid4())
+
+    s3_client.complete_multipart_upload.assert_not_called()
+
+
+def test_complete_upload_session():
+    s3_client = MagicMock()
+    upload_session = make_upload_session(part_count=2)
+    session = make_db_session(upload_session, parts=[(1, '"a"'), (2, '"b"')])
+
+    filename = UploadService("bucket", s3_client=s3_client).complete_upload_session(
+        session, OWNER_ID, upload_session.id
+    )
+
+    assert filename == upload_session.filename
+    assert upload_session.status == UploadSessionStatusEnum.COMPLETED.value
+    assert s3_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"] == {
+        "Parts": [{"ETag": '"a"', "PartNumber": 1}, {"ETag": '"b"', "PartNumber": 2}]
+    }
@@ -0,0 +1,127 @@
+import hashlib
+import threading
+import time
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.services.upload import UploadService
+
+OWNER_ID = uuid.UUID("8338ad64-b029-45e8-ae40-883761acb4a9")
+FILENAME = f"{OWNER_ID}_abc123_lecture.mp3"
+PART_SIZE = 1024
+
+
+class FakeS3Client:
+    def __init__(self, part_delay=0.02, fail_part=None):
+        self.part_delay = part_delay
+        self.fail_part = fail_part
+
+        self.parts = {}
+        self.running = 0
+        self.max_running = 0
+        self.completed = None
+        self.aborted = False
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, **kwargs):
+        return {"UploadId": "upload-id"}
+
+    def upload_part(self, PartNumber, Body, **kwargs):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(self.part_delay)
+
+        with self._lock:
+            self.running -= 1
+
+        if PartNumber == self.fail_part:
+            raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPart")
+
+        self.parts[PartNumber] = Body
+        return {"ETag": f'"etag-{PartNumber}"'}
+
+    def complete_multipart_upload(self, MultipartUpload, **kwargs):
+        self.completed = MultipartUpload["Parts"]
+
+    def abort_multipart_upload(self, **kwargs):
+        self.aborted = True
+
+
+def make_db_session(object_key=None):
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = object_key
+
+    return session
+
+
+async def stream(data, chunk_size=300):
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+@pytest.mark.asyncio
+async def test_store_audio_stream_uploads_parts_concurrently():
+    data = bytes(range(256)) * 40
+    s3_client = FakeS3Client()
+    service = UploadService("bucket", s3_client=s3_client)
+
+    upload, is_duplicate = await service.store_audio_stream(
+        make_db_session(), OWNER_ID, FILENAME, stream(data), part_size=PART_SIZE, max_concurrency=3,
+    )
+
+    assert not is_duplicate
+    assert upload.object_key == FILENAME
+    assert upload.size == len(data)
+    assert upload.content_hash == hashlib.sha256(data).hexdigest()
+
+    part_count = -(-len(data) // PART_SIZE)
+    assert [part["PartNumber"] for part in s3_client.completed] == list(range(1, part_count + 1))
+    assert b"".join(s3_client.parts[n] for n in range(1, part_count + 1)) == data
+    assert 1 < s3_client.max_running <= 3
+
+
+@pytest.mark.asyncio
+async def test_store_audio_stream_aborts_duplicate():
+    s3_client = FakeS3Client(part_delay=0)
+    service = UploadService("bucket", s3_client=s3_client)
+
+    upload, is_duplicate = await service.store_audio_stream(
+        make_db_session("stored.mp3"), OWNER_ID, FILENAME, stream(b"audio" * 500), part_size=PART_SIZE,
+    )
+
+    assert is_duplicate
+    assert upload.object_key == "stored.mp3"
+    assert s3_client.aborted
+    assert s3_client.completed is None
+
+
+@pytest.mark.asyncio
+async def test_store_audio_stream_aborts_on_failed_part():
+    s3_client = FakeS3Client(part_delay=0, fail_part=2)
+    service = UploadService("bucket", s3_client=s3_client)
+    session = make_db_session()
+
+    with pytest.raises(ClientError):
+        await service.store_audio_stream(
+            session, OWNER_ID, FILENAME, stream(b"audio" * 1000), part_size=PART_SIZE,
+        )
+
+    assert s3_client.aborted
+    assert s3_client.completed is None
+    session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_store_audio_stream_rejects_empty_upload():
+    s3_client = FakeS3Client()
+    service = UploadService("bucket", s3_client=s3_client)
+
+    with pytest.raises(ValueError):
+        await service.store_audio_stream(make_db_session(), OWNER_ID, FILENAME, stream(b""))
+
+    assert s3_client.aborted
@@ -0,0 +1,106 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from botocore.exceptions import ClientError
+
+from src.services.waveform import WaveformService
+from src.utils.ffmpeg import iter_pcm
+from src.utils.waveform import PeakBuilder, WaveformPeaks
+
+SAMPLE_RATE = 8000
+
+# Stands in for ffmpeg decoding a damaged file: logs more than a pipe holds
+# while decoding, then fails
+FAKE_FFMPEG = f"""#!{sys.executable}
+import sys
+
+for _ in range(10):
+  sys.stderr.write("Invalid data found when processing input\\n" * 10000)
+  sys.stdout.buffer.write(bytes({SAMPLE_RATE} * 2))
+
+sys.exit(1)
+"""
+
+
+def make_samples(seconds=10, seed=0):
+  rng = np.random.default_rng(seed)
+  return rng.integers(-20000, 20000, size=int(seconds * SAMPLE_RATE)).astype(np.int16)
+
+
+@pytest.mark.parametrize("chunk_size", [77, 160, 10 ** 6])
+def test_peak_builder_matches_windows(chunk_size):
+  samples = make_samples(seconds=2.01)
+
+  builder = PeakBuilder(SAMPLE_RATE, samples_per_peak=160)
+  for start in range(0, len(samples), chunk_size):
+    builder.feed(samples[start:start + chunk_size])
+
+  peaks = WaveformPeaks(builder.pack())
+
+  assert len(peaks) == 101
+  assert peaks.peaks_per_sec == 50
+  assert peaks.peaks[0].tolist() == [samples[:160].min() >> 8, samples[:160].max() >> 8]
+  assert peaks.peaks[-1].tolist() == [samples[16000:].min() >> 8, samples[16000:].max() >> 8]
+
+
+def test_downsample_keeps_extremes():
+  builder = PeakBuilder(SAMPLE_RATE, samples_per_peak=160)
+  samples = np.zeros(SAMPLE_RATE * 60, dtype=np.int16)
+  # A single loud click
+  samples[123456] = 32767
+  builder.feed(samples)
+
+  peaks = WaveformPeaks(builder.pack()).downsample(7)
+
+  assert len(peaks) == 7
+  assert peaks.duration == pytest.approx(60)
+  assert peaks.peaks[:, 1].max() == 127
+  assert WaveformPeaks(peaks.pack()).to_dict()["max"] == peaks.peaks[:, 1].tolist()
+
+
+def test_downsample_to_more_peaks_is_unchanged():
+  builder = PeakBuilder(SAMPLE_RATE, samples_per_peak=160)
+  builder.feed(make_samples(seconds=1))
+  peaks = WaveformPeaks(builder.pack())
+
+  assert peaks.downsample(1000) is peaks
+
+
+def test_compute_and_fetch_peaks():
+  s3_client = MagicMock()
+  service = WaveformService("bucket", s3_client=s3_client)
+  samples = make_samples()
+
+  with patch("src.services.waveform.iter_pcm", return_value=iter([samples[:30000], samples[30000:]])):
+    service.store_peaks("user_abc123_lecture.mp3")
+
+  stored = s3_client.put_object.call_args.kwargs
+  assert stored["Key"] == "user_abc123_lecture.peaks"
+  assert len(stored["Body"]) < len(samples) // 50
+
+  s3_client.get_object.return_value = {"Body": MagicMock(read=MagicMock(return_value=stored["Body"]))}
+  peaks = service.fetch_peaks("user_abc123_lecture.mp3")
+
+  assert len(peaks) == 10 * WaveformService.PEAKS_PER_SEC
+
+
+def test_fetch_missing_peaks():
+  s3_client = MagicMock()
+  s3_client.get_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+
+  assert WaveformService("bucket", s3_client=s3_client).fetch_peaks("user_abc123_missing.mp3") is None
+
+
+def test_noisy_decode_fails_instead_of_blocking(tmp_path):
+  ffmpeg_path = tmp_path / "ffmpeg"
+  ffmpeg_path.write_text(FAKE_FFMPEG)
+  ffmpeg_path.chmod(0o755)
+
+  sample_count = 0
+  with pytest.raises(RuntimeError, match="Invalid data found when processing input$"):
+    for samples in iter_pcm("lecture.mp3", SAMPLE_RATE, str(ffmpeg_path)):
+      sample_count += len(samples)
+
+  assert sample_count == 10 * SAMPLE_RATE
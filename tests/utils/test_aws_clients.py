@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from src.utils.aws.clients import AWSClientRegistry, CLIENT_CONFIG
+from src.utils.aws.s3 import AWSS3Client
+
+
+def test_client_is_built_once_across_threads():
+    registry = AWSClientRegistry()
+
+    with patch("boto3.session.Session.client", side_effect=lambda *args, **kwargs: object()) as client:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: registry.get_client("s3"), range(32)))
+
+    assert client.call_count == 1
+    assert all(built is clients[0] for built in clients)
+
+
+def test_clients_are_keyed_by_service_and_region():
+    registry = AWSClientRegistry()
+    registry.warm_up(["s3", "transcribe"])
+
+    s3_client = registry.get_client("s3")
+
+    assert s3_client is registry.get_client("s3")
+    assert s3_client is not registry.get_client("transcribe")
+    assert s3_client is not registry.get_client("s3", "ap-southeast-1")
+    assert s3_client.meta.config.max_pool_connections == CLIENT_CONFIG.max_pool_connections
+    assert s3_client.meta.config.retries["mode"] == "standard"
+
+    registry.clear()
+
+
+def test_utility_clients_share_the_registry():
+    assert AWSS3Client().get_client() is AWSS3Client().get_client()